@@ -1,353 +1,331 @@
 #############################   THIS IS THE SCRIPT USED TO TRANSFORM THE RAW DATA IN SNOWFLAKE USING SNOWPARK   #############################
 import os
+import sys
 import logging
-from snowflake.snowpark import Session
-from snowflake.snowpark.functions import col, udf
+from pathlib import Path
+from functools import partial
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from snowflake.snowpark import Session, Window
+from snowflake.snowpark.functions import col, lit, when, split, array_size, coalesce, when_matched, when_not_matched
+from snowflake.snowpark.functions import sum as sum_, avg, count, count_distinct, min as min_, max as max_, iff, div0, current_timestamp, call_function
+from snowflake.snowpark.exceptions import SnowparkSQLException
 from snowflake.snowpark.types import FloatType, IntegerType, StringType, DateType
 
-def player_changes(session):
-    # Read player data from raw tables
-    df = session.table("RAW_PLAYERS_2024_25")
-
-    # Filter for only active players
-    df_active = df.filter(col("ROSTERSTATUS") == "Active")
-    
-    # Selecting certain columns
-    df_selected = df_active.select(
-        "PERSON_ID",
-        "FIRST_NAME",
-        "LAST_NAME",
-        "BIRTHDATE",
-        "SCHOOL",
-        "COUNTRY",
-        "HEIGHT",
-        "WEIGHT",
-        "SEASON_EXP",
-        "JERSEY",
-        "POSITION",
-        "TEAM_ID",
-        "DLEAGUE_FLAG",
-        "DRAFT_YEAR",
-        "DRAFT_ROUND",
-        "DRAFT_NUMBER",
-        "GREATEST_75_FLAG"
-    )
-    
-    # Save as a new table
-    df_selected.write.save_as_table("NBA_PROCESSED_2024_25.PLAYERS_PROCESSED_2024_25", mode="overwrite")
-
-def team_changes(session):
-    # Read team data from raw tables
-    df = session.table("RAW_TEAMS_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        "TEAM_ID",
-        "ABBREVIATION",
-        "CITY",
-        "NICKNAME",
-        "YEARFOUNDED",
-        "ARENA",
-        "ARENACAPACITY",
-        "OWNER",
-        "GENERALMANAGER",
-        "HEADCOACH",
-        "DLEAGUEAFFILIATION"
-    )
-
-    # Save as a table in schema
-    df_selected.write.save_as_table("NBA_PROCESSED_2024_25.TEAMS_PROCESSED_2024_25", mode="overwrite")
-    
-def advanced_changes(session, convert_min_udf):  
-    # Read advanced data from raw tables
-    df = session.table("RAW_ADVANCED_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        "GAME_ID",
-        "TEAM_ID",
-        "PLAYER_ID",
-        "MIN",
-        "E_OFF_RATING",
-        "OFF_RATING",
-        "E_DEF_RATING",
-        "DEF_RATING",
-        "E_NET_RATING",
-        "NET_RATING",
-        "AST_PCT",
-        "AST_TOV",
-        "AST_RATIO",
-        "OREB_PCT",
-        "DREB_PCT",
-        "REB_PCT",
-        "TM_TOV_PCT",
-        "EFG_PCT",
-        "TS_PCT",
-        "USG_PCT",
-        "E_USG_PCT",
-        "E_PACE",
-        "PACE",
-        "PACE_PER40",
-        "POSS",
-        "PIE"
-    )
-
-    # Altering minutes data
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-
-    # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.ADVANCED_PROCESSED_2024_25", mode="overwrite")    
-
-def hustle_changes(session, convert_min_udf):
-    # Read hustle data from raw tables
-    df = session.table("RAW_HUSTLE_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        col("gameId").alias("GAME_ID"),
-        col("teamId").alias("TEAM_ID"),
-        col("personId").alias("PLAYER_ID"),
-        col("minutes").alias("MIN"),
-        col("points").alias("PTS"),
-        col("contestedShots").alias("CONTESTED_SHOTS"),
-        col("contestedShots2pt").alias("CONTESTED_SHOTS_2PT"),
-        col("contestedShots3pt").alias("CONTESTED_SHOTS_3PT"),
-        col("deflections").alias("DEFLECTIONS"),
-        col("chargesDrawn").alias("CHARGES_DRAWN"),
-        col("screenAssists").alias("SCREEN_ASSISTS"),
-        col("screenAssistPoints").alias("SCREEN_ASSIST_POINTS"),
-        col("looseBallsRecoveredOffensive").alias("LOOSEBALLS_RECOVERED_OFFENSIVE"),
-        col("looseBallsRecoveredDefensive").alias("LOOSEBALLS_RECOVERED_DEFENSIVE"),
-        col("looseBallsRecoveredTotal").alias("LOOSEBALLS_RECOVERED_TOTAL"),
-        col("offensiveBoxOuts").alias("OFFENSIVE_BOXOUTS"),
-        col("defensiveBoxOuts").alias("DEFENSIVE_BOXOUTS"),
-        col("boxOutPlayerTeamRebounds").alias("BOXOUT_PLAYER_TEAM_REBOUNDS"),
-        col("boxOutPlayerRebounds").alias("BOXOUT_PLAYER_REBOUNDS"),
-        col("boxOuts").alias("BOXOUTS")
-    )
-    
-    # Altering minutes data
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-
-    # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.HUSTLE_PROCESSED_2024_25", mode="overwrite")
-
-def playertrack_changes(session, convert_min_udf):
-    # Read playertrack data from raw tables
-    df = session.table("RAW_PLAYERTRACK_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        "GAME_ID",
-        "TEAM_ID",
-        "PLAYER_ID",
-        "MIN",
-        "SPD",
-        "DIST",
-        "ORBC",
-        "DRBC",
-        "RBC",
-        "TCHS",
-        "SAST",
-        "FTAST",
-        "PASS",
-        "AST",
-        "CFGM",
-        "CFGA",
-        "CFG_PCT",
-        "UFGM",
-        "UFGA",
-        "UFG_PCT",
-        "FG_PCT",
-        "DFGM",
-        "DFGA",
-        "DFG_PCT"
-    )    
-
-    # Altering minutes data
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-
-    # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.PLAYERTRACK_PROCESSED_2024_25", mode="overwrite")
-    
-def scoring_changes(session, convert_min_udf):    
-    # Read scoring data from raw tables
-    df = session.table("RAW_SCORING_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        "GAME_ID",
-        "TEAM_ID",
-        "PLAYER_ID",
-        "MIN",
-        "PCT_FGA_2PT",
-        "PCT_FGA_3PT",
-        "PCT_PTS_2PT",
-        "PCT_PTS_2PT_MR",
-        "PCT_PTS_3PT",
-        "PCT_PTS_FB",
-        "PCT_PTS_FT",
-        "PCT_PTS_OFF_TOV",
-        "PCT_PTS_PAINT",
-        "PCT_AST_2PM",
-        "PCT_UAST_2PM",
-        "PCT_AST_3PM",
-        "PCT_UAST_3PM",
-        "PCT_AST_FGM",
-        "PCT_UAST_FGM"
-    )    
-
-    # Cast data types
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-
-    # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.SCORING_PROCESSED_2024_25", mode="overwrite")
-
-def traditional_changes(session, convert_min_udf):
-    # Read traditional data from staging
-    df = session.table("RAW_TRADITIONAL_2024_25")
-    
-    # Selecting certain columns
-    df_selected = df.select(
-        "GAME_ID",
-        "TEAM_ID",
-        "PLAYER_ID",
-        "MIN",   
-        "FGM",
-        "FGA",
-        "FG_PCT",
-        "FG3M",
-        "FG3A",
-        "FG3_PCT",
-        "FTM",
-        "FTA",
-        "FT_PCT",
-        "OREB",
-        "DREB",
-        "REB",
-        "AST",
-        "STL",
-        "BLK",
-        "TO",
-        "PF",
-        "PTS",
-        "PLUS_MINUS"
-    )
+# The table specs are shared with ingestion in "data ingestion/schemas.py"; in a Snowpark notebook, add schemas.py to the notebook's files
+if "__file__" in globals():
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data ingestion"))
+from schemas import TABLE_SPECS, OVERWRITE_ONLY_TABLES, spec_columns
+
+# Function to convert a minutes column to float minutes as a native column expression, so Snowflake evaluates it
+# in bulk instead of calling a Python UDF once per row
+# "MM" -> MM, "MM:SS" -> MM + SS/60, "H:MM:SS" -> H*60 + MM + SS/60, and missing or unrecognised values -> 0.0
+# convert_minutes in local_transformations.py gives the same results for local runs
+def convert_minutes(min_col):
+    parts = split(min_col, lit(":"))
+    part = lambda i: parts[i].cast(StringType()).try_cast(FloatType())
+    part_count = array_size(parts)
+    minutes = when(part_count == 1, part(0)) \
+    .when(part_count == 2, part(0) + part(1) / 60) \
+    .when(part_count == 3, part(0) * 60 + part(1) + part(2) / 60)
+    return coalesce(minutes, lit(0.0))
+
+# Function to check whether a table exists, e.g. before the first incremental run creates it
+def table_exists(session, table_name):
+    try:
+        session.table(table_name).limit(0).collect()
+        return True
+    except SnowparkSQLException:
+        return False
+
+# Function to get the table recording the hash of each game's rows last written to a processed table
+def game_hash_table(table_name):
+    return f"{table_name}_GAME_HASHES"
+
+# Function to fingerprint each game's rows with HASH_AGG, which does not depend on the order of the rows
+# Returns a data frame of GAME_ID and GAME_HASH
+def game_hashes(df, game_id_column="GAME_ID"):
+    return df.group_by(game_id_column) \
+    .agg(call_function("HASH_AGG", *[col(c) for c in df.columns]).alias("GAME_HASH")) \
+    .select(col(game_id_column).alias("GAME_ID"), "GAME_HASH")
+
+# Function to get the hashes of the games that are new or have changed since they were last written to a processed table,
+# so only those games' rows are transformed and merged in merge mode
+# A game has changed when the hash of its rows differs from the one recorded in the table's game hash table, e.g. after a
+# stat correction was ingested; without a game hash table yet (the first merge run) every game is written once
+# so a daily refresh costs the new and corrected games rather than the whole season
+# The hashes are recorded with record_game_hashes once the table is written
+def changed_game_hashes(session, df_hashes, table_name):
+    hash_table = game_hash_table(table_name)
+    if table_exists(session, table_name) and table_exists(session, hash_table):
+        df_hashes = df_hashes.join(session.table(hash_table).select("GAME_ID", "GAME_HASH"), on=["GAME_ID", "GAME_HASH"], how="leftanti")
+    return df_hashes.cache_result()
+
+# Function to record the hashes of the games written to a processed table, with when they were written
+def record_game_hashes(session, df_hashes, table_name, mode="overwrite"):
+    df_hashes = df_hashes.select("GAME_ID", "GAME_HASH", current_timestamp().alias("LOADED_AT"))
+    write_table(session, df_hashes, game_hash_table(table_name), ["GAME_ID"], mode)
+
+# Function to save a transformed data frame as a processed table
+# mode="overwrite" rebuilds the table; mode="merge" MERGEs the rows into it on the table's primary keys from
+# "DDL Script Constraints.sql", so callers only pass the rows of new and changed games (see changed_game_hashes) or the rows they recompute
+# Rows are deduplicated on the keys first, since MERGE fails when more than one source row matches the same target row
+# clustering_keys are set when the table is created
+def write_table(session, df, table_name, keys, mode="overwrite", clustering_keys=None):
+    if mode == "overwrite" or not table_exists(session, table_name):
+        df.write.save_as_table(table_name, mode="overwrite", clustering_keys=clustering_keys)
+        return
+
+    target = session.table(table_name)
+    changed = df.drop_duplicates(*keys).cache_result()
+    value_columns = [c for c in df.columns if c not in keys]
+    join_expr = target[keys[0]] == changed[keys[0]]
+    for key in keys[1:]:
+        join_expr = join_expr & (target[key] == changed[key])
+
+    result = target.merge(changed, join_expr, [
+        when_matched().update({c: changed[c] for c in value_columns}),
+        when_not_matched().insert({c: changed[c] for c in df.columns})
+    ])
+    logging.info(f"Merged into {table_name}: {result.rows_inserted} rows inserted, {result.rows_updated} rows updated")
+
+# Function to transform one raw table into its processed table, driven by its spec in schemas.py:
+# filter the rows, select and rename the spec's columns, and convert minutes to float minutes
+# Players, teams and the schedule are always rebuilt (OVERWRITE_ONLY_TABLES); the other tables are written in the given mode on their keys,
+# with only the raw rows of games that are new or have changed since the last run transformed in merge mode
+def table_changes(table, session, mode="overwrite"):
+    spec = TABLE_SPECS[table]
+    df = session.table(f"RAW_{table}_2024_25")
+    table_name = f"NBA_PROCESSED_2024_25.{table}_PROCESSED_2024_25"
+
+    df_hashes = None
+    if table not in OVERWRITE_ONLY_TABLES and "GAME_ID" in spec['keys']:
+        raw_game_id = next(raw_name for raw_name, _, processed_name in spec_columns(spec) if processed_name == "GAME_ID")
+        df_hashes = game_hashes(df, raw_game_id)
+        if mode == "merge":
+            df_hashes = changed_game_hashes(session, df_hashes, table_name)
+            df = df.join(df_hashes.select(col("GAME_ID").alias(raw_game_id)), on=raw_game_id, how="leftsemi")
+
+    if 'filter' in spec:
+        column, value = spec['filter']
+        df = df.filter(col(column) == value)
+
+    df_selected = df.select([col(raw_name).alias(processed_name) for raw_name, _, processed_name in spec_columns(spec)])
+    if "MIN" in df_selected.columns:
+        df_selected = df_selected.with_column("MIN", convert_minutes(col("MIN")).cast(FloatType()))
+
+    if table in OVERWRITE_ONLY_TABLES:
+        df_selected.write.save_as_table(table_name, mode="overwrite")
+    else:
+        write_table(session, df_selected, table_name, spec['keys'], mode)
+    if df_hashes is not None:
+        record_game_hashes(session, df_hashes, table_name, mode)
+
+# Boxscore tables joined into the wide player-game table, in order of priority
+# A column found in more than one table (e.g. MIN, TEAM_ID, PTS, AST, FG_PCT, USG_PCT) is taken from the first table that has it
+PLAYER_GAME_SOURCES = ["TRADITIONAL", "ADVANCED", "USAGE", "SCORING", "PLAYERTRACK", "HUSTLE"]
+
+# Function to build one wide, deduplicated player-game table from the six processed boxscore tables and the schedule
+# Traditional boxscores list every player of each game, so they set the rows and the other tables are left joined onto them
+# The table is sorted and clustered by game date and player, so dashboard filters on dates or players prune micro-partitions
+# Each game is fingerprinted by the hashes of its rows in the six tables and its schedule row, so in merge mode only the games
+# that are new or have changed (corrected boxscores, or a game date the schedule did not have before) are joined and merged
+def player_game_changes(session, mode="overwrite"):
+    keys = ["GAME_ID", "PLAYER_ID"]
+    table_name = "NBA_PROCESSED_2024_25.PLAYER_GAME_PROCESSED_2024_25"
+    df_schedule = session.table("NBA_PROCESSED_2024_25.SCHEDULE_PROCESSED_2024_25").select("GAME_ID", "GAME_DATE", "SEASON")
+    df_hashes = game_hashes(df_schedule)
+    for source in PLAYER_GAME_SOURCES:
+        df_hashes = df_hashes.union_all(game_hashes(session.table(f"NBA_PROCESSED_2024_25.{source}_PROCESSED_2024_25")))
+    df_hashes = game_hashes(df_hashes)
+    df_games = None
+    if mode == "merge":
+        df_hashes = changed_game_hashes(session, df_hashes, table_name)
+        df_games = df_hashes.select("GAME_ID")
+    df_wide = None
+    for source in PLAYER_GAME_SOURCES:
+        df_source = session.table(f"NBA_PROCESSED_2024_25.{source}_PROCESSED_2024_25")
+        if df_games is not None:
+            df_source = df_source.join(df_games, on="GAME_ID", how="leftsemi")
+        df_source = df_source.drop_duplicates(*keys)
+        if df_wide is None:
+            df_wide = df_source
+            continue
+        new_columns = [c for c in df_source.columns if c not in df_wide.columns]
+        df_wide = df_wide.join(df_source.select(*keys, *new_columns), on=keys, how="left")
+
+    # Add the game date and season from the schedule
+    df_wide = df_wide.join(df_schedule, on="GAME_ID", how="left")
+    df_wide = df_wide.select("GAME_DATE", "SEASON", *[c for c in df_wide.columns if c not in ("GAME_DATE", "SEASON")]) \
+    .sort("GAME_DATE", "PLAYER_ID")
 
-    # Cast data types
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-            
     # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.TRADITIONAL_PROCESSED_2024_25", mode="overwrite")
-
-def usage_changes(session, convert_min_udf):
-    # Read usage data from staging
-    df = session.table("RAW_USAGE_2024_25")
-
-    # Selecting certain columns
-    df_selected = df.select(
-        "GAME_ID",
-        "TEAM_ID",
-        "PLAYER_ID",
-        "MIN",
-        "USG_PCT",
-        "PCT_FGM",
-        "PCT_FGA",
-        "PCT_FG3M",
-        "PCT_FG3A",
-        "PCT_FTM",
-        "PCT_FTA",
-        "PCT_OREB",
-        "PCT_DREB",
-        "PCT_REB",
-        "PCT_AST",
-        "PCT_TOV",
-        "PCT_STL",
-        "PCT_BLK",
-        "PCT_BLKA",
-        "PCT_PF",
-        "PCT_PFD",
-        "PCT_PTS"
+    write_table(session, df_wide, table_name, keys, mode, clustering_keys=["GAME_DATE", "PLAYER_ID"])
+    record_game_hashes(session, df_hashes, table_name, mode)
+
+# Counting stats totalled in the rollups, rate stats averaged over games played, and stats averaged over rolling windows of games played
+ROLLUP_SUM_COLUMNS = ["MIN", "PTS", "REB", "OREB", "DREB", "AST", "STL", "BLK", "TO", "PF", "FGM", "FGA", "FG3M", "FG3A", "FTM", "FTA"]
+ROLLUP_AVG_COLUMNS = ["PLUS_MINUS", "OFF_RATING", "DEF_RATING", "NET_RATING", "USG_PCT", "PACE", "PIE"]
+ROLLING_COLUMNS = ["MIN", "PTS", "REB", "AST", "STL", "BLK", "TO", "FG3M", "PLUS_MINUS", "USG_PCT"]
+ROLLING_WINDOWS = [5, 10, 20]
+
+# Function to get shooting percentages calculated from totals rather than averaged from per-game percentages
+def shooting_percentages(prefix=""):
+    return [
+        div0(col(f"{prefix}FGM"), col(f"{prefix}FGA")).alias(f"{prefix}FG_PCT"),
+        div0(col(f"{prefix}FG3M"), col(f"{prefix}FG3A")).alias(f"{prefix}FG3_PCT"),
+        div0(col(f"{prefix}FTM"), col(f"{prefix}FTA")).alias(f"{prefix}FT_PCT"),
+        div0(col(f"{prefix}PTS"), 2 * (col(f"{prefix}FGA") + 0.44 * col(f"{prefix}FTA"))).alias(f"{prefix}TS_PCT")
+    ]
+
+# Function to build the rollup tables from the wide player-game table:
+#   TEAM_GAME_ROLLUP      - team totals per game, with the opponent's points and the result
+#   TEAM_SEASON_ROLLUP    - team per-game averages, record and shooting for the season
+#   PLAYER_SEASON_ROLLUP  - player totals, per-game averages and shooting for the season
+#   PLAYER_ROLLING_ROLLUP - player averages over their last 5, 10 and 20 games played, as of each game
+# Games already rolled up are listed in ROLLUP_GAMES_2024_25, so in merge mode only the teams and players with new games are
+# recomputed (rolling windows from each player's first new game onwards) and merged, instead of rolling up the whole season;
+# games merged into the wide table again since they were rolled up (see player_game_changes) count as new
+# Games without a game date (not in the schedule yet) are left out and not recorded in ROLLUP_GAMES, so they are rolled up
+# by a later run once the schedule has their date
+def rollup_changes(session, mode="overwrite"):
+    schema = "NBA_PROCESSED_2024_25"
+    df_wide = session.table(f"{schema}.PLAYER_GAME_PROCESSED_2024_25").filter(col("GAME_DATE").is_not_null())
+    df_games = df_wide.select("GAME_ID").distinct()
+    if mode != "overwrite" and table_exists(session, f"{schema}.ROLLUP_GAMES_2024_25"):
+        df_rolled_up = session.table(f"{schema}.ROLLUP_GAMES_2024_25").select("GAME_ID", "ROLLED_UP_AT")
+        hash_table = game_hash_table(f"{schema}.PLAYER_GAME_PROCESSED_2024_25")
+        if table_exists(session, hash_table):
+            df_games = df_games.join(session.table(hash_table).select("GAME_ID", "LOADED_AT"), on="GAME_ID", how="left") \
+            .join(df_rolled_up, on="GAME_ID", how="left") \
+            .filter(col("ROLLED_UP_AT").is_null() | (col("LOADED_AT") > col("ROLLED_UP_AT"))) \
+            .select("GAME_ID")
+        else:
+            df_games = df_games.join(df_rolled_up.select("GAME_ID"), on="GAME_ID", how="leftanti")
+    df_games = df_games.cache_result()
+    df_new_rows = df_wide.join(df_games, on="GAME_ID", how="leftsemi")
+
+    # Team totals for each new game, with the opponent's points from the other team's row of the same game
+    df_team_game = df_new_rows.group_by("GAME_ID", "GAME_DATE", "SEASON", "TEAM_ID") \
+    .agg(*[sum_(c).alias(c) for c in ROLLUP_SUM_COLUMNS])
+    df_opponent = df_team_game.select(col("GAME_ID").alias("OPP_GAME_ID"), col("TEAM_ID").alias("OPP_TEAM_ID"), col("PTS").alias("OPP_PTS"))
+    df_team_game = df_team_game.join(df_opponent, (df_team_game["GAME_ID"] == df_opponent["OPP_GAME_ID"]) & (df_team_game["TEAM_ID"] != df_opponent["OPP_TEAM_ID"]), how="left") \
+    .select("GAME_ID", "GAME_DATE", "SEASON", "TEAM_ID", *ROLLUP_SUM_COLUMNS, "OPP_TEAM_ID", "OPP_PTS", iff(col("PTS") > col("OPP_PTS"), 1, 0).alias("WIN")) \
+    .select("*", *shooting_percentages())
+    write_table(session, df_team_game, f"{schema}.TEAM_GAME_ROLLUP_2024_25", ["GAME_ID", "TEAM_ID"], mode, clustering_keys=["GAME_DATE", "TEAM_ID"])
+
+    # Team seasons with new games, recomputed from all of their games in the team-game rollup
+    df_teams = df_team_game.select("SEASON", "TEAM_ID").distinct()
+    df_team_season = session.table(f"{schema}.TEAM_GAME_ROLLUP_2024_25").join(df_teams, on=["SEASON", "TEAM_ID"], how="leftsemi") \
+    .group_by("SEASON", "TEAM_ID") \
+    .agg(
+        count(lit(1)).alias("GAMES"),
+        sum_("WIN").alias("WINS"),
+        (count(lit(1)) - sum_("WIN")).alias("LOSSES"),
+        max_("GAME_DATE").alias("LAST_GAME_DATE"),
+        *[sum_(c).alias(f"TOTAL_{c}") for c in ROLLUP_SUM_COLUMNS],
+        *[avg(c).alias(f"{c}_PER_GAME") for c in ROLLUP_SUM_COLUMNS],
+        avg("OPP_PTS").alias("OPP_PTS_PER_GAME")
+    ) \
+    .select("*", *shooting_percentages("TOTAL_"))
+    write_table(session, df_team_season, f"{schema}.TEAM_SEASON_ROLLUP_2024_25", ["SEASON", "TEAM_ID"], mode)
+
+    # Player seasons with new games, recomputed from all of their games played
+    df_played = df_wide.filter(col("MIN") > 0)
+    df_players = df_new_rows.select("SEASON", "PLAYER_ID").distinct()
+    df_player_season = df_played.join(df_players, on=["SEASON", "PLAYER_ID"], how="leftsemi") \
+    .group_by("SEASON", "PLAYER_ID") \
+    .agg(
+        count_distinct("GAME_ID").alias("GAMES"),
+        max_("GAME_DATE").alias("LAST_GAME_DATE"),
+        *[sum_(c).alias(f"TOTAL_{c}") for c in ROLLUP_SUM_COLUMNS],
+        *[avg(c).alias(f"{c}_PER_GAME") for c in ROLLUP_SUM_COLUMNS],
+        *[avg(c).alias(f"AVG_{c}") for c in ROLLUP_AVG_COLUMNS]
+    ) \
+    .select("*", *shooting_percentages("TOTAL_"))
+    write_table(session, df_player_season, f"{schema}.PLAYER_SEASON_ROLLUP_2024_25", ["SEASON", "PLAYER_ID"], mode)
+
+    # Rolling windows over each player's games played, recomputed from the player's first new game onwards
+    df_first_new = df_new_rows.filter(col("MIN") > 0).group_by("PLAYER_ID").agg(min_("GAME_DATE").alias("FIRST_NEW_GAME_DATE"))
+    df_history = df_played.join(df_first_new, on="PLAYER_ID", how="inner")
+    rolling_columns = []
+    for window_size in ROLLING_WINDOWS:
+        window = Window.partition_by("PLAYER_ID").order_by("GAME_DATE", "GAME_ID").rows_between(-(window_size - 1), Window.CURRENT_ROW)
+        rolling_columns += [avg(c).over(window).alias(f"{c}_LAST_{window_size}") for c in ROLLING_COLUMNS]
+        rolling_columns += [div0(sum_("FGM").over(window), sum_("FGA").over(window)).alias(f"FG_PCT_LAST_{window_size}")]
+    df_rolling = df_history.select("GAME_ID", "GAME_DATE", "SEASON", "PLAYER_ID", "TEAM_ID", "FIRST_NEW_GAME_DATE", *rolling_columns) \
+    .filter(col("GAME_DATE") >= col("FIRST_NEW_GAME_DATE")) \
+    .drop("FIRST_NEW_GAME_DATE")
+    write_table(session, df_rolling, f"{schema}.PLAYER_ROLLING_ROLLUP_2024_25", ["GAME_ID", "PLAYER_ID"], mode, clustering_keys=["GAME_DATE", "PLAYER_ID"])
+
+    # Record the games rolled up, last, so a failed run rolls the same games up again
+    df_rolled_up = df_games.select("GAME_ID", current_timestamp().alias("ROLLED_UP_AT"))
+    write_table(session, df_rolled_up, f"{schema}.ROLLUP_GAMES_2024_25", ["GAME_ID"], mode)
+
+# Transformation jobs by table; none reads another's output, so they can run at the same time
+TRANSFORMATIONS = {table.lower(): partial(table_changes, table) for table in TABLE_SPECS}
+
+# Number of transformation queries submitted to the warehouse at once (Snowflake runs 8 per warehouse cluster by default)
+MAX_CONCURRENT_TRANSFORMATIONS = 4
+
+# "overwrite" rebuilds every processed table; "merge" only transforms and writes the rows of new and changed games in the
+# boxscore, player-game and rollup tables
+TRANSFORM_MODE = "overwrite"
+
+# Transformation jobs that read the processed tables above, run once those have all been written
+DERIVED_TRANSFORMATIONS = {
+    "player_game": player_game_changes
+}
+
+# Rollup jobs, run once the wide player-game table has been written
+ROLLUP_TRANSFORMATIONS = {
+    "rollups": rollup_changes
+}
+
+# Function to run one transformation job and return how long it took in seconds
+def run_timed_transformation(transformation, session, mode):
+    start = perf_counter()
+    transformation(session, mode)
+    return perf_counter() - start
+
+# Function to run the transformation jobs concurrently over one session, waiting for all of them
+# Returns the duration of each table that succeeded and the error of each table that failed
+def run_transformations(session, tables=None, max_concurrency=MAX_CONCURRENT_TRANSFORMATIONS, mode=TRANSFORM_MODE, transformations=TRANSFORMATIONS):
+    tables = tables or list(transformations)
+    timings, errors = {}, {}
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {executor.submit(run_timed_transformation, transformations[table], session, mode): table for table in tables}
+        logging.info(f"Submitted {len(futures)} transformation jobs in {mode} mode, up to {max_concurrency} at once")
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                timings[table] = future.result()
+                logging.info(f"Transformed {table} table in {timings[table]:.1f}s")
+            except Exception as e:
+                errors[table] = e
+                logging.error(f"Error transforming {table} table: {e}")
+
+    wall_seconds = perf_counter() - start
+    slowest = max(timings, key=timings.get) if timings else None
+    logging.info(
+        f"Transformations finished in {wall_seconds:.1f}s ({sum(timings.values()):.1f}s if run one after another"
+        + (f", slowest table {slowest} {timings[slowest]:.1f}s)" if slowest else ")")
     )
+    return timings, errors
 
-    # Cast data types
-    df_transformed = df_selected \
-    .with_column("MIN", convert_min_udf(col("MIN")).cast(FloatType()))
-
-    # Save as a table in schema
-    df_transformed.write.save_as_table("NBA_PROCESSED_2024_25.USAGE_PROCESSED_2024_25", mode="overwrite")
-
-def schedule_changes(session):
-    # Read schedule data from staging
-    df = session.table("RAW_SCHEDULE_2024_25")
-
-    # Selecting certain columns
-    df_selected = df.select(
-        col("seasonYear").alias("SEASON"),
-        col("gameDate").alias("GAME_DATE"),
-        col("gameId").alias("GAME_ID"),
-        col("gameCode").alias("GAME_CODE"),
-        col("homeTeam_teamId").alias("HOME_TEAM_ID"),
-        col("homeTeam_score").alias("HOME_TEAM_SCORE"),
-        col("awayTeam_teamId").alias("AWAY_TEAM_ID"),
-        col("awayTeam_score").alias("AWAY_TEAM_SCORE"),
-        col("pointsLeaders_0_personId").alias("POINTS_LEADER_ID"),
-        col("pointsLeaders_0_points").alias("POINTS_LEADER_POINTS")
-    )
-
-    # Save as a table in schema
-    df_selected.write.save_as_table("NBA_PROCESSED_2024_25.SCHEDULE_PROCESSED_2024_25", mode="overwrite")
-
-def main(session: Session):
+def main(session: Session, max_concurrency=MAX_CONCURRENT_TRANSFORMATIONS, mode=TRANSFORM_MODE):
     logging.basicConfig(level=logging.INFO)
 
-    # Converting minutes column to float and streamlining format
-    logging.info("Registering UDF")
-    convert_min_udf = udf(
-        lambda min_str: (
-            0.0 if min_str is None else
-            (lambda parts: float(parts[0]) if len(parts) == 1 else
-                float(parts[0]) + float(parts[1]) / 60 if len(parts) == 2 else
-                float(parts[0]) * 60 + float(parts[1]) + float(parts[2]) / 60 if len(parts) == 3 else
-                0.0
-            )(min_str.split(':'))
-        ),
-        input_types=[StringType()],
-        return_type=FloatType(),
-        session=session
-    )
-
-    logging.info("Transforming players table")
-    player_changes(session)
-
-    logging.info("Transforming teams table")
-    team_changes(session)
-
-    logging.info("Transforming advanced table")
-    advanced_changes(session, convert_min_udf)
-
-    logging.info("Transforming hustle table")
-    hustle_changes(session, convert_min_udf)
-
-    logging.info("Transforming playertrack table")
-    playertrack_changes(session, convert_min_udf)
-
-    logging.info("Transforming scoring table")
-    scoring_changes(session, convert_min_udf)
-
-    logging.info("Transforming traditional table")
-    traditional_changes(session, convert_min_udf)
-
-    logging.info("Transforming usage table")
-    usage_changes(session, convert_min_udf)
+    _, errors = run_transformations(session, max_concurrency=max_concurrency, mode=mode)
+    if errors:
+        raise RuntimeError(f"Failed to transform {len(errors)} tables: {', '.join(sorted(errors))}")
 
-    logging.info("Transforming schedule table")
-    schedule_changes(session)
+    # Derived tables and then rollups are only built once every table they read is up to date
+    for transformations in (DERIVED_TRANSFORMATIONS, ROLLUP_TRANSFORMATIONS):
+        _, errors = run_transformations(session, max_concurrency=max_concurrency, mode=mode, transformations=transformations)
+        if errors:
+            raise RuntimeError(f"Failed to build {len(errors)} derived tables: {', '.join(sorted(errors))}")
 
     return session.table("NBA_PROCESSED_2024_25.PLAYERS_PROCESSED_2024_25").limit(10)
 
@@ -363,4 +341,4 @@ if __name__ == "__main__":
     }
 
     session = Session.builder.configs(connection_parameters).create()
-    main(session)
\ No newline at end of file
+    main(session, mode=os.getenv("NBA_TRANSFORM_MODE", TRANSFORM_MODE)) # Set NBA_TRANSFORM_MODE=merge for daily refreshes
\ No newline at end of file
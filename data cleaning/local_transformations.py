@@ -0,0 +1,330 @@
+#################################### Running Data Transformations Locally ####################################
+# Run this script to apply the transformations in "Data Transformations.py" to the raw files on disk with pandas instead of Snowpark
+# Each processed table is written to data/processed as e.g. TRADITIONAL_PROCESSED_2024_25.parquet, so transformations can be
+# developed and checked without a Snowflake session or warehouse time
+# Examples:
+#   python local_transformations.py                                  <- every table for the configured season
+#   python local_transformations.py --season 2023-24 --tables TRADITIONAL USAGE
+#   python local_transformations.py --workers 1                     <- one table at a time
+#   python local_transformations.py --tables ROLLUPS --mode merge    <- only roll up games added since the last run
+import sys
+import argparse
+import logging
+from pathlib import Path
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+
+# The ingestion config holds the shared paths and file helpers
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data ingestion"))
+from config import (
+    get_season_config,
+    initialize_script_environment,
+    read_frame,
+    write_frame,
+    find_frame_files,
+    find_raw_files,
+    read_partitioned_boxscores,
+    FILE_FORMATS
+)
+from schemas import TABLE_SPECS, spec_columns
+
+# Processed tables with the raw file they are read from and the columns they keep, from the table specs in schemas.py,
+# which "Data Transformations.py" is driven by as well
+PROCESSED_TABLES = TABLE_SPECS
+
+# Function to convert a column of minutes played to float minutes, vectorized over the whole column
+# Gives the same results as the convert_minutes column expression in "Data Transformations.py":
+# "MM" -> MM, "MM:SS" -> MM + SS/60, "H:MM:SS" -> H*60 + MM + SS/60, and missing or unrecognised values -> 0.0
+def convert_minutes(minutes):
+    text = minutes.astype('string').str.strip()
+    parts = text.str.split(':', expand=True).reindex(columns=range(3))
+    values = parts.apply(pd.to_numeric, errors='coerce').astype('float64').to_numpy()
+    part_counts = (text.str.count(':') + 1).fillna(0).to_numpy()
+    converted = np.select(
+        [part_counts == 1, part_counts == 2, part_counts == 3],
+        [values[:, 0], values[:, 0] + values[:, 1] / 60, values[:, 0] * 60 + values[:, 1] + values[:, 2] / 60],
+        default=0.0
+    )
+    return pd.Series(np.nan_to_num(converted, nan=0.0), index=minutes.index, dtype='float64')
+
+# Function to read and concatenate the raw files of a table
+# With the partitioned layout enabled, boxscore tables are read from the season's partitions in the lake instead
+def read_raw_table(script_env, table, season):
+    spec = PROCESSED_TABLES[table]
+    box_type = spec.get('box_type')
+    if box_type is not None and script_env.partitioned_layout and script_env.partition_dir(season).exists():
+        partition_files = find_frame_files(script_env.partition_dir(season), f"season_type=*/box_type={box_type}/game_month=*/part-*")
+        if partition_files:
+            return read_partitioned_boxscores(script_env, box_type, seasons=[season]), partition_files
+    raw_files = find_raw_files(script_env, spec['source'], season)
+    if not raw_files:
+        raise FileNotFoundError(f"No raw {spec['source']} files for {season} in {script_env.raw_dir}")
+    raw_df = pd.concat([read_frame(f, spec.get('box_type')) for f in raw_files], ignore_index=True)
+    return raw_df, raw_files
+
+# Function to apply a table's transformation to its raw rows: filter, select and rename columns, and convert minutes
+# Where raw files overlap (e.g. a game in both the season file and a delta file), the last row for each key is kept
+# Columns missing from the raw files (e.g. GREATEST_75_FLAG for older players files) are added as nulls with a warning
+def transform_table(table, raw_df):
+    spec = PROCESSED_TABLES[table]
+    if 'filter' in spec:
+        column, value = spec['filter']
+        raw_df = raw_df[raw_df[column] == value]
+
+    selected = {}
+    for raw_name, _, processed_name in spec_columns(spec):
+        if raw_name not in raw_df.columns:
+            logging.warning(f"{table}: raw column {raw_name} not found; writing it as nulls.")
+            selected[processed_name] = pd.Series(pd.NA, index=raw_df.index, dtype='object')
+            continue
+        selected[processed_name] = raw_df[raw_name]
+    df = pd.DataFrame(selected)
+
+    if 'MIN' in df.columns:
+        df['MIN'] = convert_minutes(df['MIN'])
+    for column in [processed_name for _, sql_type, processed_name in spec_columns(spec) if sql_type == 'DATE']:
+        df[column] = pd.to_datetime(df[column], errors='coerce', format='mixed').dt.normalize()
+    if 'GAME_ID' in df.columns:
+        df['GAME_ID'] = df['GAME_ID'].astype('string').str.zfill(10)
+    return df.drop_duplicates(subset=spec['keys'], keep='last').reset_index(drop=True)
+
+# Function to get the path (without a suffix) of a processed table, e.g. data/processed/TRADITIONAL_PROCESSED_2024_25
+# Rollups and other tables without the _PROCESSED suffix are named in full, e.g. ('TEAM_GAME_ROLLUP', suffix="")
+def get_processed_path_stem(script_env, table, season, suffix="_PROCESSED"):
+    return script_env.processed_dir / f"{table}{suffix}_{season.replace('-', '_')}"
+
+# Function to read a processed table written by this script, taking the newest file if it was written in more than one format
+# Returns None instead of raising when missing_ok is set, e.g. for a rollup table before its first run
+def read_processed_table(script_env, table, season, suffix="_PROCESSED", missing_ok=False):
+    stem = get_processed_path_stem(script_env, table, season, suffix)
+    processed_files = find_frame_files(stem.parent, f"{stem.name}.*")
+    if not processed_files:
+        if missing_ok:
+            return None
+        raise FileNotFoundError(f"No processed {table} table for {season} in {script_env.processed_dir}")
+    return read_frame(max(processed_files, key=lambda f: f.stat().st_mtime))
+
+#################################### Derived Tables ####################################
+# Boxscore tables joined into the wide player-game table, in order of priority, matching PLAYER_GAME_SOURCES in "Data Transformations.py"
+# A column found in more than one table (e.g. MIN, TEAM_ID, PTS, AST, FG_PCT, USG_PCT) is taken from the first table that has it
+PLAYER_GAME_SOURCES = ['TRADITIONAL', 'ADVANCED', 'USAGE', 'SCORING', 'PLAYERTRACK', 'HUSTLE']
+
+# Function to build one wide, deduplicated player-game table from the six processed boxscore tables and the schedule
+# Traditional boxscores list every player of each game, so they set the rows and the other tables are left joined onto them
+# Rows are sorted by game date and player, so Parquet row groups hold contiguous dates for readers filtering on them
+def build_player_game_table(script_env, season):
+    keys = ['GAME_ID', 'PLAYER_ID']
+    wide_df = None
+    for source in PLAYER_GAME_SOURCES:
+        source_df = read_processed_table(script_env, source, season).drop_duplicates(subset=keys, keep='last')
+        if wide_df is None:
+            wide_df = source_df
+            continue
+        new_columns = [c for c in source_df.columns if c not in wide_df.columns]
+        wide_df = wide_df.merge(source_df[keys + new_columns], on=keys, how='left')
+
+    # Add the game date and season from the schedule
+    schedule_df = read_processed_table(script_env, 'SCHEDULE', season)[['GAME_ID', 'GAME_DATE', 'SEASON']]
+    wide_df = wide_df.merge(schedule_df, on='GAME_ID', how='left')
+    wide_df = wide_df[['GAME_DATE', 'SEASON'] + [c for c in wide_df.columns if c not in ('GAME_DATE', 'SEASON')]]
+    return wide_df.sort_values(['GAME_DATE', 'PLAYER_ID'], kind='stable').reset_index(drop=True)
+
+# Tables built from the processed tables rather than from raw files, run once those have all been written
+DERIVED_TABLES = {
+    'PLAYER_GAME': build_player_game_table
+}
+
+#################################### Rollups ####################################
+# Counting stats totalled in the rollups, rate stats averaged over games played, and stats averaged over rolling windows of games played
+# These match the rollups in "Data Transformations.py"
+ROLLUP_SUM_COLUMNS = ['MIN', 'PTS', 'REB', 'OREB', 'DREB', 'AST', 'STL', 'BLK', 'TO', 'PF', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA']
+ROLLUP_AVG_COLUMNS = ['PLUS_MINUS', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'USG_PCT', 'PACE', 'PIE']
+ROLLING_COLUMNS = ['MIN', 'PTS', 'REB', 'AST', 'STL', 'BLK', 'TO', 'FG3M', 'PLUS_MINUS', 'USG_PCT']
+ROLLING_WINDOWS = [5, 10, 20]
+
+# Function to divide two columns, giving 0 where the divisor is 0 like Snowflake's DIV0
+def div0(numerator, denominator):
+    numerator, denominator = numerator.astype('float64'), denominator.astype('float64')
+    return (numerator / denominator.where(denominator != 0)).where(denominator != 0, 0.0)
+
+# Function to add shooting percentages calculated from totals rather than averaged from per-game percentages
+def add_shooting_percentages(df, prefix=""):
+    df[f"{prefix}FG_PCT"] = div0(df[f"{prefix}FGM"], df[f"{prefix}FGA"])
+    df[f"{prefix}FG3_PCT"] = div0(df[f"{prefix}FG3M"], df[f"{prefix}FG3A"])
+    df[f"{prefix}FT_PCT"] = div0(df[f"{prefix}FTM"], df[f"{prefix}FTA"])
+    df[f"{prefix}TS_PCT"] = div0(df[f"{prefix}PTS"], 2 * (df[f"{prefix}FGA"] + 0.44 * df[f"{prefix}FTA"]))
+    return df
+
+# Function to replace the rows of an existing table that share keys with the new rows, and add the rest
+def merge_rows(existing_df, new_df, keys):
+    if existing_df is None:
+        return new_df
+    replaced = existing_df.set_index(keys).index.isin(new_df.set_index(keys).index)
+    return pd.concat([existing_df[~replaced], new_df], ignore_index=True)
+
+# Function to build the rollup tables from the wide player-game table, as rollup_changes does in "Data Transformations.py":
+#   TEAM_GAME_ROLLUP      - team totals per game, with the opponent's points and the result
+#   TEAM_SEASON_ROLLUP    - team per-game averages, record and shooting for the season
+#   PLAYER_SEASON_ROLLUP  - player totals, per-game averages and shooting for the season
+#   PLAYER_ROLLING_ROLLUP - player averages over their last 5, 10 and 20 games played, as of each game
+# Games already rolled up are listed in ROLLUP_GAMES, so in merge mode only the teams and players with new games are recomputed
+# (rolling windows from each player's first new game onwards) and merged into the existing rollups
+# Games without a game date (not in the schedule yet) are left out and not recorded in ROLLUP_GAMES, so they are rolled up
+# by a later run once the schedule has their date
+# Returns the number of rows written to each rollup table
+def run_local_rollups(script_env, season, file_format='parquet', mode='overwrite'):
+    merge = mode == 'merge'
+    read_existing = lambda table: read_processed_table(script_env, table, season, suffix="", missing_ok=True) if merge else None
+    wide_df = read_processed_table(script_env, 'PLAYER_GAME', season)
+    undated = wide_df['GAME_DATE'].isna()
+    if undated.any():
+        logging.warning(f"Skipping {wide_df.loc[undated, 'GAME_ID'].nunique()} games with no game date in the schedule; they are rolled up once they have one.")
+        wide_df = wide_df[~undated]
+    rolled_up_df = read_existing('ROLLUP_GAMES')
+    new_game_ids = set(wide_df['GAME_ID']) - (set(rolled_up_df['GAME_ID']) if rolled_up_df is not None else set())
+    if not new_game_ids:
+        logging.info(f"No new games to roll up ({mode} mode); the rollup tables are unchanged.")
+        return {}
+    new_rows_df = wide_df[wide_df['GAME_ID'].isin(new_game_ids)]
+    logging.info(f"Rolling up {len(new_game_ids)} new games ({mode} mode)")
+    rollups = {}
+
+    # Team totals for each new game, with the opponent's points from the other team's row of the same game
+    team_game_df = new_rows_df.groupby(['GAME_ID', 'GAME_DATE', 'SEASON', 'TEAM_ID'], as_index=False)[ROLLUP_SUM_COLUMNS].sum()
+    game_groups = team_game_df.groupby('GAME_ID')
+    two_teams = game_groups['TEAM_ID'].transform('size') == 2
+    team_game_df['OPP_TEAM_ID'] = (game_groups['TEAM_ID'].transform('sum') - team_game_df['TEAM_ID']).where(two_teams)
+    team_game_df['OPP_PTS'] = (game_groups['PTS'].transform('sum') - team_game_df['PTS']).where(two_teams)
+    team_game_df['WIN'] = (team_game_df['PTS'] > team_game_df['OPP_PTS']).fillna(False).astype('int64')
+    rollups['TEAM_GAME_ROLLUP'] = merge_rows(read_existing('TEAM_GAME_ROLLUP'), add_shooting_percentages(team_game_df), ['GAME_ID', 'TEAM_ID']) \
+        .sort_values(['GAME_DATE', 'TEAM_ID'], kind='stable')
+
+    # Team seasons with new games, recomputed from all of their games in the team-game rollup
+    team_keys = team_game_df[['SEASON', 'TEAM_ID']].drop_duplicates()
+    team_games_df = rollups['TEAM_GAME_ROLLUP'].merge(team_keys, on=['SEASON', 'TEAM_ID'])
+    team_groups = team_games_df.groupby(['SEASON', 'TEAM_ID'])
+    team_season_df = pd.concat([
+        team_groups.size().rename('GAMES'),
+        team_groups['WIN'].sum().rename('WINS'),
+        team_groups['GAME_DATE'].max().rename('LAST_GAME_DATE'),
+        team_groups[ROLLUP_SUM_COLUMNS].sum().add_prefix('TOTAL_'),
+        team_groups[ROLLUP_SUM_COLUMNS].mean().add_suffix('_PER_GAME'),
+        team_groups['OPP_PTS'].mean().rename('OPP_PTS_PER_GAME')
+    ], axis=1).reset_index()
+    team_season_df.insert(team_season_df.columns.get_loc('WINS') + 1, 'LOSSES', team_season_df['GAMES'] - team_season_df['WINS'])
+    rollups['TEAM_SEASON_ROLLUP'] = merge_rows(read_existing('TEAM_SEASON_ROLLUP'), add_shooting_percentages(team_season_df, "TOTAL_"), ['SEASON', 'TEAM_ID'])
+
+    # Player seasons with new games, recomputed from all of their games played
+    played_df = wide_df[wide_df['MIN'] > 0]
+    player_keys = new_rows_df[['SEASON', 'PLAYER_ID']].drop_duplicates()
+    player_groups = played_df.merge(player_keys, on=['SEASON', 'PLAYER_ID']).groupby(['SEASON', 'PLAYER_ID'])
+    player_season_df = pd.concat([
+        player_groups['GAME_ID'].nunique().rename('GAMES'),
+        player_groups['GAME_DATE'].max().rename('LAST_GAME_DATE'),
+        player_groups[ROLLUP_SUM_COLUMNS].sum().add_prefix('TOTAL_'),
+        player_groups[ROLLUP_SUM_COLUMNS].mean().add_suffix('_PER_GAME'),
+        player_groups[ROLLUP_AVG_COLUMNS].mean().add_prefix('AVG_')
+    ], axis=1).reset_index()
+    rollups['PLAYER_SEASON_ROLLUP'] = merge_rows(read_existing('PLAYER_SEASON_ROLLUP'), add_shooting_percentages(player_season_df, "TOTAL_"), ['SEASON', 'PLAYER_ID'])
+
+    # Rolling windows over each player's games played, recomputed from the player's first new game onwards
+    first_new_dates = new_rows_df[new_rows_df['MIN'] > 0].groupby('PLAYER_ID')['GAME_DATE'].min().astype(wide_df['GAME_DATE'].dtype)
+    history_df = played_df[played_df['PLAYER_ID'].isin(first_new_dates.index)].sort_values(['PLAYER_ID', 'GAME_DATE', 'GAME_ID'], kind='stable')
+    rolling_df = history_df[['GAME_ID', 'GAME_DATE', 'SEASON', 'PLAYER_ID', 'TEAM_ID']].copy()
+    history_groups = history_df[ROLLING_COLUMNS + ['FGM', 'FGA']].astype('float64').groupby(history_df['PLAYER_ID'])
+    for window_size in ROLLING_WINDOWS:
+        window_means = history_groups.rolling(window_size, min_periods=1).mean().reset_index(level=0, drop=True)
+        window_sums = history_groups[['FGM', 'FGA']].rolling(window_size, min_periods=1).sum().reset_index(level=0, drop=True)
+        for column in ROLLING_COLUMNS:
+            rolling_df[f"{column}_LAST_{window_size}"] = window_means[column]
+        rolling_df[f"FG_PCT_LAST_{window_size}"] = div0(window_sums['FGM'], window_sums['FGA'])
+    rolling_df = rolling_df[rolling_df['GAME_DATE'] >= rolling_df['PLAYER_ID'].map(first_new_dates)]
+    rollups['PLAYER_ROLLING_ROLLUP'] = merge_rows(read_existing('PLAYER_ROLLING_ROLLUP'), rolling_df, ['GAME_ID', 'PLAYER_ID']) \
+        .sort_values(['GAME_DATE', 'PLAYER_ID'], kind='stable')
+
+    # Record the games rolled up, last, so a failed run rolls the same games up again
+    rollups['ROLLUP_GAMES'] = merge_rows(rolled_up_df, pd.DataFrame({'GAME_ID': sorted(new_game_ids), 'ROLLED_UP_AT': pd.Timestamp.now()}), ['GAME_ID'])
+
+    row_counts = {}
+    for table, df in rollups.items():
+        output_path = write_frame(df.reset_index(drop=True), get_processed_path_stem(script_env, table, season, suffix=""), file_format)
+        row_counts[table] = len(df)
+        logging.info(f"{table}: {len(df)} rows in {output_path.name}")
+    return row_counts
+
+#################################### Running Transformations ####################################
+# Function to transform one table for a season and write it to the processed folder
+# Returns the output path, the number of rows written and the duration in seconds
+def run_local_transformation(script_env, table, season, file_format='parquet'):
+    start = perf_counter()
+    if table in DERIVED_TABLES:
+        df = DERIVED_TABLES[table](script_env, season)
+        source_text = "processed tables"
+    else:
+        raw_df, raw_files = read_raw_table(script_env, table, season)
+        df = transform_table(table, raw_df)
+        source_text = f"{len(raw_df)} raw rows from {len(raw_files)} files"
+    output_path = write_frame(df, get_processed_path_stem(script_env, table, season), file_format)
+    logging.info(f"{table}: {source_text} -> {len(df)} rows in {output_path.name}")
+    return output_path, len(df), perf_counter() - start
+
+# Function to transform several tables at once in a thread pool (file reads and writes release the GIL)
+# Returns the duration of each table that succeeded and the error of each table that failed, as in "Data Transformations.py"
+def run_local_transformations(script_env, tables, season, file_format='parquet', max_workers=4):
+    timings, errors = {}, {}
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_local_transformation, script_env, table, season, file_format): table for table in tables}
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                _, _, timings[table] = future.result()
+                logging.info(f"{table} transformed in {timings[table]:.2f}s")
+            except Exception as e:
+                errors[table] = e
+                logging.error(f"Error transforming {table}: {e}")
+    logging.info(f"Transformed {len(timings)} tables in {perf_counter() - start:.2f}s (table times add up to {sum(timings.values()):.2f}s).")
+    return timings, errors
+
+# Main function to run the script
+def main():
+    default_season, _ = get_season_config()
+    parser = argparse.ArgumentParser(description="Run the processed-table transformations locally on the raw files.")
+    parser.add_argument("--season", default=default_season, help="Season to transform, e.g. 2024-25")
+    parser.add_argument("--tables", nargs="+", default=list(PROCESSED_TABLES) + list(DERIVED_TABLES) + ['ROLLUPS'], choices=list(PROCESSED_TABLES) + list(DERIVED_TABLES) + ['ROLLUPS'], help="Tables to transform")
+    parser.add_argument("--format", default='parquet', choices=FILE_FORMATS, help="File format of the processed tables")
+    parser.add_argument("--workers", type=int, default=4, help="Number of tables transformed at once")
+    parser.add_argument("--mode", default='overwrite', choices=['overwrite', 'merge'], help="merge only rolls up games added since the last run; other tables are always rebuilt")
+    args = parser.parse_args()
+
+    script_env = initialize_script_environment(log_suffix="_local_transformations")
+    logging.info(f"Starting local transformations for {args.season}...")
+
+    base_tables = [table for table in args.tables if table in PROCESSED_TABLES]
+    derived_tables = [table for table in args.tables if table in DERIVED_TABLES]
+    _, errors = run_local_transformations(script_env, base_tables, args.season, args.format, args.workers)
+
+    # Derived tables are only built once every table they read is up to date
+    if derived_tables and not errors:
+        _, errors = run_local_transformations(script_env, derived_tables, args.season, args.format, args.workers)
+    elif derived_tables:
+        logging.error(f"Skipping derived tables {derived_tables} because some processed tables failed.")
+
+    # Rollups read the wide player-game table
+    if 'ROLLUPS' in args.tables and not errors:
+        rollup_start = perf_counter()
+        try:
+            run_local_rollups(script_env, args.season, args.format, args.mode)
+            logging.info(f"ROLLUPS transformed in {perf_counter() - rollup_start:.2f}s")
+        except Exception as e:
+            errors = {'ROLLUPS': e}
+            logging.error(f"Error building rollups: {e}")
+    if errors:
+        logging.error(f"Failed tables: {sorted(errors)}")
+        raise SystemExit(1)
+    logging.info("Local transformations complete.")
+
+if __name__ == "__main__":
+    main()
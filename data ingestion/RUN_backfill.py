@@ -0,0 +1,182 @@
+#################################### Running a Multi-Season Boxscore Backfill ####################################
+# Run this script to load boxscores for a range of seasons in one unattended run, e.g.
+#   python RUN_backfill.py --start-season 2015-16 --end-season 2024-25
+#   python RUN_backfill.py --start-season 2019-20 --end-season 2019-20 --season-types Playoffs --processes 2
+# Each season's remaining games are split into work units of up to --unit-size games and run across a pool of worker processes
+# Every process draws from one shared rate budget (REQUESTS_PER_SECOND) and records its results in the shared checkpoint manifest,
+# so rerunning the same command after a restart only fetches the games the manifest does not have complete
+# Workers send their run metrics back with each unit, so the exported metrics cover every process
+import os
+import argparse
+import logging
+from time import monotonic
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import (
+    initialize_script_environment,
+    set_rate_limiter,
+    SharedTokenBucket,
+    CheckpointManifest,
+    get_season_range,
+    get_all_game_ids,
+    fetch_season_boxscores,
+    consolidate_boxscore_checkpoints,
+    update_partitioned_layout,
+    find_frame_files,
+    SEASON_TYPE_GAME_ID_PREFIXES,
+    export_run_metrics,
+    RUN_METRICS,
+    BOXSCORE_TYPES,
+    REQUESTS_PER_SECOND
+)
+
+# Set in each worker process by init_backfill_worker
+WORKER_SCRIPT_ENV = None
+
+# Function to set up a worker process with the shared rate limiter and its own log file
+# Run metrics start empty, since the parent's (planning calls and stages) are copied when the process is forked
+# and would otherwise be sent back with the worker's first unit and counted twice
+def init_backfill_worker(rate_limiter):
+    global WORKER_SCRIPT_ENV
+    RUN_METRICS.reset()
+    set_rate_limiter(rate_limiter)
+    WORKER_SCRIPT_ENV = initialize_script_environment(log_suffix=f"_backfill_worker_{os.getpid()}", evict_cache=False)
+
+# Function to run one work unit in a worker process
+# Returns the unit, the number of games for which every requested boxscore type was fetched, and the unit's run metrics
+def run_backfill_unit(unit, threads):
+    with RUN_METRICS.stage("fetch_boxscores"):
+        completed_game_ids = fetch_season_boxscores(
+            unit['season'], unit['season_types'], WORKER_SCRIPT_ENV,
+            max_workers=threads,
+            game_ids=unit['game_ids'],
+            checkpoint_dir=WORKER_SCRIPT_ENV.backfill_checkpoints_dir / unit['season'],
+            file_tag=unit['file_tag'],
+            box_types_by_game=unit['box_types_by_game']
+        )
+    return unit, len(completed_game_ids), RUN_METRICS.take_snapshot()
+
+# Function to split each season's games that the manifest does not have complete into work units
+# File tags include the run stamp, so units planned after a restart never overwrite checkpoints from an earlier run
+def plan_backfill_units(seasons, season_types, manifest, unit_size):
+    run_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    units = []
+    season_totals = {}
+    for season in seasons:
+        game_ids = sorted(str(game_id) for game_id in get_all_game_ids(season, season_types))
+        completed_game_ids = manifest.completed_game_ids(season)
+        missing_box_types = manifest.missing_box_types(season)
+        remaining_game_ids = [game_id for game_id in game_ids if game_id not in completed_game_ids]
+        season_totals[season] = (len(game_ids), len(remaining_game_ids))
+        logging.info(f"{season}: {len(game_ids)} games, {len(game_ids) - len(remaining_game_ids)} already complete, {len(remaining_game_ids)} to fetch.")
+
+        for start_idx in range(0, len(remaining_game_ids), unit_size):
+            unit_game_ids = remaining_game_ids[start_idx:start_idx + unit_size]
+            units.append({
+                'season': season,
+                'season_types': season_types,
+                'game_ids': unit_game_ids,
+                'box_types_by_game': {game_id: missing_box_types[game_id] for game_id in unit_game_ids if game_id in missing_box_types},
+                'file_tag': f"{run_stamp}_{start_idx // unit_size + 1:04d}_"
+            })
+    return units, season_totals
+
+# Function to check whether a season has checkpoints newer than its consolidated raw files
+def season_needs_consolidation(script_env, season):
+    checkpoint_files = find_frame_files(script_env.backfill_checkpoints_dir / season, "boxscore_*")
+    if not checkpoint_files:
+        return False
+    raw_files = [f for k in BOXSCORE_TYPES for f in find_frame_files(script_env.raw_dir, f"boxscore_{k}_{season}.*")]
+    if not raw_files:
+        return True
+    return max(f.stat().st_mtime for f in checkpoint_files) > min(f.stat().st_mtime for f in raw_files)
+
+# Function to consolidate every backfill checkpoint of a season into boxscore_{k}_{season} raw files
+# Checkpoints are kept rather than archived, so a later restart consolidates old and new checkpoints together
+def consolidate_backfill_season(script_env, manifest, season, season_types):
+    with RUN_METRICS.stage("consolidate"):
+        output_paths = consolidate_boxscore_checkpoints(script_env.backfill_checkpoints_dir / season, script_env.raw_dir, season, file_tag="*_")
+        update_partitioned_layout(script_env, season, season_types, output_paths, replace=True)
+    manifest.log_summary(season)
+
+# Function to format a number of seconds as h:mm:ss for progress messages
+def format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+# Main function to run the script
+def main():
+    parser = argparse.ArgumentParser(description="Backfill boxscores for a range of NBA seasons.")
+    parser.add_argument("--start-season", required=True, help="First season to load, e.g. 2015-16")
+    parser.add_argument("--end-season", required=True, help="Last season to load, e.g. 2024-25")
+    parser.add_argument("--season-types", nargs="+", default=['Regular Season', 'Playoffs'], choices=list(SEASON_TYPE_GAME_ID_PREFIXES), help="Season types to load")
+    parser.add_argument("--processes", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--threads", type=int, default=2, help="Number of games fetched at once within each worker process")
+    parser.add_argument("--unit-size", type=int, default=100, help="Number of games in each work unit")
+    args = parser.parse_args()
+
+    script_env = initialize_script_environment(log_suffix="_backfill")
+    seasons = get_season_range(args.start_season, args.end_season)
+    logging.info(f"Starting boxscore backfill for {len(seasons)} seasons ({seasons[0]} to {seasons[-1]}), {', '.join(args.season_types)}...")
+
+    try:
+        manifest = CheckpointManifest(script_env.manifest_path)
+        for season in seasons:
+            (script_env.backfill_checkpoints_dir / season).mkdir(exist_ok=True)
+        with RUN_METRICS.stage("plan"):
+            units, season_totals = plan_backfill_units(seasons, args.season_types, manifest, args.unit_size)
+        units_left = {season: 0 for season in seasons}
+        for unit in units:
+            units_left[unit['season']] += 1
+
+        # Seasons already complete in the manifest may still need consolidating if an earlier run stopped before doing so
+        for season in seasons:
+            if units_left[season] == 0 and season_needs_consolidation(script_env, season):
+                consolidate_backfill_season(script_env, manifest, season, args.season_types)
+
+        if not units:
+            logging.info("Every game in the requested seasons is already complete. Nothing to backfill.")
+            return
+
+        total_games = sum(len(unit['game_ids']) for unit in units)
+        logging.info(f"Planned {len(units)} work units covering {total_games} games across {args.processes} worker processes.")
+        games_done = {season: 0 for season in seasons}
+        start_time = monotonic()
+        rate_limiter = SharedTokenBucket(REQUESTS_PER_SECOND)
+        set_rate_limiter(rate_limiter) # So the exported request rate is the shared one
+
+        with RUN_METRICS.stage("backfill"), ProcessPoolExecutor(max_workers=args.processes, initializer=init_backfill_worker, initargs=(rate_limiter,)) as pool:
+            futures = {pool.submit(run_backfill_unit, unit, args.threads): unit for unit in units}
+            for future in as_completed(futures):
+                unit = futures[future]
+                season = unit['season']
+                try:
+                    _, completed_count, unit_metrics = future.result()
+                    RUN_METRICS.merge(unit_metrics)
+                    if completed_count < len(unit['game_ids']):
+                        logging.warning(f"{season} unit {unit['file_tag'].rstrip('_')}: {len(unit['game_ids']) - completed_count} games incomplete; they will be retried on the next run.")
+                except Exception as e:
+                    logging.error(f"{season} unit {unit['file_tag'].rstrip('_')} failed: {e}. Its games will be retried on the next run.")
+
+                # Progress and ETA per season, using the overall game throughput so far
+                games_done[season] += len(unit['game_ids'])
+                units_left[season] -= 1
+                elapsed = monotonic() - start_time
+                games_per_second = sum(games_done.values()) / elapsed
+                season_total, season_remaining = season_totals[season]
+                season_left = season_remaining - games_done[season]
+                overall_left = total_games - sum(games_done.values())
+                logging.info(
+                    f"{season}: {season_total - season_left}/{season_total} games processed, ETA {format_duration(season_left / games_per_second)}. "
+                    f"Overall: {total_games - overall_left}/{total_games} games, {games_per_second * 60:.1f} games/min, {rate_limiter.current_rate:.2f} requests/s, ETA {format_duration(overall_left / games_per_second)}."
+                )
+
+                if units_left[season] == 0:
+                    consolidate_backfill_season(script_env, manifest, season, args.season_types)
+
+        logging.info(f"Boxscore backfill complete in {format_duration(monotonic() - start_time)}.")
+    finally:
+        export_run_metrics(script_env, "RUN_backfill")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,15 @@
-import pandas as pd
 import logging
-import datetime
 from config import (
     get_season_config,
     initialize_script_environment,
-    fetch_season_boxscores
+    fetch_season_boxscores,
+    consolidate_boxscore_checkpoints,
+    update_partitioned_layout,
+    archive_checkpoint_files,
+    CheckpointManifest,
+    export_run_metrics,
+    RUN_METRICS,
+    BOXSCORE_TYPES
 )
 
 # Main function to run the script
@@ -13,60 +18,32 @@ def main():
     script_env = initialize_script_environment()
     logging.info("Starting data ingestion...")
     
-    # Fetch boxscore data in chunks and save checkpoints
-    season, season_types = get_season_config()
-    fetch_season_boxscores(season, season_types, script_env)
-
-    # Consolidate all boxscore checkpoints
-    logging.info("Consolidating boxscore checkpoint files...")
-    consolidated_boxscore_data = {k: [] for k in ['advanced','hustle','scoring','traditional','playertrack','usage']}
-    
-    # Collect all checkpoint files and retry files
-    for k in consolidated_boxscore_data.keys():
-        checkpoint_files = list(script_env.boxscore_checkpoints_dir.glob(f"boxscore_{k}_chunk_*.csv"))
-        retried_file = script_env.boxscore_checkpoints_dir / f"boxscore_{k}_retried.csv"
-        
-        if retried_file.exists():
-            checkpoint_files.append(retried_file)
-
-        if checkpoint_files:
-            list_dfs = []
-            for f in checkpoint_files:
-                try:
-                    df = pd.read_csv(f)
-                    list_dfs.append(df)
-                except Exception as e:
-                    logging.error(f"Error reading checkpoint file {f}: {e}")
-            if list_dfs:
-                consolidated_boxscore_data[k] = pd.concat(list_dfs, ignore_index=True)
-                logging.info(f"Consolidated {len(list_dfs)} files for {k}.")
-            else:
-                consolidated_boxscore_data[k] = pd.DataFrame()
-        else:
-            consolidated_boxscore_data[k] = pd.DataFrame()
-
-    # Save Consolidated Boxscore Data
-    for k, df in consolidated_boxscore_data.items():
-        if not df.empty:
-            final_path = script_env.raw_dir / f"boxscore_{k}_{season}.csv"
-            df.to_csv(final_path, index=False)
-            logging.info(f"Consolidated boxscore data for {k} saved to {final_path}")
-        else:
-            logging.warning(f"No consolidated data for {k} to save.")
-
-    # Move checkpoint files to a subfolder within boxscore_checkpoints_dir
-    logging.info("Moving boxscore checkpoint files to a subfolder.")
-    current_run_checkpoint_folder = script_env.boxscore_checkpoints_dir / datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    current_run_checkpoint_folder.mkdir(exist_ok=True)
-
-    for f in script_env.boxscore_checkpoints_dir.glob("boxscore_*.csv"):
-        try:
-            f.rename(current_run_checkpoint_folder / f.name)
-            logging.info(f"Moved {f.name} to {current_run_checkpoint_folder.name}")
-        except Exception as e:
-            logging.error(f"Error moving file {f.name}: {e}")
+    # Metrics are exported even if a stage fails, so the failing run can still be inspected
+    try:
+        # Fetch boxscore data in chunks and save checkpoints
+        season, season_types = get_season_config()
+        with RUN_METRICS.stage("fetch_boxscores"):
+            completed_game_ids = fetch_season_boxscores(season, season_types, script_env)
+        logging.info(f"{len(completed_game_ids)} games fetched with every boxscore type.")
+
+        # Consolidate all boxscore checkpoints and save consolidated boxscore data, also partitioned by month when enabled
+        with RUN_METRICS.stage("consolidate"):
+            output_paths = consolidate_boxscore_checkpoints(script_env.boxscore_checkpoints_dir, script_env.raw_dir, season)
+            update_partitioned_layout(script_env, season, season_types, output_paths, replace=True)
+
+        # Move this run's chunk and retried checkpoint files to a subfolder within boxscore_checkpoints_dir
+        # Checkpoints an interrupted RUN_incremental left in the same folder are kept for it to consolidate
+        archive_checkpoint_files(
+            script_env.boxscore_checkpoints_dir,
+            [f"boxscore_{k}_{name}" for k in BOXSCORE_TYPES for name in ("chunk_*", "retried.*")]
+        )
+
+        # Log how complete the season is; games recorded as failed are picked up by RERUN_off_checkpoints
+        CheckpointManifest(script_env.manifest_path).log_summary(season)
+    finally:
+        export_run_metrics(script_env, "RUN_boxscore")
 
     logging.info("Boxscore data ingestion complete.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,75 @@
+#################################### Running Incremental Boxscore Ingestion ####################################
+# Run this script on a schedule (e.g. daily) during the season to ingest only the games that have finished since the last run
+# Finished games are taken from the NBA schedule (game status and date) and compared with the games the checkpoint manifest has complete,
+# so a daily run fetches boxscores for roughly 10 games instead of the full season
+import logging
+from datetime import datetime
+from config import (
+    get_season_config,
+    initialize_script_environment,
+    get_new_final_game_ids,
+    fetch_season_boxscores,
+    consolidate_boxscore_checkpoints,
+    update_partitioned_layout,
+    archive_checkpoint_files,
+    find_frame_files,
+    export_run_metrics,
+    RUN_METRICS
+)
+
+# Function to consolidate the new games' checkpoints into a dated delta file per boxscore type and archive them
+# e.g. boxscore_traditional_incremental_2024-25_20250410_060000.csv, which is also added to the partitioned layout when enabled
+def consolidate_incremental_checkpoints(script_env, season, season_types):
+    run_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_paths = consolidate_boxscore_checkpoints(script_env.boxscore_checkpoints_dir, script_env.raw_dir, f"incremental_{season}_{run_stamp}", file_tag="incremental_")
+    update_partitioned_layout(script_env, season, season_types, output_paths)
+    archive_checkpoint_files(script_env.boxscore_checkpoints_dir, "boxscore_*_incremental_*", folder_suffix="_incremental")
+
+# Main function to run the script
+def main():
+    script_env = initialize_script_environment()
+    logging.info("Starting incremental boxscore ingestion...")
+
+    try:
+        season, season_types = get_season_config()
+
+        # Games are recorded in the manifest as soon as their checkpoints are written, so checkpoints left by
+        # an interrupted run are consolidated first rather than being overwritten by this run's chunks
+        if find_frame_files(script_env.boxscore_checkpoints_dir, "boxscore_*_incremental_chunk_*"):
+            logging.warning("Found checkpoints from an interrupted incremental run; consolidating them first.")
+            with RUN_METRICS.stage("consolidate"):
+                consolidate_incremental_checkpoints(script_env, season, season_types)
+
+        with RUN_METRICS.stage("find_new_games"):
+            new_game_ids = get_new_final_game_ids(season, season_types, script_env)
+
+        if new_game_ids is None:
+            logging.error("Incremental ingestion aborted because the schedule could not be fetched.")
+            return
+        if not new_game_ids:
+            logging.info("No games have finished since the last run. Nothing to ingest.")
+            return
+
+        # Fetch boxscores for the new games only, keeping their checkpoints separate from full-season runs
+        with RUN_METRICS.stage("fetch_boxscores"):
+            completed_game_ids = fetch_season_boxscores(
+                season, season_types, script_env,
+                game_ids=new_game_ids,
+                file_tag="incremental_"
+            )
+
+        # Consolidate the new games into a dated delta file per boxscore type
+        with RUN_METRICS.stage("consolidate"):
+            consolidate_incremental_checkpoints(script_env, season, season_types)
+
+        # Games missing any boxscore type are not complete in the manifest, so they are picked up again next run
+        skipped_game_ids = set(new_game_ids) - completed_game_ids
+        if skipped_game_ids:
+            logging.warning(f"{len(skipped_game_ids)} games were not fully ingested and will be retried next run: {sorted(skipped_game_ids)}")
+    finally:
+        export_run_metrics(script_env, "RUN_incremental")
+
+    logging.info("Incremental boxscore ingestion complete.")
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,46 @@
 #################################### Running Data Ingestion for Players and Teams ####################################
 # This script is responsible for gathering all player and team information for the NBA season.
+# Player and team records are kept in a cross-season store under data/dimensions and only refetched when they may have changed
+# Pass --full-refresh to refetch every player and team for the season
 
+import argparse
 import logging
 from config import (
     get_season_config,
     initialize_script_environment,
     get_all_players_info,
-    get_all_teams_info
+    get_all_teams_info,
+    write_frame,
+    export_run_metrics,
+    RUN_METRICS,
+    OUTPUT_FORMAT
 )
 
 # Main function to run the script
 def main():
+    parser = argparse.ArgumentParser(description="Gather player and team information for the NBA season.")
+    parser.add_argument("--full-refresh", action="store_true", help="Refetch every player and team instead of only new or changed ones")
+    args = parser.parse_args()
+
     # Initialize logging and script paths
     script_env = initialize_script_environment()
     logging.info("Starting data ingestion...")
     season, season_types = get_season_config()
-    all_players = get_all_players_info(season, season_types)
-    all_teams = get_all_teams_info(season, season_types)
+    try:
+        with RUN_METRICS.stage("fetch_players"):
+            all_players = get_all_players_info(season, season_types, script_env, full_refresh=args.full_refresh)
+        with RUN_METRICS.stage("fetch_teams"):
+            all_teams = get_all_teams_info(season, season_types, script_env, full_refresh=args.full_refresh)
 
-    # Save player info
-    all_players.to_csv(script_env.raw_dir / f"all_players_{season}.csv", index=False)
-    logging.info(f"Saved player info to {script_env.raw_dir / f'all_players_{season}.csv'}")
+        # Save player info
+        players_path = write_frame(all_players, script_env.raw_dir / f"all_players_{season}", OUTPUT_FORMAT)
+        logging.info(f"Saved player info to {players_path}")
 
-    # Save team info (including team names, cities, etc.)
-    all_teams.to_csv(script_env.raw_dir / f"all_teams_{season}.csv", index=False)
-    logging.info(f"Saved team info to {script_env.raw_dir / f'all_teams_{season}.csv'}")
+        # Save team info (including team names, cities, etc.)
+        teams_path = write_frame(all_teams, script_env.raw_dir / f"all_teams_{season}", OUTPUT_FORMAT)
+        logging.info(f"Saved team info to {teams_path}")
+    finally:
+        export_run_metrics(script_env, "RUN_info")
 
     logging.info("Data ingestion complete.")
 
@@ -0,0 +1,194 @@
+#################################### Benchmarking Ingestion Throughput ####################################
+# Run this script to measure each ingestion stage against mock_stats_server.py instead of the live stats API
+# Each stage runs in its own process against a scratch project folder, and records wall time, throughput, API calls,
+# repeated (retried) calls, bytes written and peak RSS to data/benchmarks/results_<timestamp>.json
+# Results are compared with data/benchmarks/baseline.json and any metric worse than the tolerance is flagged as a regression
+# Examples:
+#   python benchmark_ingestion.py                                       <- 200 games, no added latency
+#   python benchmark_ingestion.py --games 1230 --latency 0.15           <- a full season at roughly live API latency
+#   python benchmark_ingestion.py --save-baseline                       <- store this run as the new baseline
+import os
+import json
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import multiprocessing as mp
+from pathlib import Path
+from time import perf_counter
+from datetime import datetime
+import config
+from mock_stats_server import create_mock_server
+
+try:
+    import resource
+except ImportError: # Not available on Windows, where peak RSS is not reported
+    resource = None
+
+BENCHMARK_STAGES = ['boxscores', 'players_teams', 'consolidation']
+
+# Metrics compared with the baseline, with whether higher values are better
+COMPARED_METRICS = {
+    'wall_seconds': False,
+    'games_per_minute': True,
+    'api_calls_per_game': False,
+    'repeated_requests': False,
+    'bytes_written': False,
+    'peak_rss_mb': False
+}
+
+# Function to get the peak resident memory in MB of the current process or of the largest of its finished child processes,
+# since consolidation runs each boxscore type in a worker process of its own (see consolidate_boxscore_types)
+def get_peak_rss_mb():
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return round(peak / 1024 ** 2 if os.uname().sysname == 'Darwin' else peak / 1024, 1) # bytes on macOS, KB on Linux
+
+# Function to total the size of the files under a folder, skipping the response cache
+def get_bytes_written(data_dir):
+    return sum(f.stat().st_size for f in Path(data_dir).rglob("*") if f.is_file() and 'cache' not in f.relative_to(data_dir).parts)
+
+# Function to run one stage in a fresh worker process and send its measurements back through the queue
+def run_stage(stage, settings, queue):
+    os.environ["NBA_PIPELINE_ROOT"] = settings['root']
+    config.STATS_BASE_URL = settings['base_url']
+    config.USE_RESPONSE_CACHE = settings['use_cache']
+    config.set_rate_limiter(config.TokenBucket(settings['requests_per_second'], max_rate=max(settings['requests_per_second'], config.MAX_REQUESTS_PER_SECOND)))
+    script_env = config.initialize_script_environment()
+    season, season_types = settings['season'], ['Regular Season']
+    games = 0
+
+    start = perf_counter()
+    if stage == 'boxscores':
+        games = len(config.fetch_season_boxscores(season, season_types, script_env, max_workers=settings['max_workers']))
+    elif stage == 'players_teams':
+        config.get_all_players_info(season, season_types, script_env)
+        config.get_all_teams_info(season, season_types, script_env)
+    elif stage == 'consolidation':
+        games = settings['games']
+        config.consolidate_boxscore_checkpoints(script_env.boxscore_checkpoints_dir, script_env.raw_dir, season)
+    wall_seconds = perf_counter() - start
+
+    queue.put({'wall_seconds': round(wall_seconds, 2), 'games': games, 'peak_rss_mb': get_peak_rss_mb()})
+
+# Function to run one stage and combine the worker's measurements with the mock server's request counts
+def benchmark_stage(stage, settings, behaviour):
+    data_dir = Path(settings['root']) / "data"
+    bytes_before = get_bytes_written(data_dir) if data_dir.exists() else 0
+    requests_before = behaviour.request_stats()
+
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    process = ctx.Process(target=run_stage, args=(stage, settings, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+
+    requests_after = behaviour.request_stats()
+    api_stats = {key: requests_after[key] - requests_before[key] for key in requests_after}
+    games = result['games']
+    result.update({
+        'stage': stage,
+        'games_per_minute': round(games / result['wall_seconds'] * 60, 1) if games and result['wall_seconds'] else None,
+        'api_calls': api_stats['requests'],
+        'api_calls_per_game': round(api_stats['requests'] / games, 2) if games and api_stats['requests'] else None,
+        'repeated_requests': api_stats['repeated_requests'],
+        'throttled': api_stats['throttled'],
+        'errors': api_stats['errors'],
+        'bytes_written': get_bytes_written(data_dir) - bytes_before
+    })
+    logging.info(f"Benchmark {stage}: {result}")
+    return result
+
+# Function to compare results with the baseline and return the metrics that regressed beyond the tolerance
+def compare_with_baseline(results, baseline, tolerance):
+    regressions = []
+    baseline_stages = {stage_result['stage']: stage_result for stage_result in baseline.get('stages', [])}
+    for stage_result in results['stages']:
+        baseline_result = baseline_stages.get(stage_result['stage'])
+        if baseline_result is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            current, previous = stage_result.get(metric), baseline_result.get(metric)
+            if not current or not previous:
+                continue
+            change = (current - previous) / previous
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{stage_result['stage']} {metric}: {previous} -> {current} ({change:+.1%})")
+    return regressions
+
+# Main function to run the script
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion stages against the mock stats API.")
+    parser.add_argument("--stages", nargs="+", default=BENCHMARK_STAGES, choices=BENCHMARK_STAGES)
+    parser.add_argument("--season", default="2024-25")
+    parser.add_argument("--games", type=int, default=200, help="Regular season games in the synthetic season")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean latency the mock server adds per request in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests the mock server fails with HTTP 500")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second above which the mock server answers HTTP 429")
+    parser.add_argument("--requests-per-second", type=float, default=50.0, help="Starting client request rate")
+    parser.add_argument("--max-workers", type=int, default=config.MAX_WORKERS, help="Games fetched at once")
+    parser.add_argument("--use-cache", action="store_true", help="Keep the response cache enabled during the run")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--baseline", help="Baseline results file (default: data/benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Save this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Relative change treated as a regression")
+    args = parser.parse_args()
+
+    script_env = config.initialize_script_environment()
+    benchmarks_dir = script_env.data_dir / "benchmarks"
+    benchmarks_dir.mkdir(exist_ok=True)
+    baseline_path = Path(args.baseline) if args.baseline else benchmarks_dir / "baseline.json"
+
+    server = create_mock_server(port=args.port, latency=args.latency, latency_jitter=args.latency / 4, error_rate=args.error_rate,
+                                rate_limit=args.rate_limit, games_per_season=args.games, playoff_games=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scratch_root = Path(tempfile.mkdtemp(prefix="nba_benchmark_"))
+
+    settings = {
+        'root': str(scratch_root),
+        'base_url': f"http://127.0.0.1:{args.port}/stats",
+        'use_cache': args.use_cache,
+        'requests_per_second': args.requests_per_second,
+        'max_workers': args.max_workers,
+        'season': args.season,
+        'games': args.games
+    }
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('baseline', 'save_baseline', 'port')},
+        'stages': []
+    }
+    try:
+        for stage in BENCHMARK_STAGES:
+            if stage in args.stages:
+                results['stages'].append(benchmark_stage(stage, settings, server.RequestHandlerClass.behaviour))
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(scratch_root, ignore_errors=True)
+
+    results_path = benchmarks_dir / f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    results_path.write_text(json.dumps(results, indent=2))
+    logging.info(f"Saved benchmark results to {results_path}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2))
+        logging.info(f"Saved benchmark baseline to {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get('settings') != results['settings']:
+            logging.warning("Baseline was recorded with different settings; comparisons may not be meaningful.")
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        for regression in regressions:
+            logging.error(f"Regression: {regression}")
+        if regressions:
+            raise SystemExit(1)
+        logging.info("No regressions against the baseline.")
+    else:
+        logging.info(f"No baseline at {baseline_path}; run with --save-baseline to create one.")
+
+if __name__ == "__main__":
+    main()
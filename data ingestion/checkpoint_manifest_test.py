@@ -0,0 +1,114 @@
+#################################### Testing the Checkpoint Manifest ####################################
+# Checks that the SQLite checkpoint manifest records results across runs, never downgrades a successful result,
+# and lets a second run of fetch_season_boxscores resume with only the games and boxscore types still missing
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+import pandas as pd
+import config
+from config import CheckpointManifest, BOXSCORE_TYPES, BOXSCORE_KEYS
+
+SEASON = '2024-25'
+
+# Function to build the ok results of every boxscore type of a game
+def ok_results(game_id, box_types=BOXSCORE_TYPES):
+    return [(game_id, k, 'ok', 10, f"boxscore_{k}_chunk_1.csv") for k in box_types]
+
+# Function to build a one-player boxscore frame of a game, tagged with GAME_ID as add_game_boxscores does
+def boxscore_frame(game_id, box_type):
+    row = {key: 1 for key in BOXSCORE_KEYS[box_type]}
+    row['GAME_ID'] = game_id
+    return pd.DataFrame([row])
+
+class CheckpointManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.db_path = Path(self.tmp_dir.name) / "manifest.sqlite"
+
+    def test_completed_games_need_every_boxscore_type_ok(self):
+        manifest = CheckpointManifest(self.db_path)
+        manifest.record(SEASON, ok_results('0022400001') + ok_results('0022400002', BOXSCORE_TYPES[:-1]))
+        manifest.record(SEASON, [('0022400002', BOXSCORE_TYPES[-1], 'failed', 0, None)])
+
+        self.assertEqual(manifest.completed_game_ids(SEASON), {'0022400001'})
+        self.assertEqual(manifest.missing_box_types(SEASON), {'0022400002': [BOXSCORE_TYPES[-1]]})
+
+    def test_results_survive_a_restart(self):
+        CheckpointManifest(self.db_path).record(SEASON, ok_results('0022400001'))
+
+        reopened = CheckpointManifest(self.db_path)
+        self.assertEqual(reopened.completed_game_ids(SEASON), {'0022400001'})
+        self.assertEqual(reopened.completed_game_ids('2023-24'), set())
+
+    def test_failure_never_downgrades_an_ok_result(self):
+        manifest = CheckpointManifest(self.db_path)
+        manifest.record(SEASON, ok_results('0022400001'))
+        manifest.record(SEASON, [('0022400001', 'hustle', 'failed', 0, None)])
+
+        self.assertEqual(manifest.completed_game_ids(SEASON), {'0022400001'})
+        self.assertEqual(manifest.summary(SEASON)[('hustle', 'ok')], (1, 10))
+
+    def test_failed_result_is_replaced_by_a_later_ok(self):
+        manifest = CheckpointManifest(self.db_path)
+        manifest.record(SEASON, ok_results('0022400001', BOXSCORE_TYPES[1:]) + [('0022400001', BOXSCORE_TYPES[0], 'failed', 0, None)])
+        manifest.record(SEASON, ok_results('0022400001', BOXSCORE_TYPES[:1]))
+
+        self.assertEqual(manifest.completed_game_ids(SEASON), {'0022400001'})
+        self.assertEqual(manifest.missing_box_types(SEASON), {})
+
+class FetchResumeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        root = Path(self.tmp_dir.name)
+        self.script_env = SimpleNamespace(manifest_path=root / "manifest.sqlite", boxscore_checkpoints_dir=root)
+        self.requests = []
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    # Stand-in for fetch_boxscore_chunk that fails the given (game, boxscore type) pairs and returns one row for the rest
+    def fake_chunk(self, failing):
+        def fetch_chunk(game_ids, chunk_label, max_workers, box_types_by_game):
+            aggregated_data = {k: [] for k in BOXSCORE_TYPES}
+            failed = set()
+            for game_id in game_ids:
+                for k in box_types_by_game.get(game_id, BOXSCORE_TYPES):
+                    self.requests.append((game_id, k))
+                    if (game_id, k) in failing:
+                        failed.add((game_id, k))
+                    else:
+                        aggregated_data[k].append(boxscore_frame(game_id, k))
+            return aggregated_data, failed
+        return fetch_chunk
+
+    def fetch(self, game_ids, failing=(), box_types_by_game=None):
+        with mock.patch.object(config, 'fetch_boxscore_chunk', self.fake_chunk(set(failing))), \
+             mock.patch.object(config, 'retry_failed_boxscores', lambda failed, aggregated_data: aggregated_data):
+            return config.fetch_season_boxscores(SEASON, ['Regular Season'], self.script_env, game_ids=game_ids, box_types_by_game=box_types_by_game)
+
+    def test_second_run_only_fetches_what_the_first_run_missed(self):
+        game_ids = ['0022400001', '0022400002', '0022400003']
+        completed = self.fetch(game_ids, failing={('0022400002', 'hustle')})
+        self.assertEqual(completed, {'0022400001', '0022400003'})
+
+        # Resume as RERUN_off_checkpoints does: skip completed games and only request their missing types
+        manifest = CheckpointManifest(self.script_env.manifest_path)
+        remaining = [game_id for game_id in game_ids if game_id not in manifest.completed_game_ids(SEASON)]
+        missing_box_types = manifest.missing_box_types(SEASON)
+        self.assertEqual(remaining, ['0022400002'])
+        self.assertEqual(missing_box_types, {'0022400002': ['hustle']})
+
+        self.requests.clear()
+        completed = self.fetch(remaining, box_types_by_game=missing_box_types)
+        self.assertEqual(completed, {'0022400002'})
+        self.assertEqual(self.requests, [('0022400002', 'hustle')])
+        self.assertEqual(manifest.completed_game_ids(SEASON), set(game_ids))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+#################################### Clearing Cached API Responses ####################################
+# Run this script to invalidate cached nba_api responses in bulk, e.g. after the API has corrected a boxscore
+# Examples:
+#   python clear_response_cache.py                                  <- clear everything
+#   python clear_response_cache.py --endpoint CommonPlayerInfo      <- clear a single endpoint
+#   python clear_response_cache.py --older-than-days 30             <- clear entries written more than 30 days ago
+#   python clear_response_cache.py --max-gb 1                       <- evict least recently used entries down to 1 GB
+import argparse
+import logging
+from config import (
+    initialize_script_environment,
+    ResponseCache
+)
+
+def main():
+    parser = argparse.ArgumentParser(description="Invalidate or evict cached nba_api responses.")
+    parser.add_argument("--endpoint", help="Only clear entries for this endpoint class name (e.g. BoxScoreTraditionalV2)")
+    parser.add_argument("--older-than-days", type=float, help="Only clear entries written more than this many days ago")
+    parser.add_argument("--max-gb", type=float, help="Evict least recently used entries until the cache is under this size instead of clearing")
+    args = parser.parse_args()
+
+    script_env = initialize_script_environment()
+    cache = ResponseCache(script_env.cache_dir)
+
+    if args.max_gb is not None:
+        cache.evict(max_bytes=int(args.max_gb * 1024 ** 3))
+    else:
+        older_than = args.older_than_days * 24 * 3600 if args.older_than_days is not None else None
+        cache.invalidate(endpoint_name=args.endpoint, older_than=older_than)
+
+    logging.info("Response cache maintenance complete.")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,28 @@
+import os
+import gzip
+import json
+import math
+import hashlib
 import logging
+import sqlite3
+import random
+import shutil
+import threading
+import multiprocessing as mp
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import requests
 from pathlib import Path
 from datetime import datetime
-from time import sleep
+from contextlib import closing, contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from time import sleep, monotonic, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 from nba_api.stats.library.parameters import Season
+from nba_api.stats.library.http import NBAStatsHTTP
 from nba_api.stats.endpoints import (
     commonplayerinfo,
     playergamelogs,
@@ -19,6 +37,7 @@ from nba_api.stats.endpoints import (
     leaguegamelog,
     scheduleleaguev2
 )
+from schemas import BOXSCORE_SCHEMAS, BOXSCORE_KEYS, GAME_ID_COLUMNS, TABLE_SPECS, PROJECTED_BOXSCORE_COLUMNS
 
 # Function to get the current season and season types
 # This function can be modified to change the season or season types as needed.
@@ -27,13 +46,519 @@ def get_season_config():
     season_types = ['Regular Season', 'Playoffs']
     return season, season_types
 
+# Function to list the seasons from start_season to end_season inclusive, e.g. ('2015-16', '2017-18') -> ['2015-16', '2016-17', '2017-18']
+def get_season_range(start_season, end_season):
+    start_year, end_year = int(start_season[:4]), int(end_season[:4])
+    if start_year > end_year:
+        raise ValueError(f"Start season {start_season} is after end season {end_season}.")
+    return [f"{year}-{str(year + 1)[-2:]}" for year in range(start_year, end_year + 1)]
+
+# Concurrency settings for boxscore fetching
+# MAX_WORKERS is the number of games fetched at once (1 keeps the original one-game-at-a-time behaviour)
+# REQUESTS_PER_SECOND is the starting rate of a single budget shared by every worker thread, so raising MAX_WORKERS never exceeds it
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 2.0
+
+# Adaptive rate control settings (additive increase, multiplicative decrease)
+# Every successful request raises the rate by AIMD_INCREASE_STEP up to MAX_REQUESTS_PER_SECOND; a timeout, connection reset or
+# throttled response multiplies it by AIMD_DECREASE_FACTOR down to MIN_REQUESTS_PER_SECOND, at most once per AIMD_DECREASE_COOLDOWN seconds
+MIN_REQUESTS_PER_SECOND = 0.25
+MAX_REQUESTS_PER_SECOND = 8.0
+AIMD_INCREASE_STEP = 0.01
+AIMD_DECREASE_FACTOR = 0.5
+AIMD_DECREASE_COOLDOWN = 5
+
+# Retry backoff settings: the delay before retry N is drawn from [d/2, d] where d = BACKOFF_BASE_DELAY * 2 ** (N - 1), capped at BACKOFF_MAX_DELAY
+BACKOFF_BASE_DELAY = 1
+BACKOFF_MAX_DELAY = 60
+
+# Response cache settings
+# Cached responses are kept under data/cache and evicted least-recently-used first once CACHE_MAX_BYTES is exceeded
+USE_RESPONSE_CACHE = True
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+DEFAULT_CACHE_TTL = 24 * 3600
+
+# File format settings ('csv' or 'parquet')
+# Checkpoints are only read back by the ingestion scripts, so they default to zstd-compressed Parquet
+# Raw outputs stay CSV by default because the Snowflake COPY INTO statements load CSV files
+FILE_FORMATS = ('csv', 'parquet')
+CHECKPOINT_FORMAT = 'parquet'
+OUTPUT_FORMAT = 'csv'
+
+# When True, boxscore frames keep only the columns the table specs in schemas.py use (plus their keys), dropping names, nicknames
+# and comments the API repeats on every player-game row, so checkpoints, raw files and load files are smaller
+# Set to False to keep every column the API returns, e.g. for ad hoc analysis of the raw files
+PROJECT_BOXSCORE_COLUMNS = True
+
+# Base URL of the stats API, e.g. http://127.0.0.1:8765/stats to run against mock_stats_server.py instead of stats.nba.com
+# Set through the NBA_STATS_BASE_URL environment variable so the RUN_* scripts can be pointed at the mock server unchanged
+STATS_BASE_URL = os.environ.get("NBA_STATS_BASE_URL")
+
+# Bulk load file settings used by prepare_load_files.py ('csv' is written gzip-compressed, or 'parquet')
+# Each raw table is split into parts of roughly LOAD_PART_TARGET_BYTES compressed, since one COPY INTO loads its files in parallel
+# and Snowflake recommends files of about 100-250 MB compressed
+LOAD_FILE_FORMAT = 'csv'
+LOAD_PART_TARGET_BYTES = 100 * 1024 ** 2
+
+# Partitioned layout setting
+# When True, consolidated boxscores are also written to data/lake as Hive-style partitions, e.g.
+# season=2024-25/season_type=Regular_Season/box_type=traditional/game_month=2024-11/part-2024-25.parquet
+# so read_partitioned_boxscores only reads the partitions a season, date range or team needs
+PARTITIONED_LAYOUT = False
+
+# Largest share of distinct values for which compact_boxscore_frame stores a string column as a categorical
+CATEGORICAL_MAX_DISTINCT_RATIO = 0.5
+
+# Number of checkpoint files held in memory at once when consolidating, which bounds peak memory during consolidation
+CONSOLIDATION_BATCH_FILES = 5
+
+# Consolidation concurrency settings
+# CONSOLIDATION_PROCESSES is the number of boxscore types consolidated at once, each in its own worker process (1 consolidates them
+# one after another in the calling process); CONSOLIDATION_READ_THREADS is the number of files of a batch each process reads at once
+CONSOLIDATION_PROCESSES = min(6, os.cpu_count() or 1)
+CONSOLIDATION_READ_THREADS = 4
+
+# Player and team dimension settings
+# Stored player and team records are only refetched when new, when the game logs show a player on a different team,
+# or once they are older than DIMENSION_FULL_REFRESH_DAYS
+DIMENSION_FULL_REFRESH_DAYS = 30
+
+
+#################################### Run Metrics ####################################
+# Class to hold the structured metrics of one script run: API calls per endpoint (outcomes and a latency histogram),
+# retries per operation, rows and bytes written per stage and boxscore type, and stage durations
+# State is kept in plain dicts so worker processes can send a snapshot back to be merged into the parent's metrics
+class RunMetrics:
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+    OUTCOMES = ('success', 'failure', 'throttled', 'cache_hits')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.endpoints = {}
+        self.retries = {}
+        self.writes = {}
+        self.stages = {}
+
+    def endpoint_state(self, endpoint_name):
+        return self.endpoints.setdefault(endpoint_name, {
+            'success': 0, 'failure': 0, 'throttled': 0, 'cache_hits': 0,
+            'latency_count': 0, 'latency_sum': 0.0, 'latency_max': 0.0,
+            'latency_buckets': [0] * (len(self.LATENCY_BUCKETS) + 1)
+        })
+
+    def write_state(self, stage, box_type):
+        return self.writes.setdefault(stage, {}).setdefault(box_type, {'files': 0, 'rows': 0, 'bytes': 0})
+
+    # Record one request to the API with its outcome ('success', 'failure' or 'throttled') and latency in seconds
+    def observe_call(self, endpoint_name, seconds, outcome):
+        with self.lock:
+            state = self.endpoint_state(endpoint_name)
+            state[outcome] += 1
+            state['latency_count'] += 1
+            state['latency_sum'] += seconds
+            state['latency_max'] = max(state['latency_max'], seconds)
+            bucket = next((i for i, bound in enumerate(self.LATENCY_BUCKETS) if seconds <= bound), len(self.LATENCY_BUCKETS))
+            state['latency_buckets'][bucket] += 1
+
+    def count_cache_hit(self, endpoint_name):
+        with self.lock:
+            self.endpoint_state(endpoint_name)['cache_hits'] += 1
+
+    # Record retries for an operation, e.g. ('boxscore', 2) when two boxscore types of a game are requested again
+    def count_retry(self, operation, count=1):
+        with self.lock:
+            self.retries[operation] = self.retries.get(operation, 0) + count
+
+    # Record a written file, e.g. ('checkpoint', 'traditional', rows, bytes)
+    def observe_write(self, stage, box_type, rows, size_bytes):
+        with self.lock:
+            state = self.write_state(stage, box_type)
+            state['files'] += 1
+            state['rows'] += int(rows)
+            state['bytes'] += int(size_bytes)
+
+    # Context manager timing a named stage of a script; repeated stages add up
+    @contextmanager
+    def stage(self, name):
+        start = monotonic()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.stages[name] = self.stages.get(name, 0.0) + monotonic() - start
+
+    # Function to return the current state and reset it, e.g. at the end of a work unit in a worker process
+    def take_snapshot(self):
+        with self.lock:
+            snapshot = {'endpoints': self.endpoints, 'retries': self.retries, 'writes': self.writes, 'stages': self.stages}
+            self.reset()
+        return snapshot
+
+    # Function to add a snapshot taken by take_snapshot (possibly in another process) to this run's metrics
+    def merge(self, snapshot):
+        with self.lock:
+            for endpoint_name, other in snapshot['endpoints'].items():
+                state = self.endpoint_state(endpoint_name)
+                for key in (*self.OUTCOMES, 'latency_count', 'latency_sum'):
+                    state[key] += other[key]
+                state['latency_max'] = max(state['latency_max'], other['latency_max'])
+                state['latency_buckets'] = [a + b for a, b in zip(state['latency_buckets'], other['latency_buckets'])]
+            for operation, count in snapshot['retries'].items():
+                self.retries[operation] = self.retries.get(operation, 0) + count
+            for stage, box_types in snapshot['writes'].items():
+                for box_type, other in box_types.items():
+                    state = self.write_state(stage, box_type)
+                    for key in state:
+                        state[key] += other[key]
+            for name, seconds in snapshot['stages'].items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    # Function to estimate a latency percentile from the histogram, as the upper bound of the bucket it falls in
+    def latency_percentile(self, state, percentile):
+        target = state['latency_count'] * percentile
+        running = 0
+        for bound, count in zip(self.LATENCY_BUCKETS, state['latency_buckets']):
+            running += count
+            if running >= target:
+                return min(bound, state['latency_max'])
+        return state['latency_max']
+
+    def summary(self, script_name):
+        with self.lock:
+            endpoints = {}
+            for endpoint_name, state in sorted(self.endpoints.items()):
+                requested = state['latency_count'] > 0
+                endpoints[endpoint_name] = {
+                    'requests': state['latency_count'],
+                    **{outcome: state[outcome] for outcome in self.OUTCOMES},
+                    'latency_mean_seconds': round(state['latency_sum'] / state['latency_count'], 4) if requested else None,
+                    'latency_p50_seconds': self.latency_percentile(state, 0.5) if requested else None,
+                    'latency_p95_seconds': self.latency_percentile(state, 0.95) if requested else None,
+                    'latency_max_seconds': round(state['latency_max'], 4),
+                    'latency_histogram': dict(zip([str(bound) for bound in self.LATENCY_BUCKETS] + ['+Inf'], state['latency_buckets']))
+                }
+            return {
+                'script': script_name,
+                'finished_at': datetime.now().isoformat(timespec='seconds'),
+                'request_rate': round(RATE_LIMITER.current_rate, 3),
+                'endpoints': endpoints,
+                'retries': dict(self.retries),
+                'writes': json.loads(json.dumps(self.writes)),
+                'stage_seconds': {name: round(seconds, 2) for name, seconds in self.stages.items()}
+            }
+
+    # Function to render the metrics in the Prometheus text format read by the node_exporter textfile collector
+    def to_prometheus(self, script_name):
+        lines = []
+
+        def sample(name, labels, value):
+            label_text = ",".join(f'{key}="{label}"' for key, label in {'script': script_name, **labels}.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+        def header(name, metric_type, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        with self.lock:
+            header("nba_ingestion_api_request_duration_seconds", "histogram", "Latency of stats API requests.")
+            for endpoint_name, state in sorted(self.endpoints.items()):
+                cumulative = 0
+                for bound, count in zip([str(bound) for bound in self.LATENCY_BUCKETS] + ['+Inf'], state['latency_buckets']):
+                    cumulative += count
+                    sample("nba_ingestion_api_request_duration_seconds_bucket", {'endpoint': endpoint_name, 'le': bound}, cumulative)
+                sample("nba_ingestion_api_request_duration_seconds_sum", {'endpoint': endpoint_name}, f"{state['latency_sum']:.6f}")
+                sample("nba_ingestion_api_request_duration_seconds_count", {'endpoint': endpoint_name}, state['latency_count'])
+
+            header("nba_ingestion_api_requests_total", "counter", "Stats API calls by outcome (cache hits made no request).")
+            for endpoint_name, state in sorted(self.endpoints.items()):
+                for outcome in self.OUTCOMES:
+                    sample("nba_ingestion_api_requests_total", {'endpoint': endpoint_name, 'outcome': outcome}, state[outcome])
+
+            header("nba_ingestion_retries_total", "counter", "Requests retried, by operation.")
+            for operation, count in sorted(self.retries.items()):
+                sample("nba_ingestion_retries_total", {'operation': operation}, count)
+
+            for key, help_text in (('files', 'Files written'), ('rows', 'Rows written'), ('bytes', 'Bytes written')):
+                header(f"nba_ingestion_{key}_written_total", "counter", f"{help_text}, by stage and boxscore type.")
+                for stage, box_types in sorted(self.writes.items()):
+                    for box_type, state in sorted(box_types.items()):
+                        sample(f"nba_ingestion_{key}_written_total", {'stage': stage, 'box_type': box_type}, state[key])
+
+            header("nba_ingestion_stage_duration_seconds", "gauge", "Duration of each stage of the run.")
+            for name, seconds in self.stages.items():
+                sample("nba_ingestion_stage_duration_seconds", {'stage': name}, f"{seconds:.3f}")
+
+        header("nba_ingestion_request_rate", "gauge", "Adaptive request rate at the end of the run, in requests per second.")
+        sample("nba_ingestion_request_rate", {}, f"{RATE_LIMITER.current_rate:.3f}")
+        header("nba_ingestion_last_run_timestamp_seconds", "gauge", "Unix time the run finished.")
+        sample("nba_ingestion_last_run_timestamp_seconds", {}, f"{time():.0f}")
+        return "\n".join(lines) + "\n"
+
+RUN_METRICS = RunMetrics()
+
+# Function to export the run's metrics at the end of a script
+# Writes a JSON summary per run (e.g. data/metrics/RUN_boxscore_20250410_060000.json) and a Prometheus textfile per script
+# (data/metrics/RUN_boxscore.prom), which is replaced on each run so a textfile collector always reads the latest run
+def export_run_metrics(script_env, script_name):
+    run_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    summary_path = script_env.metrics_dir / f"{script_name}_{run_stamp}.json"
+    summary_path.write_text(json.dumps(RUN_METRICS.summary(script_name), indent=2))
+
+    prometheus_path = script_env.metrics_dir / f"{script_name}.prom"
+    tmp_path = prometheus_path.with_suffix(".prom.tmp") # Written then renamed, so the collector never reads a partial file
+    tmp_path.write_text(RUN_METRICS.to_prometheus(script_name))
+    os.replace(tmp_path, prometheus_path)
+    logging.info(f"Saved run metrics to {summary_path} and {prometheus_path}")
+    return summary_path
+
+
+#################################### Rate Limiting and Endpoint Calls ####################################
+# Class to hold a thread-safe token bucket shared by every worker making API calls
+# The refill rate adapts to the API: call_endpoint reports each success and each throttling error back to the bucket
+# State is kept as [rate, tokens, last refill, last decrease] so SharedTokenBucket can keep the same values in shared memory
+class TokenBucket:
+    RATE, TOKENS, LAST_REFILL, LAST_DECREASE = range(4)
+
+    def __init__(self, rate, capacity=None, min_rate=MIN_REQUESTS_PER_SECOND, max_rate=MAX_REQUESTS_PER_SECOND):
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.state = self.create_state([rate, self.capacity, monotonic(), 0.0])
+        self.lock = self.create_lock()
+
+    def create_state(self, values):
+        return list(values)
+
+    def create_lock(self):
+        return threading.Lock()
+
+    # Current refill rate in requests per second
+    @property
+    def current_rate(self):
+        return self.state[self.RATE]
+
+    # Block until a token is available, then take it
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = monotonic()
+                rate = self.state[self.RATE]
+                self.state[self.TOKENS] = min(self.capacity, self.state[self.TOKENS] + (now - self.state[self.LAST_REFILL]) * rate)
+                self.state[self.LAST_REFILL] = now
+                if self.state[self.TOKENS] >= 1:
+                    self.state[self.TOKENS] -= 1
+                    return
+                wait = (1 - self.state[self.TOKENS]) / rate
+            sleep(wait)
+
+    # Additive increase after a successful request
+    def record_success(self):
+        with self.lock:
+            self.state[self.RATE] = min(self.max_rate, self.state[self.RATE] + AIMD_INCREASE_STEP)
+
+    # Multiplicative decrease after a throttling error; errors within the cooldown count as the same event
+    # The bucket is also emptied so every worker pauses before the next request
+    def record_throttle(self):
+        with self.lock:
+            now = monotonic()
+            if now - self.state[self.LAST_DECREASE] < AIMD_DECREASE_COOLDOWN:
+                return
+            self.state[self.RATE] = max(self.min_rate, self.state[self.RATE] * AIMD_DECREASE_FACTOR)
+            self.state[self.TOKENS] = 0.0
+            self.state[self.LAST_DECREASE] = now
+            rate = self.state[self.RATE]
+        logging.warning(f"API is throttling requests; reducing the request rate to {rate:.2f} per second.")
+
+# Class to hold a token bucket shared by several worker processes, with the same interface as TokenBucket
+# Rate, token count and refill times live in shared memory, so every process draws from and adapts one request budget
+class SharedTokenBucket(TokenBucket):
+    def create_state(self, values):
+        return mp.Array('d', values, lock=False)
+
+    def create_lock(self):
+        return mp.Lock()
+
+RATE_LIMITER = TokenBucket(REQUESTS_PER_SECOND)
+
+# Function to replace the module-wide rate limiter, e.g. with a SharedTokenBucket inside a worker process
+def set_rate_limiter(rate_limiter):
+    global RATE_LIMITER
+    RATE_LIMITER = rate_limiter
+
+# Function to point every nba_api endpoint at a different stats API base URL (None restores stats.nba.com)
+def set_stats_base_url(base_url):
+    global STATS_BASE_URL
+    STATS_BASE_URL = base_url
+    NBAStatsHTTP.base_url = f"{base_url.rstrip('/')}/{{endpoint}}" if base_url else "https://stats.nba.com/stats/{endpoint}"
+    if base_url:
+        logging.info(f"Using the stats API at {base_url}.")
+
+# Function to get the current request rate of the module-wide rate limiter
+def get_current_request_rate():
+    return RATE_LIMITER.current_rate
+
+# Function to get the delay before a retry, using exponential backoff with jitter so concurrent workers do not retry in lockstep
+def backoff_delay(attempt, base_delay=BACKOFF_BASE_DELAY, max_delay=BACKOFF_MAX_DELAY):
+    delay = min(max_delay, base_delay * 2 ** (attempt - 1))
+    return random.uniform(delay / 2, delay)
+
+# Function to check whether an error means the API is throttling us
+# The stats API answers throttled requests slowly or with a non-JSON error page, which nba_api surfaces as a timeout,
+# a connection reset or a JSON decoding error; when the HTTP status of the response is known it decides instead
+def is_throttling_error(e, status_code=None):
+    if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if status_code is not None:
+        return status_code in (429, 503)
+    if isinstance(e, requests.exceptions.HTTPError) and e.response is not None:
+        return e.response.status_code in (429, 503)
+    return isinstance(e, json.JSONDecodeError) or '429' in str(e)
+
+# Boxscore endpoints keyed by the boxscore type used in checkpoint and raw file names
+BOXSCORE_ENDPOINTS = {
+    'advanced': boxscoreadvancedv2.BoxScoreAdvancedV2,
+    'hustle': boxscorehustlev2.BoxScoreHustleV2,
+    'scoring': boxscorescoringv2.BoxScoreScoringV2,
+    'traditional': boxscoretraditionalv2.BoxScoreTraditionalV2,
+    'playertrack': boxscoreplayertrackv2.BoxScorePlayerTrackV2,
+    'usage': boxscoreusagev2.BoxScoreUsageV2
+}
+BOXSCORE_TYPES = list(BOXSCORE_ENDPOINTS.keys())
+
+# Time-to-live in seconds for cached responses, keyed by endpoint name (None means the entry never expires)
+# Boxscores of games the schedule lists as final never change and are cached without expiry (see call_endpoint's final flag);
+# other boxscores may belong to a game still in progress or not yet corrected, so they expire like the game logs
+# Schedule and game log endpoints change daily during the season, while player and team details change rarely
+CACHE_TTLS = {
+    **{endpoint_cls.__name__: 6 * 3600 for endpoint_cls in BOXSCORE_ENDPOINTS.values()},
+    'ScheduleLeagueV2': 6 * 3600,
+    'LeagueGameLog': 6 * 3600,
+    'PlayerGameLogs': 6 * 3600,
+    'TeamGameLogs': 6 * 3600,
+    'CommonPlayerInfo': 7 * 24 * 3600,
+    'TeamDetails': 7 * 24 * 3600
+}
+
+# Class to hold a content-addressed on-disk cache of endpoint responses
+# Each entry is the gzip-compressed pickle of a data frame, stored as <endpoint>/<sha256 of endpoint and parameters>.pkl.gz
+# File modification time records when an entry was written and access time records when it was last read
+class ResponseCache:
+    def __init__(self, cache_dir, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, endpoint_name, params):
+        key_source = json.dumps({'endpoint': endpoint_name, 'params': params}, sort_keys=True, default=str)
+        key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+        return self.cache_dir / endpoint_name / f"{key}.pkl.gz"
+
+    # Return the cached data frame, or None if there is no entry or it has expired
+    def get(self, endpoint_name, params, ttl=DEFAULT_CACHE_TTL):
+        path = self.entry_path(endpoint_name, params)
+        try:
+            stat = path.stat()
+            if ttl is not None and time() - stat.st_mtime > ttl:
+                return None
+            df = pd.read_pickle(path, compression='gzip')
+            os.utime(path, (time(), stat.st_mtime))
+            return df
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.warning(f"Discarding unreadable cache entry {path}: {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+    def put(self, endpoint_name, params, df):
+        path = self.entry_path(endpoint_name, params)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        df.to_pickle(tmp_path, compression='gzip')
+        os.replace(tmp_path, path)
+
+    # Remove cached entries in bulk, optionally only for one endpoint and/or entries older than a number of seconds
+    def invalidate(self, endpoint_name=None, older_than=None):
+        pattern = f"{endpoint_name}/*.pkl.gz" if endpoint_name else "*/*.pkl.gz"
+        removed = 0
+        for path in self.cache_dir.glob(pattern):
+            if older_than is None or time() - path.stat().st_mtime > older_than:
+                path.unlink(missing_ok=True)
+                removed += 1
+        logging.info(f"Invalidated {removed} cached responses{f' for {endpoint_name}' if endpoint_name else ''}.")
+        return removed
+
+    # Remove least recently used entries until the cache fits within max_bytes
+    def evict(self, max_bytes=None):
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = [(path, path.stat()) for path in self.cache_dir.glob("*/*.pkl.gz")]
+        total_bytes = sum(stat.st_size for _, stat in entries)
+        removed = 0
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_atime):
+            if total_bytes <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= stat.st_size
+            removed += 1
+        if removed:
+            logging.info(f"Evicted {removed} cached responses to keep the cache under {max_bytes} bytes.")
+        return removed
+
+# Set by initialize_script_environment when USE_RESPONSE_CACHE is enabled
+RESPONSE_CACHE = None
+
+# Game IDs the schedule lists as final, filled in by get_nba_schedule; only these games' boxscores are cached without expiry
+FINAL_GAME_IDS = set()
+
+# Function to call an nba_api endpoint and return one of its data frames
+# Responses are served from the response cache when possible; otherwise the call goes through the shared rate limiter
+# data_set names the endpoint attribute to read (e.g. 'common_player_info'); by default the first data frame is returned
+# final marks a response that will not change again (e.g. the boxscore of a final game): it is cached under its own key and
+# never expires, so an entry cached before the game was final is not served in its place
+def call_endpoint(endpoint_cls, timeout=60, data_set=None, use_cache=True, final=False, **params):
+    endpoint_name = endpoint_cls.__name__
+    cache_params = {**params, 'data_set': data_set}
+    if STATS_BASE_URL:
+        cache_params['base_url'] = STATS_BASE_URL # Keep responses from a mock server apart from real ones
+    if final:
+        cache_params['final'] = True
+    if RESPONSE_CACHE is not None and use_cache:
+        cached_df = RESPONSE_CACHE.get(endpoint_name, cache_params, None if final else CACHE_TTLS.get(endpoint_name, DEFAULT_CACHE_TTL))
+        if cached_df is not None:
+            RUN_METRICS.count_cache_hit(endpoint_name)
+            return cached_df
+
+    RATE_LIMITER.acquire()
+    endpoint = endpoint_cls(**params, timeout=timeout, get_request=False)
+    start = monotonic()
+    try:
+        endpoint.get_request()
+        df = getattr(endpoint, data_set).get_data_frame() if data_set else endpoint.get_data_frames()[0]
+    except Exception as e:
+        status_code = getattr(getattr(endpoint, 'nba_response', None), '_status_code', None)
+        throttled = is_throttling_error(e, status_code)
+        RUN_METRICS.observe_call(endpoint_name, monotonic() - start, 'throttled' if throttled else 'failure')
+        if throttled:
+            RATE_LIMITER.record_throttle()
+        raise
+    RUN_METRICS.observe_call(endpoint_name, monotonic() - start, 'success')
+    RATE_LIMITER.record_success()
+
+    # Empty responses are not cached so they are requested again next time
+    if RESPONSE_CACHE is not None and not df.empty:
+        RESPONSE_CACHE.put(endpoint_name, cache_params, df)
+    return df
+
 
 #################################### Directory and Logging Configuration ####################################
 # Class to hold script paths and logging setup
 class ScriptPaths:
-    def __init__(self):
+    def __init__(self, log_suffix=""):
         self.script_path = Path(__file__).resolve()
-        self.project_root = self.script_path.parents[1]
+        self.project_root = Path(os.environ.get("NBA_PIPELINE_ROOT", self.script_path.parents[1])) # Overridable, e.g. so benchmarks write to a scratch folder
         self.logs_dir = self.project_root / "logging"
         self.data_dir = self.project_root / "data"
         self.raw_dir = self.data_dir / "raw"
@@ -42,7 +567,17 @@ class ScriptPaths:
         self.shots_checkpoints_dir = self.checkpoints_dir / "shots_checkpoints"
         self.games_checkpoints_dir = self.checkpoints_dir / "games_checkpoints"
         self.boxscore_rerun_checkpoints_dir = self.checkpoints_dir / "boxscore_rerun_checkpoints"
+        self.backfill_checkpoints_dir = self.checkpoints_dir / "backfill_checkpoints"
         self.rerun_files_dir = self.data_dir / "rerun"
+        self.cache_dir = self.data_dir / "cache"
+        self.manifest_path = self.checkpoints_dir / "manifest.sqlite"
+        self.dimensions_dir = self.data_dir / "dimensions"
+        self.metrics_dir = self.data_dir / "metrics"
+        self.processed_dir = self.data_dir / "processed"
+        self.warehouse_dir = self.data_dir / "warehouse"
+        self.load_dir = self.data_dir / "load"
+        self.lake_dir = self.data_dir / "lake"
+        self.partitioned_layout = PARTITIONED_LAYOUT
 
         self.logs_dir.mkdir(exist_ok=True)
         self.data_dir.mkdir(exist_ok=True)
@@ -52,11 +587,19 @@ class ScriptPaths:
         self.shots_checkpoints_dir.mkdir(exist_ok=True)
         self.games_checkpoints_dir.mkdir(exist_ok=True)
         self.boxscore_rerun_checkpoints_dir.mkdir(exist_ok=True)
+        self.backfill_checkpoints_dir.mkdir(exist_ok=True)
         self.rerun_files_dir.mkdir(exist_ok=True)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.dimensions_dir.mkdir(exist_ok=True)
+        self.metrics_dir.mkdir(exist_ok=True)
+        self.processed_dir.mkdir(exist_ok=True)
+        self.warehouse_dir.mkdir(exist_ok=True)
+        self.load_dir.mkdir(exist_ok=True)
+        self.lake_dir.mkdir(exist_ok=True)
 
         # Create log filename with timestamp
         log_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        self.log_filename = self.logs_dir / f"nba_players_and_teams_{log_timestamp}.log"
+        self.log_filename = self.logs_dir / f"nba_players_and_teams_{log_timestamp}{log_suffix}.log"
 
         # Set up logging
         logging.basicConfig(
@@ -68,61 +611,680 @@ class ScriptPaths:
             ]
         )
 
-# Function to initialize script paths and logging
-def initialize_script_environment():
-    return ScriptPaths()
+    # Function to get the folder of a partition in the lake; partitions left as None are dropped from the end of the path,
+    # e.g. partition_dir('2024-25', 'Regular Season') is the folder holding every boxscore type of the regular season
+    def partition_dir(self, season, season_type=None, box_type=None, game_month=None):
+        path = self.lake_dir / f"season={season}"
+        for name, value in (('season_type', season_type), ('box_type', box_type), ('game_month', game_month)):
+            if value is None:
+                break
+            path = path / f"{name}={str(value).replace(' ', '_')}"
+        return path
+
+# Function to initialize script paths, logging and the response cache
+# Worker processes pass a log_suffix so they do not share a log file, and skip eviction, which the parent process already ran
+def initialize_script_environment(log_suffix="", evict_cache=True):
+    global RESPONSE_CACHE
+    script_env = ScriptPaths(log_suffix)
+    if STATS_BASE_URL:
+        set_stats_base_url(STATS_BASE_URL)
+    if USE_RESPONSE_CACHE:
+        RESPONSE_CACHE = ResponseCache(script_env.cache_dir)
+        if evict_cache:
+            RESPONSE_CACHE.evict()
+    return script_env
+
+
+#################################### File Format Functions ####################################
+# Function to get the columns and types boxscore files are written with: the schema's columns the table specs use
+# when PROJECT_BOXSCORE_COLUMNS is set, otherwise the full schema
+def get_boxscore_schema(box_type):
+    schema = BOXSCORE_SCHEMAS[box_type]
+    if PROJECT_BOXSCORE_COLUMNS:
+        return {column: dtype for column, dtype in schema.items() if column in PROJECTED_BOXSCORE_COLUMNS[box_type]}
+    return schema
+
+# Function to cast a boxscore data frame to the explicit schema for its boxscore type
+# Schema columns come first in schema order (missing ones are added as nulls), followed by any extra columns the API returned,
+# unless columns are projected, in which case only the projected columns are kept
+def apply_boxscore_schema(df, box_type):
+    schema = get_boxscore_schema(box_type)
+    if PROJECT_BOXSCORE_COLUMNS:
+        df = df[[column for column in df.columns if column in schema]]
+    df = df.copy()
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            df[column] = pd.Series(None, index=df.index, dtype=dtype)
+            continue
+        values = df[column]
+        if column in GAME_ID_COLUMNS:
+            values = values.astype('string').str.zfill(10)
+        elif dtype != 'string':
+            values = pd.to_numeric(values, errors='coerce')
+        try:
+            df[column] = values.astype(dtype)
+        except (TypeError, ValueError):
+            logging.warning(f"Column {column} in {box_type} boxscore data could not be cast to {dtype}; keeping it as float64.")
+            df[column] = values.astype('float64')
+    extra_columns = [column for column in df.columns if column not in schema]
+    return df[list(schema) + extra_columns]
+
+# Function to shrink a boxscore data frame in memory after casting it to its schema
+# Game IDs and other strings become Arrow-backed strings instead of Python objects, and nullable integers are downcast to the
+# smallest type that holds their values; floats are left as float64 so written values are unchanged
+# With categorical, string columns with few distinct values (e.g. MIN, or team and position columns when columns are not
+# projected) become categoricals, for frames that are already concatenated: concatenating categoricals with different
+# categories falls back to Python objects, so single-game frames keep Arrow strings
+# Files are always written with the schema's types, since write_frame and BoxscoreFileAppender apply the schema again
+def compact_boxscore_frame(df, box_type, categorical=False):
+    df = apply_boxscore_schema(df, box_type)
+    for column, dtype in get_boxscore_schema(box_type).items():
+        values = df[column]
+        if dtype == 'string':
+            if categorical and column not in GAME_ID_COLUMNS and values.nunique() <= len(values) * CATEGORICAL_MAX_DISTINCT_RATIO:
+                df[column] = values.astype('category')
+            else:
+                df[column] = values.astype('string[pyarrow]')
+        elif dtype == 'Int64' and values.notna().any():
+            low, high = values.min(), values.max()
+            df[column] = values.astype(next(small for small in ('Int8', 'Int16', 'Int32', 'Int64') if np.iinfo(small.lower()).min <= low and high <= np.iinfo(small.lower()).max))
+    return df
+
+# Function to write a data frame as CSV or zstd-compressed Parquet
+# path_stem is the file path without a suffix; the suffix is added from file_format and the full path is returned
+# Passing a box_type applies that boxscore type's schema before writing
+def write_frame(df, path_stem, file_format, box_type=None):
+    if file_format not in FILE_FORMATS:
+        raise ValueError(f"Unsupported file format '{file_format}'. Expected one of {FILE_FORMATS}.")
+    if box_type is not None:
+        df = apply_boxscore_schema(df, box_type)
+    path = Path(f"{path_stem}.{file_format}")
+    if file_format == 'parquet':
+        df.to_parquet(path, index=False, compression='zstd')
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+# Function to read a CSV or Parquet file written by write_frame, choosing the reader from the file suffix
+# Game ID columns are always read as strings so CSV files keep their leading zeros
+def read_frame(path, box_type=None):
+    path = Path(path)
+    if path.suffix == '.parquet':
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, dtype={column: str for column in GAME_ID_COLUMNS})
+    if box_type is not None:
+        df = apply_boxscore_schema(df, box_type)
+    return df
+
+# Function to list files matching a pattern (given without a suffix) in any supported file format
+def find_frame_files(directory, pattern):
+    return sorted(f for f in Path(directory).glob(pattern) if f.is_file() and f.suffix.lstrip('.') in FILE_FORMATS)
+
+
+# Class to append boxscore data frames to one CSV or Parquet file batch by batch
+# Output goes to a temporary file that only replaces the final path once close() is called,
+# so an interrupted consolidation never leaves a partial file behind
+class BoxscoreFileAppender:
+    def __init__(self, path_stem, file_format, box_type):
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Unsupported file format '{file_format}'. Expected one of {FILE_FORMATS}.")
+        self.path = Path(f"{path_stem}.{file_format}")
+        self.tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        self.file_format = file_format
+        self.box_type = box_type
+        self.columns = list(get_boxscore_schema(box_type))
+        self.parquet_writer = None
+        self.rows_written = 0
+
+    def append(self, df):
+        df = apply_boxscore_schema(df, self.box_type)
+        extra_columns = [column for column in df.columns if column not in self.columns]
+        if extra_columns:
+            logging.warning(f"Dropping columns not in the {self.box_type} schema while consolidating: {extra_columns}")
+        df = df[self.columns]
+        if self.file_format == 'parquet':
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.tmp_path, table.schema, compression='zstd')
+            self.parquet_writer.write_table(table.cast(self.parquet_writer.schema))
+        else:
+            df.to_csv(self.tmp_path, mode='w' if self.rows_written == 0 else 'a', header=self.rows_written == 0, index=False)
+        self.rows_written += len(df)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+        if self.tmp_path.exists():
+            os.replace(self.tmp_path, self.path)
+        return self.path
+
+# Function to read one checkpoint file as a compacted boxscore frame, or None if it cannot be read
+def read_checkpoint_frame(path, box_type):
+    try:
+        return compact_boxscore_frame(read_frame(path), box_type)
+    except Exception as e:
+        logging.error(f"Error reading checkpoint file {path}: {e}")
+        return None
+
+# Function to stream boxscore files into one output file in batches of files, dropping duplicate player-game rows
+# Keys already written are remembered between batches, so peak memory is bounded by one batch rather than the whole season
+# The files of a batch are read on read_threads threads (the CSV and Parquet parsers release the GIL) and kept in file order,
+# so the first copy of a duplicated row is the one written, as when the files were read one at a time
+# Returns the output path, or None if none of the files had any rows
+def stream_consolidate_boxscore_files(files, output_stem, box_type, file_format=OUTPUT_FORMAT, batch_files=CONSOLIDATION_BATCH_FILES, read_threads=CONSOLIDATION_READ_THREADS):
+    keys = BOXSCORE_KEYS[box_type]
+    seen_keys = set()
+    duplicates_dropped = 0
+    files_read = 0
+    appender = BoxscoreFileAppender(output_stem, file_format, box_type)
+
+    with ThreadPoolExecutor(max_workers=max(1, read_threads)) as read_pool:
+        for batch_start in range(0, len(files), batch_files):
+            batch_dfs = [df for df in read_pool.map(read_checkpoint_frame, files[batch_start:batch_start + batch_files], [box_type] * batch_files) if df is not None]
+            files_read += len(batch_dfs)
+            if not batch_dfs:
+                continue
+
+            batch_df = compact_boxscore_frame(pd.concat(batch_dfs, ignore_index=True), box_type, categorical=True)
+            del batch_dfs
+            batch_keys = list(zip(*(batch_df[key] for key in keys)))
+            is_new = []
+            for row_key in batch_keys:
+                is_new.append(row_key not in seen_keys)
+                seen_keys.add(row_key)
+            duplicates_dropped += len(batch_keys) - sum(is_new)
+            appender.append(batch_df[is_new])
+
+    if appender.rows_written == 0:
+        appender.close()
+        return None
+    output_path = appender.close()
+    RUN_METRICS.observe_write('raw', box_type, appender.rows_written, output_path.stat().st_size)
+    logging.info(f"Streamed {files_read} files for {box_type} into {output_path} ({appender.rows_written} rows, {duplicates_dropped} duplicate rows dropped).")
+    return output_path
+
+# Function to set up a consolidation worker process: it starts with empty run metrics, since the parent's are copied when the
+# process is forked, and sends its log records to the parent, which writes them to the script's log file and console
+def init_consolidation_worker(log_queue):
+    RUN_METRICS.reset()
+    logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(log_queue)], force=True)
+
+# Function to consolidate one boxscore type in a worker process
+# Returns the boxscore type, its output path and the worker's run metrics for this type
+def consolidate_boxscore_type(box_type, files, output_stem):
+    output_path = stream_consolidate_boxscore_files(files, output_stem, box_type)
+    return box_type, output_path, RUN_METRICS.take_snapshot()
+
+# Function to consolidate several boxscore types at once, each in a worker process of a pool of up to `processes`
+# jobs maps each boxscore type to its files and output stem; every type writes its own output file, so the files are the same
+# as when the types are consolidated one after another
+# Returns the output path of each boxscore type (None where there was no data), in the order of jobs
+def consolidate_boxscore_types(jobs, processes=CONSOLIDATION_PROCESSES):
+    if processes <= 1 or len(jobs) <= 1:
+        return {box_type: stream_consolidate_boxscore_files(files, output_stem, box_type) for box_type, (files, output_stem) in jobs.items()}
+
+    log_queue = mp.Queue()
+    log_listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    log_listener.start()
+    output_paths = {}
+    try:
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs)), initializer=init_consolidation_worker, initargs=(log_queue,)) as pool:
+            futures = [pool.submit(consolidate_boxscore_type, box_type, files, output_stem) for box_type, (files, output_stem) in jobs.items()]
+            for future in as_completed(futures):
+                box_type, output_path, snapshot = future.result()
+                RUN_METRICS.merge(snapshot)
+                output_paths[box_type] = output_path
+    finally:
+        log_listener.stop()
+    return {box_type: output_paths[box_type] for box_type in jobs}
+
+
+#################################### Bulk Load Files ####################################
+# Raw tables written as load files, keyed by the RAW_* table they are copied into, with the table spec they come from
+# The table suffix is added from the season, e.g. RAW_ADVANCED_2024_25
+LOAD_TABLES = {f"RAW_{table}": spec for table, spec in TABLE_SPECS.items()}
+
+# Function to find the raw files for a source and season
+# Boxscores are read from the final file written by appending_final_files.py when there is one, otherwise from the season file
+# plus any incremental delta files, e.g. boxscore_traditional_incremental_2024-25_20250410_060000.csv
+def find_raw_files(script_env, source, season):
+    final_files = find_frame_files(script_env.data_dir, f"{source}_final_{season}.*")
+    if final_files:
+        return final_files
+    return find_frame_files(script_env.raw_dir, f"{source}_{season}.*") + find_frame_files(script_env.raw_dir, f"{source}_incremental_{season}_*")
+
+# Function to write one load file part, gzip-compressed CSV or zstd-compressed Parquet, and return its size and checksum
+def write_load_part(df, path, file_format):
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    if file_format == 'parquet':
+        df.to_parquet(tmp_path, index=False, compression='zstd')
+    else:
+        df.to_csv(tmp_path, index=False, compression='gzip')
+    os.replace(tmp_path, path)
+    md5 = hashlib.md5(path.read_bytes()).hexdigest()
+    return {'file': path.name, 'rows': len(df), 'bytes': path.stat().st_size, 'md5': md5}
+
+# Function to estimate how many parts a frame needs for each part to be about target_bytes once compressed,
+# from the compressed size of a sample of its rows
+def estimate_part_count(df, file_format, target_bytes, sample_rows=5000):
+    if df.empty:
+        return 1
+    sample = df.head(sample_rows)
+    if file_format == 'parquet':
+        sample_bytes = len(sample.to_parquet(index=False, compression='zstd'))
+    else:
+        sample_bytes = len(gzip.compress(sample.to_csv(index=False).encode()))
+    estimated_bytes = sample_bytes / len(sample) * len(df)
+    return max(1, math.ceil(estimated_bytes / target_bytes))
+
+# Function to split a raw table into roughly equal compressed parts named e.g. raw_boxscore_advanced_2024-25_part_000.csv.gz
+# Boxscore rows are deduplicated on their keys (keeping the latest) and sorted, so each part covers a contiguous range of games
+# Parts left from an earlier run of the same table are removed first, since the COPY pattern would otherwise load them too
+# Returns the table's manifest entry, or None if the source has no raw files
+def write_load_files(script_env, table, season, output_dir, file_format=LOAD_FILE_FORMAT, target_bytes=LOAD_PART_TARGET_BYTES, parts=None, max_workers=MAX_WORKERS):
+    spec = LOAD_TABLES[table]
+    source_files = find_raw_files(script_env, spec['source'], season)
+    if not source_files:
+        return None
+
+    box_type = spec.get('box_type')
+    df = pd.concat([read_frame(f, box_type) for f in source_files], ignore_index=True)
+    if box_type is not None:
+        df = df.drop_duplicates(subset=BOXSCORE_KEYS[box_type], keep='last').sort_values(BOXSCORE_KEYS[box_type], kind='stable')
+
+    prefix = f"raw_{spec['source']}_{season}_part_"
+    suffix = ".parquet" if file_format == 'parquet' else ".csv.gz"
+    for old_part in output_dir.glob(f"{prefix}*"):
+        old_part.unlink()
+
+    part_count = parts or estimate_part_count(df, file_format, target_bytes)
+    bounds = [round(i * len(df) / part_count) for i in range(part_count + 1)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(write_load_part, df.iloc[bounds[i]:bounds[i + 1]], output_dir / f"{prefix}{i:03d}{suffix}", file_format)
+                   for i in range(part_count)]
+        part_entries = [future.result() for future in futures]
+
+    for entry in part_entries:
+        RUN_METRICS.observe_write('load', box_type or spec['source'], entry['rows'], entry['bytes'])
+    return {
+        'table': f"{table}_{season.replace('-', '_')}",
+        'source_files': [str(f.relative_to(script_env.project_root)) for f in source_files],
+        'file_format': file_format,
+        'rows': len(df),
+        'bytes': sum(entry['bytes'] for entry in part_entries),
+        'pattern': f".*{prefix}[0-9]+{suffix.replace('.', '[.]')}",
+        'parts': part_entries
+    }
+
+# Function to build the COPY INTO statement that loads every part of a table from its stage folder with one PATTERN
+# Columns are matched to the table by name rather than position, so files with more columns than the table (e.g. unprojected
+# players or schedule files) load the columns the table has
+def build_copy_statement(entry, stage_path):
+    format_name = 'nba_pipeline_parquet_format' if entry['file_format'] == 'parquet' else 'nba_pipeline_csv_format'
+    return (f"COPY INTO {entry['table']}\n"
+            f"FROM @{stage_path}\n"
+            f"PATTERN = '{entry['pattern']}'\n"
+            f"FILE_FORMAT = (FORMAT_NAME = '{format_name}')\n"
+            f"MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE\n"
+            f"ON_ERROR = 'CONTINUE';\n")
+
+
+#################################### Partitioned Data Layout ####################################
+# Partition value for games missing from the game index, the name Hive gives null partition values
+UNKNOWN_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+# Function to read a season's game index from the lake, or None if it has not been written yet
+def read_game_index(script_env, season):
+    index_path = script_env.partition_dir(season) / "games.parquet"
+    return pd.read_parquet(index_path) if index_path.exists() else None
+
+# Function to add a season's games to its game index: one row per team per game with the season type, date and month
+# Boxscore rows carry neither the game date nor both teams, so readers use the index to prune by date range or team
+def update_game_index(script_env, season, season_types):
+    games_df = get_season_games(season, season_types)
+    game_dates = pd.to_datetime(games_df['GAME_DATE'], errors='coerce').dt.normalize()
+    index_df = pd.DataFrame({
+        'GAME_ID': games_df['GAME_ID'].astype('string').str.zfill(10),
+        'TEAM_ID': pd.to_numeric(games_df['TEAM_ID'], errors='coerce').astype('Int64'),
+        'SEASON_TYPE': games_df['SEASON_TYPE'].astype('string'),
+        'GAME_DATE': game_dates,
+        'GAME_MONTH': game_dates.dt.strftime('%Y-%m').fillna(UNKNOWN_PARTITION).astype('string')
+    })
+    existing_df = read_game_index(script_env, season)
+    if existing_df is not None:
+        index_df = pd.concat([existing_df, index_df], ignore_index=True).drop_duplicates(subset=['GAME_ID', 'TEAM_ID'], keep='last')
+
+    index_path = script_env.partition_dir(season) / "games.parquet"
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+    index_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, index_path)
+    return index_df
+
+# Function to write a consolidated boxscore file into the lake, one Parquet file per season type and game month it covers
+# Each partition file is named after the source file (e.g. part-boxscore_traditional_2024-25.parquet), so rerunning a
+# consolidation overwrites its own files; with replace, the season types it covers are cleared first, as for a full-season run
+def write_partitioned_boxscores(script_env, season, box_type, path, replace=False):
+    df = read_frame(path, box_type)
+    index_df = read_game_index(script_env, season)
+    if index_df is not None:
+        df = df.merge(index_df[['GAME_ID', 'SEASON_TYPE', 'GAME_MONTH']].drop_duplicates('GAME_ID'), on='GAME_ID', how='left')
+    else:
+        df = df.assign(SEASON_TYPE=pd.NA, GAME_MONTH=pd.NA)
+    df['SEASON_TYPE'] = df['SEASON_TYPE'].fillna(df['GAME_ID'].str[:3].map(SEASON_TYPES_BY_GAME_ID_PREFIX)).fillna(UNKNOWN_PARTITION)
+    df['GAME_MONTH'] = df['GAME_MONTH'].fillna(UNKNOWN_PARTITION)
+
+    if replace:
+        for season_type in df['SEASON_TYPE'].unique():
+            shutil.rmtree(script_env.partition_dir(season, season_type, box_type), ignore_errors=True)
+    partition_files = []
+    for (season_type, game_month), partition_df in df.groupby(['SEASON_TYPE', 'GAME_MONTH']):
+        folder = script_env.partition_dir(season, season_type, box_type, game_month)
+        folder.mkdir(parents=True, exist_ok=True)
+        partition_files.append(write_frame(partition_df.drop(columns=['SEASON_TYPE', 'GAME_MONTH']), folder / f"part-{Path(path).stem}", 'parquet', box_type))
+    logging.info(f"Wrote {len(df)} {box_type} rows from {Path(path).name} to {len(partition_files)} partitions of the lake.")
+    return partition_files
+
+# Function to add the files written by a consolidation to the lake when the partitioned layout is enabled
+# output_paths maps each boxscore type to its consolidated file, as returned by consolidate_boxscore_checkpoints
+def update_partitioned_layout(script_env, season, season_types, output_paths, replace=False):
+    if not script_env.partitioned_layout:
+        return
+    update_game_index(script_env, season, season_types)
+    for box_type, path in output_paths.items():
+        if path is not None:
+            write_partitioned_boxscores(script_env, season, box_type, path, replace)
+
+# Function to read boxscores from the lake, opening only the partitions that can hold matching games
+# Seasons and season types prune by folder; a date range or team IDs prune game months using each season's game index,
+# and then keep the rows of the matching games (every player in a game a listed team played in)
+# Where a game is in more than one file (e.g. a season file and a later incremental file), the newest file's rows are kept
+def read_partitioned_boxscores(script_env, box_type, seasons=None, season_types=None, start_date=None, end_date=None, team_ids=None):
+    season_type_names = {season_type.replace(' ', '_') for season_type in season_types} if season_types else None
+    filter_games = start_date is not None or end_date is not None or team_ids is not None
+    selected_game_ids = set()
+    files = []
+
+    for season_dir in sorted(script_env.lake_dir.glob("season=*")):
+        season = season_dir.name.split('=', 1)[1]
+        if seasons and season not in seasons:
+            continue
+        months = None
+        if filter_games:
+            index_df = read_game_index(script_env, season)
+            if index_df is None:
+                logging.warning(f"No game index for {season}; skipping it since its partitions cannot be filtered by date or team.")
+                continue
+            if start_date is not None:
+                index_df = index_df[index_df['GAME_DATE'] >= pd.Timestamp(start_date)]
+            if end_date is not None:
+                index_df = index_df[index_df['GAME_DATE'] <= pd.Timestamp(end_date)]
+            if team_ids is not None:
+                index_df = index_df[index_df['TEAM_ID'].isin(team_ids)]
+            months = set(index_df['GAME_MONTH'])
+            selected_game_ids.update(index_df['GAME_ID'])
+
+        for month_dir in sorted(season_dir.glob(f"season_type=*/box_type={box_type}/game_month=*")):
+            if season_type_names and month_dir.parents[1].name.split('=', 1)[1] not in season_type_names:
+                continue
+            if months is not None and month_dir.name.split('=', 1)[1] not in months:
+                continue
+            files.extend(find_frame_files(month_dir, "part-*"))
+
+    total_files = len(list(script_env.lake_dir.glob(f"season=*/season_type=*/box_type={box_type}/game_month=*/part-*.parquet")))
+    logging.info(f"Reading {len(files)} of {total_files} {box_type} partition files.")
+    if not files:
+        return apply_boxscore_schema(pd.DataFrame(), box_type)
+
+    df = pd.concat([read_frame(f, box_type) for f in sorted(files, key=lambda f: f.stat().st_mtime)], ignore_index=True)
+    if filter_games:
+        df = df[df['GAME_ID'].isin(selected_game_ids)]
+    return df.drop_duplicates(subset=BOXSCORE_KEYS[box_type], keep='last').reset_index(drop=True)
+
+
+#################################### Checkpoint Manifest ####################################
+# Class to hold the SQLite manifest recording the status of every (game, boxscore type) result
+# Rows are written in one transaction per persisted checkpoint file, so the manifest never claims data that is not on disk
+# WAL mode and a generous busy timeout let several processes share one manifest
+class CheckpointManifest:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        with self.connect() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS boxscore_manifest (
+                    season TEXT NOT NULL,
+                    game_id TEXT NOT NULL,
+                    box_type TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    row_count INTEGER NOT NULL DEFAULT 0,
+                    checkpoint_file TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 1,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (game_id, box_type)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_season_status ON boxscore_manifest (season, status)")
+
+    def connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=60)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return closing(conn)
+
+    # Record results as (game ID, boxscore type, status, row count, checkpoint file) tuples in a single transaction
+    # A successful result is never downgraded by a later failure for the same (game, boxscore type)
+    def record(self, season, results):
+        updated_at = datetime.now().isoformat(timespec='seconds')
+        with self.connect() as conn, conn:
+            conn.executemany("""
+                INSERT INTO boxscore_manifest (season, game_id, box_type, status, row_count, checkpoint_file, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (game_id, box_type) DO UPDATE SET
+                    status = excluded.status,
+                    row_count = excluded.row_count,
+                    checkpoint_file = excluded.checkpoint_file,
+                    attempts = boxscore_manifest.attempts + 1,
+                    updated_at = excluded.updated_at
+                WHERE boxscore_manifest.status != 'ok' OR excluded.status = 'ok'
+            """, [(season, game_id, box_type, status, int(row_count), checkpoint_file, updated_at)
+                  for game_id, box_type, status, row_count, checkpoint_file in results])
+
+    # Function to get the game IDs with every boxscore type recorded as ok
+    def completed_game_ids(self, season):
+        with self.connect() as conn:
+            rows = conn.execute("""
+                SELECT game_id FROM boxscore_manifest
+                WHERE season = ? AND status = 'ok'
+                GROUP BY game_id HAVING COUNT(DISTINCT box_type) = ?
+            """, (season, len(BOXSCORE_TYPES))).fetchall()
+        return {row[0] for row in rows}
+
+    # Function to get the boxscore types still missing for games that have at least one recorded result
+    def missing_box_types(self, season):
+        with self.connect() as conn:
+            rows = conn.execute("SELECT game_id, box_type FROM boxscore_manifest WHERE season = ? AND status = 'ok'", (season,)).fetchall()
+        ok_types_by_game = {}
+        for game_id, box_type in rows:
+            ok_types_by_game.setdefault(game_id, set()).add(box_type)
+        with self.connect() as conn:
+            recorded_game_ids = {row[0] for row in conn.execute("SELECT DISTINCT game_id FROM boxscore_manifest WHERE season = ?", (season,))}
+        missing = {}
+        for game_id in recorded_game_ids:
+            missing_types = [k for k in BOXSCORE_TYPES if k not in ok_types_by_game.get(game_id, set())]
+            if missing_types:
+                missing[game_id] = missing_types
+        return missing
+
+    # Function to summarise games, rows and failures per boxscore type for a season
+    def summary(self, season):
+        with self.connect() as conn:
+            rows = conn.execute("""
+                SELECT box_type, status, COUNT(*), SUM(row_count) FROM boxscore_manifest
+                WHERE season = ? GROUP BY box_type, status
+            """, (season,)).fetchall()
+        return {(box_type, status): (games, row_count) for box_type, status, games, row_count in rows}
+
+    # Function to log how complete a season is according to the manifest
+    def log_summary(self, season):
+        summary = self.summary(season)
+        for k in BOXSCORE_TYPES:
+            ok_games, ok_rows = summary.get((k, 'ok'), (0, 0))
+            failed_games, _ = summary.get((k, 'failed'), (0, 0))
+            logging.info(f"Manifest for {season} {k}: {ok_games} games ok ({ok_rows} rows), {failed_games} games failed.")
 
 
 #################################### Player and Team Data Gathering Functions ####################################
-# Function to gather all player IDs
-def get_all_player_ids(season, season_types):
+# Class to hold a persistent, cross-season store of player or team records keyed by ID
+# Each record keeps a hash of its fields plus when it was last refreshed and last changed, so unchanged records are never rewritten
+# tracked_columns are extra bookkeeping columns set by the caller (e.g. the team a player was last seen with in the game logs),
+# which are stored with each record but are neither hashed nor returned with its data
+class DimensionStore:
+    BOOKKEEPING_COLUMNS = ['RECORD_HASH', 'REFRESHED_AT', 'CHANGED_AT']
+
+    def __init__(self, path_stem, key_column, tracked_columns=()):
+        self.path_stem = Path(path_stem)
+        self.key_column = key_column
+        self.path = self.path_stem.with_suffix('.parquet')
+        self.bookkeeping_columns = self.BOOKKEEPING_COLUMNS + list(tracked_columns)
+
+    def load(self):
+        if not self.path.exists():
+            return pd.DataFrame(columns=[self.key_column] + self.bookkeeping_columns)
+        return read_frame(self.path)
+
+    # Function to hash every record on its data columns, so a refetched record can be compared with the stored one
+    def record_hashes(self, df):
+        data_columns = [column for column in df.columns if column not in self.bookkeeping_columns]
+        return [
+            hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+            for record in df[data_columns].to_dict(orient='records')
+        ]
+
+    # Function to merge refetched records into the store and save it atomically
+    # Returns the full store and the number of records that were new or had changed
+    def upsert(self, fetched_df):
+        stored_df = self.load()
+        if fetched_df.empty:
+            return stored_df, 0
+
+        now = datetime.now().isoformat(timespec='seconds')
+        fetched_df = fetched_df.drop_duplicates(subset=[self.key_column], keep='last').copy()
+        fetched_df['RECORD_HASH'] = self.record_hashes(fetched_df)
+        previous = stored_df.set_index(self.key_column)[['RECORD_HASH', 'CHANGED_AT']] if not stored_df.empty else pd.DataFrame(columns=['RECORD_HASH', 'CHANGED_AT'])
+        previous_hashes = fetched_df[self.key_column].map(previous['RECORD_HASH'])
+        changed = previous_hashes.ne(fetched_df['RECORD_HASH']).to_numpy()
+        fetched_df['REFRESHED_AT'] = now
+        fetched_df['CHANGED_AT'] = fetched_df[self.key_column].map(previous['CHANGED_AT']).where(~changed, now)
+
+        kept_df = stored_df[~stored_df[self.key_column].isin(fetched_df[self.key_column])]
+        store_df = pd.concat([kept_df, fetched_df], ignore_index=True) if not kept_df.empty else fetched_df.reset_index(drop=True)
+        tmp_stem = self.path_stem.with_name(f"{self.path_stem.name}.tmp")
+        os.replace(write_frame(store_df, tmp_stem, 'parquet'), self.path)
+        return store_df, int(changed.sum())
+
+    # Function to get the IDs whose stored record is older than max_age_days
+    def stale_ids(self, store_df, max_age_days):
+        if store_df.empty:
+            return set()
+        refreshed_at = pd.to_datetime(store_df['REFRESHED_AT'])
+        cutoff = pd.Timestamp(datetime.now()) - pd.Timedelta(days=max_age_days)
+        return set(store_df.loc[refreshed_at < cutoff, self.key_column])
+
+    # Function to get the stored records for the given IDs without the bookkeeping columns
+    def records_for(self, store_df, ids):
+        df = store_df[store_df[self.key_column].isin(ids)]
+        return df.drop(columns=[column for column in self.bookkeeping_columns if column in df.columns]).reset_index(drop=True)
+
+# Function to fetch one record per ID from an endpoint in parallel, within the shared rate limit
+# Records are always fetched fresh (not from the response cache) because they are only requested when they need refreshing
+def fetch_dimension_records(endpoint_cls, data_set, id_param, ids, label, max_workers=MAX_WORKERS):
+    records = []
+
+    def fetch_one(record_id):
+        return call_endpoint(endpoint_cls, data_set=data_set, use_cache=False, **{id_param: record_id})
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_one, record_id): record_id for record_id in ids}
+        for i, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc=f"Fetching {label} info"), 1):
+            record_id = futures[future]
+            try:
+                df = future.result()
+                if not df.empty:
+                    records.append(df)
+                logging.info(f"[{i}/{len(ids)}] Retrieved info for {label.title()} ID {record_id}")
+            except Exception as e:
+                logging.error(f"Failed to get info for {label.title()} ID {record_id}: {e}")
+
+    return pd.concat(records, ignore_index=True) if records else pd.DataFrame()
+
+# Function to gather each player's most recent team from the player game logs
+def get_player_log_teams(season, season_types):
     logging.info("Gathering player information for the NBA season...")
 
-    all_player_ids = []
+    log_frames = []
 
-    # Collect player IDs from all season types
+    # Collect player game logs from all season types
     for season_type in season_types:
         logging.info(f"Fetching player logs for {season_type}...")
         try:
-            logs = playergamelogs.PlayerGameLogs(
+            df = call_endpoint(
+                playergamelogs.PlayerGameLogs,
                 season_nullable=season,
                 season_type_nullable=season_type
             )
-            df = logs.get_data_frames()[0]
-            player_ids = df['PLAYER_ID'].unique().tolist()
-            all_player_ids.extend(player_ids)
-            sleep(0.6)
+            log_frames.append(df[['PLAYER_ID', 'TEAM_ID', 'GAME_DATE']])
         except Exception as e:
             logging.error(f"Failed to fetch player logs for {season_type}: {e}")
 
-    # Remove duplicates
-    unique_player_ids = list(set(all_player_ids))
-    logging.info(f"Found {len(unique_player_ids)} unique players across all season types.")
-    return unique_player_ids
+    if not log_frames:
+        return pd.DataFrame(columns=['PLAYER_ID', 'TEAM_ID'])
 
-# Function to gather all player info based upon their IDs
-def get_all_players_info(season, season_types):
-    unique_player_ids = get_all_player_ids(season, season_types)
-    logging.info(f"Fetching info for {len(unique_player_ids)} unique players.")
-    # Fetch detailed info for each player
-    player_data = []
+    # Keep the team from each player's latest game
+    logs_df = pd.concat(log_frames, ignore_index=True)
+    logs_df = logs_df.assign(GAME_DATE=pd.to_datetime(logs_df['GAME_DATE'])).sort_values('GAME_DATE')
+    player_teams = logs_df.drop_duplicates(subset=['PLAYER_ID'], keep='last')[['PLAYER_ID', 'TEAM_ID']].reset_index(drop=True)
+    logging.info(f"Found {len(player_teams)} unique players across all season types.")
+    return player_teams
 
-    for i, pid in enumerate(tqdm(unique_player_ids, desc="Fetching player info")):
-        try:
-            info = commonplayerinfo.CommonPlayerInfo(player_id=pid)
-            df = info.common_player_info.get_data_frame()
-            player_data.append(df)
-            logging.info(f"[{i+1}/{len(unique_player_ids)}] Retrieved info for Player ID {pid}")
-            sleep(0.6)  # Avoid rate limit
-        except Exception as e:
-            logging.error(f"Failed to get info for Player ID {pid}: {e}")
+# Function to gather all player IDs
+def get_all_player_ids(season, season_types):
+    return get_player_log_teams(season, season_types)['PLAYER_ID'].tolist()
 
-    if player_data:
-        all_players_df = pd.concat(player_data, ignore_index=True)
-        return all_players_df
+# Function to gather all player info based upon their IDs
+# Only players who are new, whose latest team in the game logs differs from the team the logs showed when their record was
+# last fetched (LOG_TEAM_ID), or whose record is older than DIMENSION_FULL_REFRESH_DAYS are fetched again (all of them when
+# full_refresh is set)
+# The stored TEAM_ID from CommonPlayerInfo is the player's current team (0 once waived or retired), so it is not compared with the logs
+def get_all_players_info(season, season_types, script_env: ScriptPaths, full_refresh=False):
+    player_teams = get_player_log_teams(season, season_types)
+    unique_player_ids = player_teams['PLAYER_ID'].tolist()
+    log_teams = player_teams.set_index('PLAYER_ID')['TEAM_ID']
+    store = DimensionStore(script_env.dimensions_dir / "players", 'PERSON_ID', tracked_columns=['LOG_TEAM_ID'])
+    store_df = store.load()
+
+    if full_refresh:
+        refresh_ids = set(unique_player_ids)
     else:
+        # Records saved before LOG_TEAM_ID was tracked have no log team, so they are fetched once to record it
+        stored_log_teams = store_df.set_index('PERSON_ID').get('LOG_TEAM_ID', pd.Series(index=store_df['PERSON_ID'], dtype='float64'))
+        new_ids = set(log_teams.index) - set(stored_log_teams.index)
+        known = log_teams[log_teams.index.isin(stored_log_teams.index)]
+        moved_ids = set(known.index[known.ne(stored_log_teams.reindex(known.index))])
+        stale_ids = store.stale_ids(store_df, DIMENSION_FULL_REFRESH_DAYS) & set(unique_player_ids)
+        refresh_ids = new_ids | moved_ids | stale_ids
+        logging.info(f"Player dimension: {len(new_ids)} new, {len(moved_ids)} changed team, {len(stale_ids)} due for a full refresh.")
+
+    logging.info(f"Fetching info for {len(refresh_ids)} of {len(unique_player_ids)} unique players.")
+    fetched_df = fetch_dimension_records(commonplayerinfo.CommonPlayerInfo, 'common_player_info', 'player_id', sorted(refresh_ids), "player")
+    if not fetched_df.empty:
+        fetched_df['LOG_TEAM_ID'] = fetched_df['PERSON_ID'].map(log_teams)
+    store_df, changed_count = store.upsert(fetched_df)
+    logging.info(f"Player dimension: {changed_count} of {len(fetched_df)} fetched records were new or changed.")
+
+    all_players_df = store.records_for(store_df, unique_player_ids)
+    if all_players_df.empty:
         logging.warning("No player info was retrieved.")
-        return pd.DataFrame()
+    return all_players_df
 
 # Function to gather all team IDs based on game logs
 def get_all_team_ids(season, season_types):
@@ -132,14 +1294,13 @@ def get_all_team_ids(season, season_types):
     for season_type in season_types:
         logging.info(f"Fetching team logs for {season_type}...")
         try:
-            logs = teamgamelogs.TeamGameLogs(
+            df = call_endpoint(
+                teamgamelogs.TeamGameLogs,
                 season_nullable=season,
                 season_type_nullable=season_type
             )
-            df = logs.get_data_frames()[0]
             team_ids = df['TEAM_ID'].unique().tolist()
             all_team_ids.extend(team_ids)
-            sleep(0.6)  # optional: throttle requests
         except Exception as e:
             logging.error(f"Failed to fetch team logs for {season_type}: {e}")
 
@@ -149,98 +1310,198 @@ def get_all_team_ids(season, season_types):
     return all_team_ids
 
 # Function to gather detailed team information
-def get_all_teams_info(season, season_types):
+# Only teams that are new or whose record is older than DIMENSION_FULL_REFRESH_DAYS are fetched again (all of them when full_refresh is set)
+def get_all_teams_info(season, season_types, script_env: ScriptPaths, full_refresh=False):
     logging.info("Gathering team information for the NBA season...")
     all_team_ids = get_all_team_ids(season, season_types)
+    store = DimensionStore(script_env.dimensions_dir / "teams", 'TEAM_ID')
+    store_df = store.load()
 
-    team_data = []
+    if full_refresh:
+        refresh_ids = set(all_team_ids)
+    else:
+        new_ids = set(all_team_ids) - set(store_df['TEAM_ID'])
+        stale_ids = store.stale_ids(store_df, DIMENSION_FULL_REFRESH_DAYS) & set(all_team_ids)
+        refresh_ids = new_ids | stale_ids
+        logging.info(f"Team dimension: {len(new_ids)} new, {len(stale_ids)} due for a full refresh.")
 
-    for i, tid in enumerate(tqdm(all_team_ids, desc="Fetching team info")):
-        try:
-            info = teamdetails.TeamDetails(team_id=tid)
-            df = info.team_background.get_data_frame()
-            if not df.empty:
-                team_data.append(df)
-            logging.info(f"[{i+1}/{len(all_team_ids)}] Retrieved info for Team ID {tid}")
-            sleep(0.6)  # Avoid rate limit
-        except Exception as e:
-            logging.error(f"Failed to get info for Team ID {tid}: {e}")
+    fetched_df = fetch_dimension_records(teamdetails.TeamDetails, 'team_background', 'team_id', sorted(refresh_ids), "team")
+    store_df, changed_count = store.upsert(fetched_df)
+    logging.info(f"Team dimension: {changed_count} of {len(fetched_df)} fetched records were new or changed.")
 
     # Return combined DataFrame
-    if team_data:
-        all_teams_df = pd.concat(team_data, ignore_index=True)
-        return all_teams_df
-    else:
+    all_teams_df = store.records_for(store_df, all_team_ids)
+    if all_teams_df.empty:
         logging.warning("No team info was retrieved.")
-        return pd.DataFrame()
+    return all_teams_df
     
 
 #################################### Game ID and Boxscore Data Gathering Functions ####################################
 # Function to get all game IDs for a given season and season types
-def get_all_game_ids(season, season_types):
-    all_game_ids = []
+def get_all_game_ids(season, season_types, max_attempts=5):
     logging.info(f"Fetching all game IDs for {season}")
-    for season_type in season_types:
-        logging.info(f"Getting game IDs for season type: {season_type}")
-        logs = leaguegamelog.LeagueGameLog(season=season, season_type_all_star=season_type, timeout=60)
-        df = logs.get_data_frames()[0]
-        all_game_ids.extend(df['GAME_ID'].unique().tolist())
-    unique_game_ids = list(set(all_game_ids))
+    unique_game_ids = list(set(get_season_games(season, season_types, max_attempts)['GAME_ID'].tolist()))
     logging.info(f"Total unique games found: {len(unique_game_ids)}")
     return unique_game_ids
 
+# Function to get the league game log rows (one per team per game, with GAME_DATE and TEAM_ID) for each season type
+# A SEASON_TYPE column records which season type each row was requested for
+def get_season_games(season, season_types, max_attempts=5):
+    season_dfs = []
+    for season_type in season_types:
+        logging.info(f"Getting game IDs for season type: {season_type}")
+        for attempt in range(1, max_attempts + 1):
+            try:
+                df = call_endpoint(leaguegamelog.LeagueGameLog, season=season, season_type_all_star=season_type)
+                break
+            except Exception as e:
+                if attempt == max_attempts:
+                    raise
+                logging.error(f"Error fetching game IDs for {season} {season_type} (Attempt {attempt}/{max_attempts}): {e}")
+                RUN_METRICS.count_retry('game_ids')
+                sleep(backoff_delay(attempt))
+        season_dfs.append(df.assign(SEASON_TYPE=season_type))
+    return pd.concat(season_dfs, ignore_index=True)
+
 # Function to fetch boxscore data for a specific game ID with retries
-# Any game IDs that fail to fetch data will be logged and retried later
-def fetch_boxscores_by_game(game_id, max_attempts=5, retry_delay=5):
+# Retry state is kept per endpoint: endpoints that succeed are kept and only the failing ones are requested again
+# Returns the fetched data and the list of boxscore types that still failed after all attempts
+# When an executor is passed, the endpoint calls for the game are made in parallel on it
+def fetch_boxscores_by_game(game_id, max_attempts=5, executor=None, box_types=None):
     logging.info(f"Fetching boxscore data for game {game_id}")
     data = {}
-    for attempt in range(1, max_attempts + 1):
+    pending = list(box_types) if box_types is not None else list(BOXSCORE_TYPES)
+
+    final = game_id in FINAL_GAME_IDS
+
+    def fetch_one(key):
         try:
-            data['advanced'] = boxscoreadvancedv2.BoxScoreAdvancedV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            data['hustle'] = boxscorehustlev2.BoxScoreHustleV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            data['scoring'] = boxscorescoringv2.BoxScoreScoringV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            data['traditional'] = boxscoretraditionalv2.BoxScoreTraditionalV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            data['playertrack'] = boxscoreplayertrackv2.BoxScorePlayerTrackV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            data['usage'] = boxscoreusagev2.BoxScoreUsageV2(game_id=game_id, timeout=60).get_data_frames()[0]
-            return data, True
+            return call_endpoint(BOXSCORE_ENDPOINTS[key], final=final, game_id=game_id)
         except Exception as e:
-            logging.error(f"Error fetching boxscore for game {game_id} (Attempt {attempt}/{max_attempts}): {e}")
-            if attempt < max_attempts:
-                print(f"Retrying game {game_id} in {retry_delay} seconds (Attempt {attempt + 1}/{max_attempts})...")
-                sleep(retry_delay)
+            return e
+
+    for attempt in range(1, max_attempts + 1):
+        if executor is None:
+            results = {key: fetch_one(key) for key in pending}
+        else:
+            futures = {key: executor.submit(fetch_one, key) for key in pending}
+            results = {key: future.result() for key, future in futures.items()}
+
+        for key, result in results.items():
+            if isinstance(result, Exception):
+                logging.error(f"Error fetching {key} boxscore for game {game_id} (Attempt {attempt}/{max_attempts}): {result}")
             else:
-                logging.error(f"Failed to fetch boxscore for game {game_id} after {max_attempts} attempts.")
-                return {}, False
+                data[key] = result
+
+        pending = [key for key in pending if key not in data]
+        if not pending:
+            return data, []
+        if attempt < max_attempts:
+            RUN_METRICS.count_retry('boxscore', len(pending))
+            retry_delay = backoff_delay(attempt)
+            print(f"Retrying {', '.join(pending)} for game {game_id} in {retry_delay:.1f} seconds (Attempt {attempt + 1}/{max_attempts})...")
+            sleep(retry_delay)
+
+    logging.error(f"Failed to fetch {', '.join(pending)} boxscore(s) for game {game_id} after {max_attempts} attempts.")
+    return data, pending
+
+# Function to add a game's fetched boxscore frames to the aggregated data, tagged with the game ID
+# Frames are compacted as they arrive, so a chunk's frames take a fraction of the memory of the raw API frames
+def add_game_boxscores(aggregated_data, game_id, game_data):
+    for key in aggregated_data.keys():
+        if key in game_data and not game_data[key].empty:
+            game_data[key]['GAME_ID'] = game_id  # tag with game ID
+            aggregated_data[key].append(compact_boxscore_frame(game_data[key], key))
+
+# Function to fetch boxscores for a chunk of game IDs, either one game at a time or concurrently
+# Concurrent mode runs games on one thread pool and each game's endpoint calls on a second pool,
+# while the shared rate limiter keeps the total request rate within REQUESTS_PER_SECOND
+# box_types_by_game optionally limits which boxscore types are fetched for a game (e.g. the missing ones for partly complete games)
+# Returns the aggregated data and a set of (game ID, boxscore type) pairs that failed all internal retries
+def fetch_boxscore_chunk(game_ids, chunk_label, max_workers=MAX_WORKERS, box_types_by_game=None):
+    box_types_by_game = box_types_by_game or {}
+    aggregated_data_chunk = {k: [] for k in BOXSCORE_TYPES}
+    failed_boxscores = set()
+
+    def collect(game_id, game_data, failed_types):
+        add_game_boxscores(aggregated_data_chunk, game_id, game_data)
+        if failed_types:
+            logging.warning(f"Game ID {game_id} failed all internal retries for {', '.join(failed_types)}. Adding to final retry list.")
+            failed_boxscores.update((game_id, key) for key in failed_types)
 
-# Function to retry fetching boxscores for failed game IDs
-def retry_failed_boxscores(failed_game_ids_set, aggregated_data, max_retries=3):
-    logging.info(f"Attempting to retry {len(failed_game_ids_set)} failed game IDs for boxscores (final retry loop).")
+    if max_workers <= 1:
+        pbar = tqdm(game_ids, desc=f"Fetching boxscores ({chunk_label})")
+        for idx_in_chunk, game_id in enumerate(pbar, 1):
+            pbar.set_description(f"Processing game {idx_in_chunk}/{len(game_ids)} in {chunk_label}: {game_id}")
+            game_data, failed_types = fetch_boxscores_by_game(game_id, box_types=box_types_by_game.get(game_id)) # Internal retries handled here
+            collect(game_id, game_data, failed_types)
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as game_pool, \
+             ThreadPoolExecutor(max_workers=max_workers * len(BOXSCORE_ENDPOINTS)) as endpoint_pool:
+            futures = {game_pool.submit(fetch_boxscores_by_game, game_id, executor=endpoint_pool, box_types=box_types_by_game.get(game_id)): game_id for game_id in game_ids}
+            for future in tqdm(as_completed(futures), total=len(futures), desc=f"Fetching boxscores ({chunk_label}, {max_workers} workers)"):
+                game_data, failed_types = future.result() # Internal retries handled here
+                collect(futures[future], game_data, failed_types)
+
+    return aggregated_data_chunk, failed_boxscores
+
+# Function to retry fetching boxscores for failed (game ID, boxscore type) pairs
+# Only the boxscore types that failed are requested again for each game
+def retry_failed_boxscores(failed_boxscores_set, aggregated_data, max_retries=3):
+    logging.info(f"Attempting to retry {len(failed_boxscores_set)} failed (game, boxscore type) pairs (final retry loop).")
     for attempt in range(1, max_retries + 1):
-        if not failed_game_ids_set:
+        if not failed_boxscores_set:
             break
-        logging.info(f"Final retry attempt {attempt}/{max_retries} for boxscores. Remaining: {len(failed_game_ids_set)}")
-        current_failed_ids = list(failed_game_ids_set)
-        failed_game_ids_set.clear() # Clear for this attempt, re-add if still fails
-
-        pbar = tqdm(current_failed_ids, desc=f"Final Retrying boxscores (Attempt {attempt})")
-        for idx, game_id in enumerate(pbar, 1):
-            pbar.set_description(f"Final Retrying game {idx}/{len(current_failed_ids)}: {game_id}")
-            game_data, success = fetch_boxscores_by_game(game_id, max_attempts=1) # Only one attempt in this final loop
-            if success:
-                for key in aggregated_data.keys():
-                    if key in game_data and not game_data[key].empty:
-                        game_data[key]['GAME_ID'] = game_id
-                        aggregated_data[key].append(game_data[key])
-            else:
-                failed_game_ids_set.add(game_id) # Add back to set if still fails
-        sleep(5) # Longer sleep between final retry attempts
+        logging.info(f"Final retry attempt {attempt}/{max_retries} for boxscores. Remaining: {len(failed_boxscores_set)}")
+        failed_types_by_game = {}
+        for game_id, key in sorted(failed_boxscores_set):
+            failed_types_by_game.setdefault(game_id, []).append(key)
+        failed_boxscores_set.clear() # Clear for this attempt, re-add if still fails
+        RUN_METRICS.count_retry('boxscore_final', sum(len(box_types) for box_types in failed_types_by_game.values()))
+
+        pbar = tqdm(list(failed_types_by_game.items()), desc=f"Final Retrying boxscores (Attempt {attempt})")
+        for idx, (game_id, box_types) in enumerate(pbar, 1):
+            pbar.set_description(f"Final Retrying game {idx}/{len(failed_types_by_game)}: {game_id}")
+            game_data, failed_types = fetch_boxscores_by_game(game_id, max_attempts=1, box_types=box_types) # Only one attempt in this final loop
+            add_game_boxscores(aggregated_data, game_id, game_data)
+            failed_boxscores_set.update((game_id, key) for key in failed_types) # Add back to set if still fails
+        sleep(backoff_delay(attempt, base_delay=5)) # Longer backoff between final retry attempts
     return aggregated_data
 
+# Function to turn the requested (game ID, boxscore type) pairs of a chunk into manifest results
+# A pair that did not fail is recorded as ok, with a row count of 0 if the API returned no rows for it
+def build_manifest_results(requested, aggregated_data, checkpoint_paths, failed_boxscores):
+    row_counts = {}
+    for k, dfs in aggregated_data.items():
+        for df in dfs:
+            for game_id, count in df['GAME_ID'].value_counts().items():
+                row_counts[(game_id, k)] = row_counts.get((game_id, k), 0) + count
+    results = []
+    for game_id, k in requested:
+        if (game_id, k) in failed_boxscores:
+            results.append((game_id, k, 'failed', 0, None))
+        else:
+            checkpoint_path = checkpoint_paths.get(k)
+            results.append((game_id, k, 'ok', row_counts.get((game_id, k), 0), checkpoint_path.name if checkpoint_path else None))
+    return results
+
 # Function to fetch boxscore data for an entire season in chunks based on game IDs
 # This function implicitly handles failures by logging and saving retried data to checkpoints
-def fetch_season_boxscores(season, season_types, script_env: ScriptPaths):
-    game_ids = get_all_game_ids(season, season_types)
-    failed_game_ids_after_internal_retries = set()
+# game_ids restricts the run to specific games (e.g. remaining or newly finished games) instead of the full season
+# checkpoint_dir and file_tag control where checkpoints go and how they are named, e.g. file_tag='rerun_' writes boxscore_{k}_rerun_chunk_N.csv
+# box_types_by_game limits the fetch to the given boxscore types per game (games not listed fetch every type)
+# Every persisted (game, boxscore type) result and every final failure is recorded in the checkpoint manifest
+# Returns the set of game IDs for which every requested boxscore type was fetched
+def fetch_season_boxscores(season, season_types, script_env: ScriptPaths, max_workers=MAX_WORKERS, game_ids=None, checkpoint_dir=None, file_tag="", box_types_by_game=None):
+    if game_ids is None:
+        game_ids = get_all_game_ids(season, season_types)
+    if checkpoint_dir is None:
+        checkpoint_dir = script_env.boxscore_checkpoints_dir
+    box_types_by_game = box_types_by_game or {}
+    if RESPONSE_CACHE is not None:
+        get_nba_schedule(season, max_attempts=1) # Learn which games are final, so their boxscores are cached without expiry
+    manifest = CheckpointManifest(script_env.manifest_path)
+    failed_boxscores_after_internal_retries = set()
     
     chunk_size = 100
     total_chunks = (len(game_ids) + chunk_size - 1) // chunk_size
@@ -251,62 +1512,140 @@ def fetch_season_boxscores(season, season_types, script_env: ScriptPaths):
         end_idx = min((chunk_idx + 1) * chunk_size, len(game_ids))
         current_chunk_ids = game_ids[start_idx:end_idx]
 
-        logging.info(f"Processing chunk {chunk_idx + 1}/{total_chunks} ({len(current_chunk_ids)} games)")
+        logging.info(f"Processing {file_tag}chunk {chunk_idx + 1}/{total_chunks} ({len(current_chunk_ids)} games)")
         
-        aggregated_data_chunk = {k: [] for k in ['advanced','hustle','scoring','traditional','playertrack','usage']}
-
-        pbar = tqdm(current_chunk_ids, desc=f"Fetching boxscores (Chunk {chunk_idx + 1})")
-        for idx_in_chunk, game_id in enumerate(pbar, 1):
-            pbar.set_description(f"Processing game {idx_in_chunk}/{len(current_chunk_ids)} in chunk {chunk_idx + 1}: {game_id}")
-            game_data, success = fetch_boxscores_by_game(game_id) # Internal retries handled here
-            if success:
-                for key in aggregated_data_chunk.keys():
-                    if key in game_data and not game_data[key].empty:
-                        game_data[key]['GAME_ID'] = game_id  # tag with game ID
-                        aggregated_data_chunk[key].append(game_data[key])
-            else:
-                logging.warning(f"Game ID {game_id} failed all internal retries. Adding to final retry list.")
-                failed_game_ids_after_internal_retries.add(game_id)
+        aggregated_data_chunk, failed_chunk_boxscores = fetch_boxscore_chunk(current_chunk_ids, f"{file_tag}chunk {chunk_idx + 1}", max_workers, box_types_by_game)
+        failed_boxscores_after_internal_retries.update(failed_chunk_boxscores)
         
         # Save checkpoint for the current chunk
+        checkpoint_paths = {}
         for k, dfs in aggregated_data_chunk.items():
             if dfs:
                 chunk_df = pd.concat(dfs, ignore_index=True)
-                checkpoint_path = script_env.boxscore_checkpoints_dir / f"boxscore_{k}_chunk_{chunk_idx + 1}.csv"
-                chunk_df.to_csv(checkpoint_path, index=False)
-                logging.info(f"Saved checkpoint for {k} to {checkpoint_path}")
+                checkpoint_paths[k] = write_frame(chunk_df, checkpoint_dir / f"boxscore_{k}_{file_tag}chunk_{chunk_idx + 1}", CHECKPOINT_FORMAT, box_type=k)
+                RUN_METRICS.observe_write('checkpoint', k, len(chunk_df), checkpoint_paths[k].stat().st_size)
+                logging.info(f"Saved checkpoint for {k} to {checkpoint_paths[k]}")
             else:
-                logging.info(f"No data to save for {k} in chunk {chunk_idx + 1}.")
-        
-        print("Waiting for 3 seconds after chunk processing...")
-        sleep(3) # Wait after each chunk
+                logging.info(f"No data to save for {k} in {file_tag}chunk {chunk_idx + 1}.")
+
+        # Record the chunk in the manifest only after its checkpoint files are on disk
+        requested = [(game_id, k) for game_id in current_chunk_ids for k in box_types_by_game.get(game_id, BOXSCORE_TYPES)]
+        manifest.record(season, build_manifest_results(requested, aggregated_data_chunk, checkpoint_paths, failed_chunk_boxscores))
+        logging.info(f"Current request rate: {get_current_request_rate():.2f} per second.")
 
 # Final retry for any game IDs that failed all initial attempts
-    if failed_game_ids_after_internal_retries:
-        logging.warning(f"Initiating final retry for {len(failed_game_ids_after_internal_retries)} games that failed all internal attempts.")
-        retried_aggregated_data = {k: [] for k in ['advanced','hustle','scoring','traditional','playertrack','usage']}
-        retried_aggregated_data = retry_failed_boxscores(failed_game_ids_after_internal_retries, retried_aggregated_data)
+    if failed_boxscores_after_internal_retries:
+        logging.warning(f"Initiating final retry for {len(failed_boxscores_after_internal_retries)} (game, boxscore type) pairs that failed all internal attempts.")
+        retried_requested = sorted(failed_boxscores_after_internal_retries)
+        retried_aggregated_data = {k: [] for k in BOXSCORE_TYPES}
+        retried_aggregated_data = retry_failed_boxscores(failed_boxscores_after_internal_retries, retried_aggregated_data)
         
+        retried_checkpoint_paths = {}
         for k, dfs in retried_aggregated_data.items():
             if dfs:
                 retried_df = pd.concat(dfs, ignore_index=True)
-                retried_checkpoint_path = script_env.boxscore_checkpoints_dir / f"boxscore_{k}_retried.csv"
-                retried_df.to_csv(retried_checkpoint_path, index=False)
-                logging.info(f"Saved retried data for {k} to {retried_checkpoint_path}")
+                retried_checkpoint_paths[k] = write_frame(retried_df, checkpoint_dir / f"boxscore_{k}_{file_tag}retried", CHECKPOINT_FORMAT, box_type=k)
+                RUN_METRICS.observe_write('checkpoint', k, len(retried_df), retried_checkpoint_paths[k].stat().st_size)
+                logging.info(f"Saved retried data for {k} to {retried_checkpoint_paths[k]}")
+        manifest.record(season, build_manifest_results(retried_requested, retried_aggregated_data, retried_checkpoint_paths, failed_boxscores_after_internal_retries))
+
+        if failed_boxscores_after_internal_retries:
+            logging.error(f"Failed to retrieve boxscore data for {len(failed_boxscores_after_internal_retries)} (game, boxscore type) pairs even after final retries: {failed_boxscores_after_internal_retries}")
 
-        if failed_game_ids_after_internal_retries:
-            logging.error(f"Failed to retrieve boxscore data for {len(failed_game_ids_after_internal_retries)} games even after final retries: {failed_game_ids_after_internal_retries}")
+    incomplete_game_ids = {game_id for game_id, _ in failed_boxscores_after_internal_retries}
+    return {game_id for game_id in game_ids if game_id not in incomplete_game_ids}
+
+# Function to consolidate the chunk and retried checkpoint files for each boxscore type into one raw file
+# Reads boxscore_{k}_{file_tag}chunk_* and boxscore_{k}_{file_tag}retried checkpoints in either file format
+# and streams them into boxscore_{k}_{output_tag} in OUTPUT_FORMAT, with the boxscore types consolidated in parallel
+# Returns the consolidated file for each boxscore type (None where there was no data)
+def consolidate_boxscore_checkpoints(checkpoint_dir, output_dir, output_tag, file_tag=""):
+    logging.info(f"Consolidating boxscore {file_tag}chunk checkpoint files in {checkpoint_dir.name}...")
+    jobs = {}
+    for k in BOXSCORE_TYPES:
+        checkpoint_files = find_frame_files(checkpoint_dir, f"boxscore_{k}_{file_tag}chunk_*")
+        checkpoint_files.extend(find_frame_files(checkpoint_dir, f"boxscore_{k}_{file_tag}retried.*"))
+        jobs[k] = (checkpoint_files, output_dir / f"boxscore_{k}_{output_tag}")
+
+    output_paths = consolidate_boxscore_types(jobs)
+    for k, final_path in output_paths.items():
+        if final_path is not None:
+            logging.info(f"Consolidated boxscore data for {k} saved to {final_path}")
+        else:
+            logging.warning(f"No consolidated data for {k} to save.")
+    return output_paths
+
+# Function to move consolidated checkpoint files into a timestamped subfolder of their directory
+# pattern is one pattern or a list of them, e.g. the chunk and retried checkpoints of each boxscore type
+def archive_checkpoint_files(checkpoint_dir, pattern, folder_suffix=""):
+    logging.info(f"Moving checkpoint files in {checkpoint_dir.name} to a subfolder.")
+    archive_folder = checkpoint_dir / (datetime.now().strftime("%Y%m%d_%H%M%S") + folder_suffix)
+    archive_folder.mkdir(exist_ok=True)
+
+    patterns = [pattern] if isinstance(pattern, str) else pattern
+    for f in sorted({f for pattern in patterns for f in find_frame_files(checkpoint_dir, pattern)}):
+        try:
+            f.rename(archive_folder / f.name)
+            logging.info(f"Moved {f.name} to {archive_folder.name}")
+        except Exception as e:
+            logging.error(f"Error moving file {f.name}: {e}")
+
+
+#################################### Incremental Ingestion Functions ####################################
+# Game ID prefixes the stats API uses for each season type (e.g. 0022400001 is a 2024-25 regular season game)
+SEASON_TYPE_GAME_ID_PREFIXES = {
+    'Pre Season': '001',
+    'Regular Season': '002',
+    'All Star': '003',
+    'Playoffs': '004',
+    'PlayIn': '005'
+}
+SEASON_TYPES_BY_GAME_ID_PREFIX = {prefix: season_type for season_type, prefix in SEASON_TYPE_GAME_ID_PREFIXES.items()}
+
+# gameStatus value the schedule uses for games that have finished (1 = scheduled, 2 = in progress)
+FINAL_GAME_STATUS = 3
+
+# Function to get the games that have finished since the last run, using the schedule's game status and date
+# Games count as ingested once the checkpoint manifest has every boxscore type recorded as ok
+# Returns None if the schedule could not be fetched
+def get_new_final_game_ids(season, season_types, script_env: ScriptPaths):
+    schedule_df, success = get_nba_schedule(season)
+    if not success or schedule_df.empty:
+        logging.error(f"Could not fetch the NBA schedule for {season}; unable to work out which games are new.")
+        return None
+
+    prefixes = tuple(SEASON_TYPE_GAME_ID_PREFIXES[season_type] for season_type in season_types)
+    schedule_df = schedule_df.assign(gameId=schedule_df['gameId'].astype(str).str.zfill(10))
+    final_games = schedule_df[
+        (schedule_df['gameStatus'] == FINAL_GAME_STATUS) &
+        schedule_df['gameId'].str.startswith(prefixes)
+    ]
+    final_games = final_games.assign(gameDate=pd.to_datetime(final_games['gameDate'])).sort_values('gameDate')
+
+    ingested_game_ids = CheckpointManifest(script_env.manifest_path).completed_game_ids(season)
+    new_games = final_games[~final_games['gameId'].isin(ingested_game_ids)]
+    logging.info(f"Schedule has {len(final_games)} finished games for {season}; {len(ingested_game_ids)} already ingested; {len(new_games)} new.")
+    if not new_games.empty:
+        logging.info(f"New games were played between {new_games['gameDate'].min().date()} and {new_games['gameDate'].max().date()}.")
+    return new_games['gameId'].tolist()
 
 
 #################################### NBA Season Schedule Data Gathering Functions ####################################
+# Function to remember the games a schedule lists as final, so their boxscores are cached without expiry
+def record_final_games(schedule_df):
+    if 'gameStatus' in schedule_df.columns:
+        final_game_ids = schedule_df.loc[schedule_df['gameStatus'] == FINAL_GAME_STATUS, 'gameId']
+        FINAL_GAME_IDS.update(final_game_ids.astype(str).str.zfill(10))
+
 # Function to get the NBA schedule for a specific season with retries
-def get_nba_schedule(season, max_attempts=5, retry_delay=5):
+# Games the schedule lists as final are recorded in FINAL_GAME_IDS
+def get_nba_schedule(season, max_attempts=5):
     logging.info(f"Attempting to fetch NBA schedule for season {season} with {max_attempts} retries.")
     for attempt in range(1, max_attempts + 1):
         try:
             logging.info(f"Fetching NBA schedule (Attempt {attempt}/{max_attempts})...")
-            schedule = scheduleleaguev2.ScheduleLeagueV2(season=season, timeout=60)
-            df = schedule.get_data_frames()[0]
+            df = call_endpoint(scheduleleaguev2.ScheduleLeagueV2, season=season)
+            record_final_games(df)
             # Filter columns to only include up to 'POINTSLEADERS_3'
             if 'POINTSLEADERS_3' in df.columns:
                 df = df.loc[:, :'POINTSLEADERS_3']
@@ -317,7 +1656,9 @@ def get_nba_schedule(season, max_attempts=5, retry_delay=5):
         except Exception as e:
             logging.error(f"Error fetching NBA schedule for season {season} (Attempt {attempt}/{max_attempts}): {e}")
             if attempt < max_attempts:
-                print(f"Retrying NBA schedule fetch in {retry_delay} seconds (Attempt {attempt + 1}/{max_attempts})...")
+                RUN_METRICS.count_retry('schedule')
+                retry_delay = backoff_delay(attempt)
+                print(f"Retrying NBA schedule fetch in {retry_delay:.1f} seconds (Attempt {attempt + 1}/{max_attempts})...")
                 sleep(retry_delay)
             else:
                 logging.error(f"Failed to fetch NBA schedule for season {season} after {max_attempts} attempts.")
@@ -332,6 +1673,7 @@ def retry_failed_schedule(failed_seasons_set, max_retries=3):
         logging.info(f"Final retry attempt {attempt}/{max_retries} for NBA schedule. Remaining: {len(failed_seasons_set)}")
         current_failed_seasons = list(failed_seasons_set)
         failed_seasons_set.clear() # Clear for this attempt, re-add if still fails
+        RUN_METRICS.count_retry('schedule_final', len(current_failed_seasons))
 
         for season in tqdm(current_failed_seasons, desc=f"Final Retrying NBA schedule (Attempt {attempt})"):
             schedule_df, success = get_nba_schedule(season, max_attempts=1) # Only one attempt in this final loop
@@ -339,5 +1681,5 @@ def retry_failed_schedule(failed_seasons_set, max_retries=3):
                 retried_schedule_df = pd.concat([retried_schedule_df, schedule_df], ignore_index=True)
             else:
                 failed_seasons_set.add(season) # Add back to set if still fails
-        sleep(5) # Longer sleep between final retry attempts
+        sleep(backoff_delay(attempt, base_delay=5)) # Longer backoff between final retry attempts
     return retried_schedule_df
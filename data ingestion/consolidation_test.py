@@ -0,0 +1,100 @@
+#################################### Testing Checkpoint Consolidation ####################################
+# Checks that stream_consolidate_boxscore_files drops duplicate player-game rows across batches of files, on each boxscore
+# type's keys (hustle's camelCase personId included), and that consolidating the types in worker processes writes the same files
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import logging
+import tempfile
+import unittest
+import multiprocessing as mp
+from pathlib import Path
+import pandas as pd
+import config
+from config import stream_consolidate_boxscore_files, consolidate_boxscore_types, read_frame, write_frame
+
+# Function to build traditional boxscore rows as (game ID, player ID, points) tuples
+def traditional_frame(rows):
+    return pd.DataFrame([{'GAME_ID': game_id, 'TEAM_ID': 1610612737, 'PLAYER_ID': player_id, 'MIN': '30:00', 'PTS': points}
+                         for game_id, player_id, points in rows])
+
+# Function to build hustle boxscore rows as (game ID, person ID, points) tuples, tagged with GAME_ID as add_game_boxscores does
+def hustle_frame(rows):
+    return pd.DataFrame([{'GAME_ID': game_id, 'teamId': 1610612737, 'personId': person_id, 'minutes': '30:00', 'points': points}
+                         for game_id, person_id, points in rows])
+
+class StreamConsolidationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.dir = Path(self.tmp_dir.name)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def write_checkpoints(self, box_type, frames, file_format='csv'):
+        return [write_frame(df, self.dir / f"boxscore_{box_type}_chunk_{i}", file_format, box_type=box_type) for i, df in enumerate(frames, 1)]
+
+    def test_duplicates_across_batches_keep_first_copy(self):
+        files = self.write_checkpoints('traditional', [
+            traditional_frame([('0022400001', 1, 10), ('0022400001', 2, 12)]),
+            traditional_frame([('0022400002', 1, 20)]),
+            traditional_frame([('0022400001', 1, 99), ('0022400003', 3, 7)])  # game 1 refetched in a later batch
+        ])
+        output_path = stream_consolidate_boxscore_files(files, self.dir / "boxscore_traditional_2024-25", 'traditional', file_format='csv', batch_files=2)
+
+        df = read_frame(output_path, 'traditional')
+        self.assertEqual(list(zip(df['GAME_ID'], df['PLAYER_ID'], df['PTS'])),
+                         [('0022400001', 1, 10), ('0022400001', 2, 12), ('0022400002', 1, 20), ('0022400003', 3, 7)])
+
+    def test_duplicates_within_one_file_are_dropped(self):
+        files = self.write_checkpoints('traditional', [traditional_frame([('0022400001', 1, 10), ('0022400001', 1, 10)])])
+        output_path = stream_consolidate_boxscore_files(files, self.dir / "boxscore_traditional_2024-25", 'traditional', file_format='csv')
+        self.assertEqual(len(read_frame(output_path)), 1)
+
+    def test_hustle_rows_are_keyed_on_person_id(self):
+        files = self.write_checkpoints('hustle', [
+            hustle_frame([('0022400001', 1, 10), ('0022400001', 2, 12)]),
+            hustle_frame([('0022400001', 2, 99), ('0022400001', 3, 5), ('0022400002', 2, 8)])
+        ])
+        output_path = stream_consolidate_boxscore_files(files, self.dir / "boxscore_hustle_2024-25", 'hustle', file_format='csv', batch_files=1)
+
+        df = read_frame(output_path, 'hustle')
+        self.assertEqual(list(zip(df['GAME_ID'], df['personId'], df['points'])),
+                         [('0022400001', 1, 10), ('0022400001', 2, 12), ('0022400001', 3, 5), ('0022400002', 2, 8)])
+
+    def test_csv_and_parquet_checkpoints_consolidate_together(self):
+        files = self.write_checkpoints('traditional', [traditional_frame([('0022400001', 1, 10)])], 'csv') \
+            + self.write_checkpoints('traditional', [traditional_frame([('0022400001', 1, 10), ('0022400002', 1, 20)])], 'parquet')
+        output_path = stream_consolidate_boxscore_files(files, self.dir / "boxscore_traditional_2024-25", 'traditional', file_format='parquet')
+
+        df = read_frame(output_path)
+        self.assertEqual(output_path.suffix, '.parquet')
+        self.assertEqual(df['GAME_ID'].tolist(), ['0022400001', '0022400002'])
+
+    def test_unreadable_files_are_skipped_and_empty_input_writes_nothing(self):
+        bad_file = self.dir / "boxscore_traditional_chunk_9.parquet"
+        bad_file.write_bytes(b"not parquet")
+        files = self.write_checkpoints('traditional', [traditional_frame([('0022400001', 1, 10)])]) + [bad_file]
+        output_path = stream_consolidate_boxscore_files(files, self.dir / "boxscore_traditional_2024-25", 'traditional', file_format='csv')
+        self.assertEqual(len(read_frame(output_path)), 1)
+
+        self.assertIsNone(stream_consolidate_boxscore_files([bad_file], self.dir / "boxscore_traditional_empty", 'traditional', file_format='csv'))
+        self.assertFalse(any(self.dir.glob("boxscore_traditional_empty*")))
+
+    @unittest.skipUnless('fork' in mp.get_all_start_methods(), "needs the fork start method")
+    def test_parallel_consolidation_writes_the_same_files(self):
+        jobs = {}
+        for box_type, frame in (('traditional', traditional_frame), ('hustle', hustle_frame)):
+            files = self.write_checkpoints(box_type, [frame([('0022400001', 1, 10), ('0022400001', 2, 12)]), frame([('0022400001', 2, 99), ('0022400002', 1, 3)])])
+            jobs[box_type] = files
+
+        serial = consolidate_boxscore_types({k: (files, self.dir / f"serial_{k}") for k, files in jobs.items()}, processes=1)
+        config.RUN_METRICS.reset()
+        parallel = consolidate_boxscore_types({k: (files, self.dir / f"parallel_{k}") for k, files in jobs.items()}, processes=2)
+
+        self.assertEqual(list(parallel), list(jobs))
+        for box_type in jobs:
+            self.assertEqual(serial[box_type].read_bytes(), parallel[box_type].read_bytes())
+            self.assertEqual(config.RUN_METRICS.writes['raw'][box_type]['rows'], 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#################################### Testing the Minutes Conversion ####################################
+# Checks that the three convert_minutes implementations give the same result for every MIN format the stats API returns:
+# pandas in "data cleaning/local_transformations.py", the DuckDB macro in "database/local_warehouse.py" and the Snowpark
+# expression in "data cleaning/Data Transformations.py" (run with Snowpark's local testing session when it is installed)
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import sys
+import unittest
+import importlib.util
+from pathlib import Path
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "data cleaning"))
+sys.path.insert(0, str(PROJECT_ROOT / "database"))
+from local_transformations import convert_minutes
+
+try:
+    import duckdb
+    from local_warehouse import CONVERT_MINUTES_MACRO
+except ImportError:
+    duckdb = None
+
+try:
+    from snowflake.snowpark import Session
+except ImportError:
+    Session = None
+
+# Minutes values and the minutes each implementation should convert them to
+MINUTES_CASES = [
+    ("36", 36.0),
+    ("36:15", 36.25),
+    ("1:02:15", 62.25),
+    ("36.000000:15", 36.25),
+    (None, 0.0),
+    ("", 0.0),
+    ("DNP", 0.0)
+]
+
+# Function to load "Data Transformations.py", whose name is not importable as a module
+def load_snowpark_transformations():
+    spec = importlib.util.spec_from_file_location("data_transformations", PROJECT_ROOT / "data cleaning" / "Data Transformations.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+class ConvertMinutesParityTest(unittest.TestCase):
+    def setUp(self):
+        self.values = [value for value, _ in MINUTES_CASES]
+        self.expected = [minutes for _, minutes in MINUTES_CASES]
+
+    def test_pandas_conversion(self):
+        converted = convert_minutes(pd.Series(self.values, dtype='object'))
+        self.assertEqual(converted.dtype, 'float64')
+        for value, minutes, expected in zip(self.values, converted, self.expected):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(minutes, expected)
+
+    @unittest.skipIf(duckdb is None, "duckdb is not installed")
+    def test_duckdb_matches_pandas(self):
+        connection = duckdb.connect()
+        connection.execute(CONVERT_MINUTES_MACRO)
+        connection.execute("CREATE TABLE minutes (position INTEGER, min_str VARCHAR)")
+        connection.executemany("INSERT INTO minutes VALUES (?, ?)", list(enumerate(self.values)))
+        duckdb_minutes = [row[0] for row in connection.execute("SELECT convert_minutes(min_str) FROM minutes ORDER BY position").fetchall()]
+        pandas_minutes = convert_minutes(pd.Series(self.values, dtype='object')).tolist()
+        for value, duckdb_value, pandas_value in zip(self.values, duckdb_minutes, pandas_minutes):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(duckdb_value, pandas_value)
+
+    @unittest.skipIf(Session is None, "snowflake-snowpark-python is not installed")
+    def test_snowpark_matches_pandas(self):
+        transformations = load_snowpark_transformations()
+        session = Session.builder.config("local_testing", True).create()
+        try:
+            df = session.create_dataframe([[position, value] for position, value in enumerate(self.values)], schema=["POSITION", "MIN"])
+            rows = df.select("POSITION", transformations.convert_minutes(df["MIN"]).alias("MINUTES")).sort("POSITION").collect()
+        finally:
+            session.close()
+        pandas_minutes = convert_minutes(pd.Series(self.values, dtype='object')).tolist()
+        for value, row, pandas_value in zip(self.values, rows, pandas_minutes):
+            with self.subTest(value=value):
+                self.assertAlmostEqual(row["MINUTES"], pandas_value)
+
+if __name__ == "__main__":
+    unittest.main()
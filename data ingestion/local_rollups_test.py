@@ -0,0 +1,124 @@
+#################################### Testing the Local Rollups ####################################
+# Checks that run_local_rollups in "data cleaning/local_transformations.py" gives the same rollups in merge mode as a full
+# overwrite, leaves the rollups alone when there are no new games, and holds games back until the schedule has their date
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import sys
+import logging
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data cleaning"))
+from local_transformations import (
+    run_local_rollups,
+    read_processed_table,
+    get_processed_path_stem,
+    write_frame,
+    ROLLUP_SUM_COLUMNS,
+    ROLLUP_AVG_COLUMNS
+)
+
+SEASON = '2024-25'
+ROLLUP_KEYS = {
+    'TEAM_GAME_ROLLUP': ['GAME_ID', 'TEAM_ID'],
+    'TEAM_SEASON_ROLLUP': ['SEASON', 'TEAM_ID'],
+    'PLAYER_SEASON_ROLLUP': ['SEASON', 'PLAYER_ID'],
+    'PLAYER_ROLLING_ROLLUP': ['GAME_ID', 'PLAYER_ID']
+}
+
+# Function to build a wide player-game table of games between four teams of three players, one game a day
+def build_wide_table(game_count):
+    rng = np.random.default_rng(7)
+    rows = []
+    for game_number in range(1, game_count + 1):
+        home, away = [(1610612737, 1610612738), (1610612739, 1610612740), (1610612737, 1610612739), (1610612738, 1610612740)][game_number % 4]
+        for team_id in (home, away):
+            for player in range(3):
+                row = {
+                    'GAME_DATE': pd.Timestamp('2024-10-22') + pd.Timedelta(days=game_number),
+                    'SEASON': SEASON,
+                    'GAME_ID': f"00224{game_number:05d}",
+                    'TEAM_ID': team_id,
+                    'PLAYER_ID': team_id * 10 + player
+                }
+                row.update({column: float(rng.integers(0, 30)) for column in ROLLUP_SUM_COLUMNS})
+                row.update({column: float(rng.normal()) for column in ROLLUP_AVG_COLUMNS})
+                row['MIN'] = 0.0 if player == 2 and game_number % 3 == 0 else row['MIN'] + 1 # Some games not played
+                rows.append(row)
+    return pd.DataFrame(rows)
+
+class LocalRollupsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def script_env(self, name):
+        processed_dir = Path(self.tmp_dir.name) / name
+        processed_dir.mkdir()
+        return SimpleNamespace(processed_dir=processed_dir)
+
+    def write_wide_table(self, script_env, wide_df):
+        write_frame(wide_df, get_processed_path_stem(script_env, 'PLAYER_GAME', SEASON), 'parquet')
+
+    def read_rollups(self, script_env):
+        rollups = {}
+        for table, keys in ROLLUP_KEYS.items():
+            df = read_processed_table(script_env, table, SEASON, suffix="")
+            rollups[table] = df.sort_values(keys).reset_index(drop=True)
+        return rollups
+
+    def assert_rollups_equal(self, expected, actual):
+        for table in ROLLUP_KEYS:
+            with self.subTest(table=table):
+                pd.testing.assert_frame_equal(expected[table], actual[table][expected[table].columns], check_dtype=False)
+
+    def full_rollups(self, wide_df):
+        script_env = self.script_env("full")
+        self.write_wide_table(script_env, wide_df)
+        run_local_rollups(script_env, SEASON)
+        return self.read_rollups(script_env)
+
+    def test_merge_with_new_games_matches_full_overwrite(self):
+        wide_df = build_wide_table(30)
+        script_env = self.script_env("merge")
+        self.write_wide_table(script_env, wide_df[wide_df['GAME_ID'] <= "0022400022"])
+        run_local_rollups(script_env, SEASON)
+        self.write_wide_table(script_env, wide_df)
+        row_counts = run_local_rollups(script_env, SEASON, mode='merge')
+
+        self.assertEqual(row_counts['ROLLUP_GAMES'], 30)
+        self.assert_rollups_equal(self.full_rollups(wide_df), self.read_rollups(script_env))
+
+    def test_merge_without_new_games_leaves_rollups_unchanged(self):
+        script_env = self.script_env("merge")
+        self.write_wide_table(script_env, build_wide_table(10))
+        run_local_rollups(script_env, SEASON)
+        before = self.read_rollups(script_env)
+
+        self.assertEqual(run_local_rollups(script_env, SEASON, mode='merge'), {})
+        self.assert_rollups_equal(before, self.read_rollups(script_env))
+
+    def test_games_without_a_date_are_rolled_up_once_they_have_one(self):
+        wide_df = build_wide_table(12)
+        undated_df = wide_df.copy()
+        undated_df.loc[undated_df['GAME_ID'] == "0022400012", 'GAME_DATE'] = pd.NaT
+        script_env = self.script_env("merge")
+        self.write_wide_table(script_env, undated_df)
+        run_local_rollups(script_env, SEASON)
+
+        rolled_up_games = read_processed_table(script_env, 'ROLLUP_GAMES', SEASON, suffix="")['GAME_ID']
+        self.assertNotIn("0022400012", set(rolled_up_games))
+        self.assertNotIn("0022400012", set(self.read_rollups(script_env)['TEAM_GAME_ROLLUP']['GAME_ID']))
+
+        self.write_wide_table(script_env, wide_df)
+        run_local_rollups(script_env, SEASON, mode='merge')
+        self.assert_rollups_equal(self.full_rollups(wide_df), self.read_rollups(script_env))
+
+if __name__ == "__main__":
+    unittest.main()
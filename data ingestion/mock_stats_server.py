@@ -0,0 +1,425 @@
+#################################### Mock NBA Stats API Server ####################################
+# Run this script to serve stand-in responses for every stats endpoint the ingestion scripts use, so runs can be replayed offline
+# Responses come from recorded fixtures when one exists for the request, otherwise they are synthesised from a fake league
+# in the same JSON formats as stats.nba.com (resultSets for the V2 boxscores and logs, the nested formats for hustle and the schedule)
+# Examples:
+#   python mock_stats_server.py --port 8765                                   <- synthetic responses only
+#   python mock_stats_server.py --latency 0.2 --error-rate 0.02 --rate-limit 5 <- slow, flaky and throttling API
+#   python mock_stats_server.py --record                                      <- proxy misses to stats.nba.com and save them as fixtures
+# Then point the ingestion scripts at it:
+#   NBA_STATS_BASE_URL=http://127.0.0.1:8765/stats python RUN_boxscore.py
+import argparse
+import hashlib
+import json
+import logging
+import random
+import threading
+from collections import deque, Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from time import sleep, monotonic
+from urllib.parse import urlparse, parse_qsl
+import requests
+from nba_api.stats.static import teams as static_teams
+from nba_api.stats.library.http import STATS_HEADERS
+from nba_api.stats.endpoints import (
+    commonplayerinfo,
+    playergamelogs,
+    teamdetails,
+    teamgamelogs,
+    leaguegamelog,
+    scheduleleaguev2
+)
+from config import (
+    initialize_script_environment,
+    BOXSCORE_ENDPOINTS,
+    SEASON_TYPE_GAME_ID_PREFIXES
+)
+
+# Endpoint classes keyed by the endpoint name nba_api puts in the request URL
+MOCK_ENDPOINTS = {
+    endpoint_cls.endpoint: endpoint_cls
+    for endpoint_cls in [
+        *BOXSCORE_ENDPOINTS.values(),
+        commonplayerinfo.CommonPlayerInfo,
+        playergamelogs.PlayerGameLogs,
+        teamdetails.TeamDetails,
+        teamgamelogs.TeamGameLogs,
+        leaguegamelog.LeagueGameLog,
+        scheduleleaguev2.ScheduleLeagueV2
+    ]
+}
+
+# Text values for columns that would otherwise be filled with random numbers, keyed by lower-case column name without underscores
+TEXT_COLUMN_VALUES = {
+    'birthdate': '1998-01-01T00:00:00', 'school': 'Mock University', 'country': 'USA', 'lastaffiliation': 'Mock University/USA',
+    'height': '6-7', 'rosterstatus': 'Active', 'playercode': 'mock_player', 'teamcode': 'mock', 'owner': 'Mock Owner',
+    'arena': 'Mock Arena', 'generalmanager': 'Mock GM', 'headcoach': 'Mock Coach', 'dleagueaffiliation': 'Mock G League Team',
+    'comment': '', 'seasontype': 'Regular Season', 'wl': 'W', 'arenaname': 'Mock Arena', 'arenacity': 'Mock City', 'arenastate': 'MC',
+    'gamestatustext': 'Final', 'gamelabel': '', 'gamesublabel': '', 'seriestext': '', 'ifnecessary': 'false', 'postponedstatus': 'A',
+    'branchlink': '', 'gamesubtype': '', 'day': 'Tue', 'weekname': 'Week 1', 'tapedelaycomments': '', 'broadcastervideolink': ''
+}
+
+# Class to hold a deterministic fake league: 30 real teams, a fixed roster per team and a schedule per season and season type
+class SyntheticLeague:
+    def __init__(self, games_per_season=1230, playoff_games=80, players_per_team=13, as_of=None):
+        self.teams = sorted(static_teams.get_teams(), key=lambda team: team['id'])
+        self.teams_by_id = {team['id']: team for team in self.teams}
+        self.games_per_type = {'002': games_per_season, '004': playoff_games, '005': 6, '001': 80, '003': 1}
+        self.players_per_team = players_per_team
+        self.as_of = as_of or datetime.now()
+
+    # Season start year from a season string ('2024-25') or game ID ('0022400001')
+    @staticmethod
+    def season_start_year(season):
+        return int(season[:4])
+
+    def season_type_games(self, season, season_type):
+        prefix = SEASON_TYPE_GAME_ID_PREFIXES.get(season_type, '002')
+        year = self.season_start_year(season)
+        return [self.game(f"{prefix}{year % 100:02d}{n:05d}") for n in range(1, self.games_per_type.get(prefix, 0) + 1)]
+
+    # Game details are derived from the game ID alone, so any game ID can be served without keeping state
+    def game(self, game_id):
+        prefix, year, number = game_id[:3], 2000 + int(game_id[3:5]), int(game_id[5:])
+        start = datetime(year, 10, 22) if prefix != '004' else datetime(year + 1, 4, 19)
+        date = start + timedelta(days=(number - 1) // 8)
+        home = self.teams[(number * 7) % len(self.teams)]
+        away = self.teams[(number * 7 + 1 + number % 29) % len(self.teams)]
+        return {'game_id': game_id, 'date': date, 'home': home, 'away': away, 'season': f"{year}-{str(year + 1)[-2:]}", 'final': date <= self.as_of}
+
+    def roster(self, team):
+        team_idx = self.teams.index(team)
+        return [self.player(1630000 + team_idx * 100 + j) for j in range(self.players_per_team)]
+
+    # Player details are derived from the player ID, so CommonPlayerInfo works for any ID the logs hand out
+    def player(self, player_id):
+        team = self.teams[(player_id - 1630000) // 100 % len(self.teams)]
+        j = player_id % 100
+        return {'id': player_id, 'first': f"Mock{j}", 'last': f"{team['nickname']}", 'team': team,
+                'jersey': str(j), 'position': ['G', 'G', 'F', 'F', 'C'][j % 5]}
+
+# Function to fill one value for a column from whatever game, team and player the row is about
+def column_value(column, rng, game=None, team=None, player=None, season=None):
+    key = column.replace('_', '').lower()
+    if team is None and player is not None:
+        team = player['team']
+    if key == 'gameid' and game:
+        return game['game_id']
+    if key in ('teamid', 'personteamid') and team:
+        return team['id']
+    if key in ('teamabbreviation', 'teamtricode', 'abbreviation') and team:
+        return team['abbreviation']
+    if key in ('teamcity', 'city') and team:
+        return team['city']
+    if key in ('teamname', 'nickname') and team:
+        return team['nickname']
+    if key == 'teamslug' and team:
+        return team['nickname'].lower()
+    if key == 'yearfounded' and team:
+        return team['year_founded']
+    if player:
+        if key in ('playerid', 'personid'):
+            return player['id']
+        if key in ('playername', 'displayfirstlast'):
+            return f"{player['first']} {player['last']}"
+        if key == 'firstname':
+            return player['first']
+        if key in ('lastname', 'familyname'):
+            return player['last']
+        if key in ('namei', 'displayfilast'):
+            return f"{player['first'][0]}. {player['last']}"
+        if key == 'displaylastcommafirst':
+            return f"{player['last']}, {player['first']}"
+        if key == 'playerslug':
+            return f"{player['first']}-{player['last']}".lower()
+        if key in ('jerseynum', 'jersey'):
+            return player['jersey']
+        if key in ('startposition', 'position'):
+            return player['position']
+    if key in ('min', 'minutes'):
+        return f"{rng.randint(0, 40)}:{rng.randint(0, 59):02d}"
+    if key in ('gamedate', 'gamedateest', 'gamedatetimeest', 'gamedateutc', 'gamedatetimeutc') and game:
+        return game['date'].strftime("%Y-%m-%dT00:00:00")
+    if key == 'matchup' and game and team:
+        return f"{team['abbreviation']} vs. {game['away']['abbreviation']}" if team is game['home'] else f"{team['abbreviation']} @ {game['home']['abbreviation']}"
+    if key == 'seasonid' and season:
+        return f"2{season[:4]}"
+    if key in ('seasonyear', 'season') and season:
+        return season
+    if key in TEXT_COLUMN_VALUES:
+        return TEXT_COLUMN_VALUES[key]
+    if key.endswith('pct') or key.endswith('percentage'):
+        return round(rng.random(), 3)
+    return rng.randint(0, 20)
+
+def build_row(headers, rng, **context):
+    return [column_value(column, rng, **context) for column in headers]
+
+# Function to build a legacy resultSets response, where rows_for maps each data set name to a list of row contexts
+def build_result_sets(endpoint_cls, params, rng, rows_for):
+    return {
+        'resource': endpoint_cls.endpoint,
+        'parameters': params,
+        'resultSets': [
+            {'name': name, 'headers': headers, 'rowSet': [build_row(headers, rng, **context) for context in rows_for(name)]}
+            for name, headers in endpoint_cls.expected_data.items()
+        ]
+    }
+
+# Function to build the nested hustle boxscore response read by nba_api's V3 boxscore parser
+def build_hustle_response(endpoint_cls, league, game, rng):
+    player_headers = endpoint_cls.expected_data['PlayerStats']
+    team_headers = endpoint_cls.expected_data['TeamStats']
+    stats_start = team_headers.index('minutes')
+    team_info, team_stats = team_headers[1:stats_start], team_headers[stats_start:]
+    player_info = player_headers[1 + len(team_info):player_headers.index('minutes')]
+    player_stats = player_headers[player_headers.index('minutes'):]
+
+    def team_block(team):
+        block = {column: column_value(column, rng, game=game, team=team) for column in team_info}
+        block['players'] = [
+            {**{column: column_value(column, rng, game=game, player=player) for column in player_info},
+             'statistics': {column: column_value(column, rng, game=game, player=player) for column in player_stats}}
+            for player in league.roster(team)
+        ]
+        block['statistics'] = {column: column_value(column, rng, game=game, team=team) for column in team_stats}
+        return block
+
+    return {
+        'meta': {'version': 1, 'request': endpoint_cls.endpoint, 'time': datetime.now().isoformat()},
+        'boxScoreHustle': {'gameId': game['game_id'], 'homeTeam': team_block(game['home']), 'awayTeam': team_block(game['away'])}
+    }
+
+# Function to build the nested league schedule response read by nba_api's ScheduleLeagueV2 parser
+def build_schedule_response(endpoint_cls, league, season, rng):
+    game_headers = endpoint_cls.expected_data['SeasonGames']
+    first_team_column = next(i for i, column in enumerate(game_headers) if column.startswith('homeTeam_'))
+    game_fields = game_headers[3:first_team_column]
+    team_fields = [column[len('homeTeam_'):] for column in game_headers if column.startswith('homeTeam_')]
+    leader_fields = [column[len('pointsLeaders_'):] for column in game_headers if column.startswith('pointsLeaders_')]
+    broadcaster_fields = {}
+    for column in game_headers[first_team_column:]:
+        prefix, _, field = column.partition('_')
+        if prefix.endswith('Broadcasters'):
+            broadcaster_fields.setdefault(prefix, []).append(field)
+
+    games_by_date = {}
+    for season_type in ('Pre Season', 'Regular Season', 'PlayIn', 'Playoffs'):
+        for game in league.season_type_games(season, season_type):
+            games_by_date.setdefault(game['date'], []).append(game)
+
+    def game_block(game):
+        block = {column: column_value(column, rng, game=game, season=season) for column in game_fields}
+        block['gameStatus'] = 3 if game['final'] else 1
+        block['homeTeam'] = {field: column_value(field, rng, game=game, team=game['home']) for field in team_fields}
+        block['awayTeam'] = {field: column_value(field, rng, game=game, team=game['away']) for field in team_fields}
+        leader = league.roster(game['home'])[0]
+        block['pointsLeaders'] = [{field: column_value(field, rng, game=game, player=leader) for field in leader_fields}]
+        block['broadcasters'] = {prefix: [{field: column_value(field, rng) for field in fields}] for prefix, fields in broadcaster_fields.items()}
+        return block
+
+    week_fields = endpoint_cls.expected_data['SeasonWeeks'][2:]
+    start = min(games_by_date)
+    weeks = [
+        {**{field: column_value(field, rng) for field in week_fields}, 'weekNumber': n + 1, 'weekName': f"Week {n + 1}",
+         'startDate': (start + timedelta(weeks=n)).strftime("%Y-%m-%dT00:00:00Z"), 'endDate': (start + timedelta(weeks=n, days=6)).strftime("%Y-%m-%dT00:00:00Z")}
+        for n in range((max(games_by_date) - start).days // 7 + 1)
+    ]
+    return {
+        'meta': {'version': 1, 'request': endpoint_cls.endpoint, 'time': datetime.now().isoformat()},
+        'leagueSchedule': {
+            'seasonYear': season,
+            'leagueId': '00',
+            'gameDates': [
+                {'gameDate': date.strftime("%m/%d/%Y 00:00:00"), 'games': [game_block(game) for game in games]}
+                for date, games in sorted(games_by_date.items())
+            ],
+            'weeks': weeks
+        }
+    }
+
+# Function to synthesise the response for one request from the fake league
+def build_synthetic_response(endpoint_cls, params, league, rng):
+    name = endpoint_cls.__name__
+    if name == 'BoxScoreHustleV2':
+        return build_hustle_response(endpoint_cls, league, league.game(params['GameID']), rng)
+    if name == 'ScheduleLeagueV2':
+        return build_schedule_response(endpoint_cls, league, params['Season'], rng)
+
+    if name in (boxscore_cls.__name__ for boxscore_cls in BOXSCORE_ENDPOINTS.values()):
+        game = league.game(params['GameID'])
+        players = [{'game': game, 'player': player} for team in (game['home'], game['away']) for player in league.roster(team)]
+        teams = [{'game': game, 'team': team} for team in (game['home'], game['away'])]
+        return build_result_sets(endpoint_cls, params, rng, lambda data_set: players if 'Player' in data_set else teams * 2 if 'StarterBench' in data_set else teams)
+
+    if name == 'CommonPlayerInfo':
+        player = league.player(int(params['PlayerID']))
+        return build_result_sets(endpoint_cls, params, rng, lambda data_set: [{'player': player}])
+    if name == 'TeamDetails':
+        team = league.teams_by_id.get(int(params['TeamID']))
+        return build_result_sets(endpoint_cls, params, rng, lambda data_set: [{'team': team}] if team and data_set == 'TeamBackground' else [])
+
+    # Game logs only cover games that have been played as of the league's as_of date
+    season = params.get('Season')
+    games = [game for game in league.season_type_games(season, params.get('SeasonType') or 'Regular Season') if game['final']]
+    if name == 'PlayerGameLogs':
+        rows = [{'game': game, 'player': player, 'season': season} for game in games for team in (game['home'], game['away']) for player in league.roster(team)]
+    else:
+        rows = [{'game': game, 'team': team, 'season': season} for game in games for team in (game['home'], game['away'])]
+    return build_result_sets(endpoint_cls, params, rng, lambda data_set: rows)
+
+# Class to hold the server-side behaviour shared by every request handler thread
+class MockStatsBehaviour:
+    def __init__(self, league, fixtures_dir, record, latency, latency_jitter, error_rate, rate_limit, hang_rate, hang_seconds):
+        self.league = league
+        self.fixtures_dir = Path(fixtures_dir)
+        self.record = record
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.recent_requests = deque()
+        self.status_counts = Counter()
+        self.request_keys = set()
+        self.lock = threading.Lock()
+
+    # Function to count a served request by status, and whether the same request has been served before (i.e. a retry)
+    def count_request(self, endpoint, params, status):
+        with self.lock:
+            self.status_counts[status] += 1
+            self.request_keys.add((endpoint, tuple(sorted(params.items()))))
+
+    # Function to get the request counts so far, e.g. for benchmarks to diff before and after a stage
+    def request_stats(self):
+        with self.lock:
+            total = sum(self.status_counts.values())
+            return {
+                'requests': total,
+                'unique_requests': len(self.request_keys),
+                'repeated_requests': total - len(self.request_keys),
+                'throttled': self.status_counts[429],
+                'errors': self.status_counts[500]
+            }
+
+    # Fixture paths use the same content-addressed scheme as the response cache
+    def fixture_path(self, endpoint, params):
+        key_source = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True)
+        return self.fixtures_dir / endpoint / f"{hashlib.sha256(key_source.encode()).hexdigest()}.json"
+
+    # Function to check the sliding one-second window of requests against the rate limit
+    def is_rate_limited(self):
+        if not self.rate_limit:
+            return False
+        with self.lock:
+            now = monotonic()
+            while self.recent_requests and now - self.recent_requests[0] > 1:
+                self.recent_requests.popleft()
+            if len(self.recent_requests) >= self.rate_limit:
+                return True
+            self.recent_requests.append(now)
+            return False
+
+    # Returns the response body for a request, from a fixture, from stats.nba.com when recording, or synthesised
+    def response_body(self, endpoint, params):
+        fixture_path = self.fixture_path(endpoint, params)
+        if fixture_path.exists():
+            return fixture_path.read_bytes()
+        if self.record:
+            response = requests.get(f"https://stats.nba.com/stats/{endpoint}", params=params, headers=STATS_HEADERS, timeout=60)
+            response.raise_for_status()
+            fixture_path.parent.mkdir(parents=True, exist_ok=True)
+            fixture_path.write_bytes(response.content)
+            logging.info(f"Recorded fixture {fixture_path.name} for {endpoint}.")
+            return response.content
+        seed = int(fixture_path.stem[:16], 16)
+        return json.dumps(build_synthetic_response(MOCK_ENDPOINTS[endpoint], params, self.league, random.Random(seed))).encode()
+
+class MockStatsHandler(BaseHTTPRequestHandler):
+    behaviour: MockStatsBehaviour = None
+
+    def send_body(self, status, body, content_type):
+        self.behaviour.count_request(*self.request_key, status)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        behaviour = self.behaviour
+        url = urlparse(self.path)
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1].lower()
+        params = dict(parse_qsl(url.query, keep_blank_values=True))
+        self.request_key = (endpoint, params)
+
+        if endpoint not in MOCK_ENDPOINTS:
+            return self.send_body(404, f"Unknown endpoint {endpoint}".encode(), 'text/plain')
+        # Throttled responses are HTML pages like the real API's, so clients see them as non-JSON responses
+        if behaviour.is_rate_limited():
+            return self.send_body(429, b"<html><body>Too Many Requests</body></html>", 'text/html')
+        if behaviour.hang_rate and random.random() < behaviour.hang_rate:
+            sleep(behaviour.hang_seconds)
+        if behaviour.latency:
+            sleep(max(0.0, random.gauss(behaviour.latency, behaviour.latency_jitter)))
+        if behaviour.error_rate and random.random() < behaviour.error_rate:
+            return self.send_body(500, b"<html><body>Internal Server Error</body></html>", 'text/html')
+
+        try:
+            body = behaviour.response_body(endpoint, params)
+        except Exception as e:
+            logging.error(f"Failed to build a response for {endpoint} {params}: {e}")
+            return self.send_body(500, str(e).encode(), 'text/plain')
+        self.send_body(200, body, 'application/json')
+
+    def log_message(self, format, *args):
+        logging.debug(format % args)
+
+# Function to start the mock server; returns it so callers (e.g. benchmarks) can run it in a background thread
+def create_mock_server(host='127.0.0.1', port=8765, fixtures_dir=None, record=False, latency=0.0, latency_jitter=0.0, error_rate=0.0,
+                       rate_limit=None, hang_rate=0.0, hang_seconds=120, games_per_season=1230, playoff_games=80, as_of=None):
+    if fixtures_dir is None:
+        fixtures_dir = Path(__file__).resolve().parents[1] / "data" / "fixtures"
+    league = SyntheticLeague(games_per_season, playoff_games, as_of=as_of)
+    handler = type('ConfiguredMockStatsHandler', (MockStatsHandler,), {
+        'behaviour': MockStatsBehaviour(league, fixtures_dir, record, latency, latency_jitter, error_rate, rate_limit, hang_rate, hang_seconds)
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock NBA stats API responses for offline ingestion runs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures-dir", help="Directory of recorded responses (default: data/fixtures)")
+    parser.add_argument("--record", action="store_true", help="Fetch requests without a fixture from stats.nba.com and save them")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean added latency per request in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Standard deviation of the added latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second above which requests are answered with HTTP 429")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Fraction of requests held for --hang-seconds to trigger client timeouts")
+    parser.add_argument("--hang-seconds", type=float, default=120)
+    parser.add_argument("--games-per-season", type=int, default=1230, help="Regular season games in each synthetic season")
+    parser.add_argument("--playoff-games", type=int, default=80, help="Playoff games in each synthetic season")
+    parser.add_argument("--as-of", type=lambda value: datetime.strptime(value, "%Y-%m-%d"), help="Date up to which synthetic games are final (default: today)")
+    args = parser.parse_args()
+
+    initialize_script_environment()
+    server = create_mock_server(
+        args.host, args.port, args.fixtures_dir, args.record, args.latency, args.latency_jitter, args.error_rate,
+        args.rate_limit, args.hang_rate, args.hang_seconds, args.games_per_season, args.playoff_games, args.as_of
+    )
+    logging.info(f"Mock stats API listening on http://{args.host}:{args.port}/stats (set NBA_STATS_BASE_URL to this URL).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Mock stats API stopped.")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#################################### Preparing Bulk Load Files ####################################
+# Run this script after ingestion to write the raw tables as load-ready files for Snowflake
+# Each table is split into roughly equal gzip-compressed CSV (or Parquet) parts in data/load/<season>, so AzCopy uploads the parts
+# in parallel and one COPY INTO loads them in parallel, instead of a single large uncompressed CSV per table
+# Alongside the parts it writes:
+#   manifest.json               <- rows, bytes and MD5 checksum of every part, and the raw files each table came from
+#   copy_into_<season>.sql      <- a COPY INTO per table that matches its parts with PATTERN
+# Examples:
+#   python prepare_load_files.py
+#   python prepare_load_files.py --tables RAW_ADVANCED RAW_USAGE --format parquet
+#   python prepare_load_files.py --target-mb 50                   <- smaller parts, e.g. for a slow upload link
+import json
+import logging
+import argparse
+from datetime import datetime
+from config import (
+    get_season_config,
+    initialize_script_environment,
+    write_load_files,
+    build_copy_statement,
+    export_run_metrics,
+    RUN_METRICS,
+    LOAD_TABLES,
+    LOAD_FILE_FORMAT,
+    LOAD_PART_TARGET_BYTES,
+    FILE_FORMATS
+)
+
+# Statements at the top of the generated SQL, creating the file formats the COPY INTO statements use
+# Compressed CSV parts load with the same CSV format as "DDL Script Table Management.sql", since COMPRESSION = AUTO detects gzip
+SQL_HEADER = """---------------------   GENERATED BY prepare_load_files.py: COPY THE PARTITIONED LOAD FILES INTO THE RAW TABLES   ---------------------
+-- Upload the folder to the stage first, e.g. azcopy copy "data/load/{season}/*" "<container url>/{season}/"
+CREATE OR REPLACE FILE FORMAT nba_pipeline_csv_format
+TYPE = 'CSV'
+FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+PARSE_HEADER = TRUE
+NULL_IF = ('NULL', 'null')
+EMPTY_FIELD_AS_NULL = true;
+
+CREATE FILE FORMAT IF NOT EXISTS nba_pipeline_parquet_format
+TYPE = 'PARQUET';
+
+"""
+
+# Main function to run the script
+def main():
+    season, _ = get_season_config()
+    parser = argparse.ArgumentParser(description="Write the raw tables as partitioned, compressed load files with a manifest and COPY INTO statements.")
+    parser.add_argument("--season", default=season)
+    parser.add_argument("--tables", nargs="+", default=list(LOAD_TABLES), choices=list(LOAD_TABLES))
+    parser.add_argument("--format", default=LOAD_FILE_FORMAT, choices=FILE_FORMATS, help="'csv' parts are gzip-compressed")
+    parser.add_argument("--target-mb", type=float, default=LOAD_PART_TARGET_BYTES / 1024 ** 2, help="Target compressed size of each part")
+    parser.add_argument("--parts", type=int, help="Fixed number of parts per table instead of sizing them by --target-mb")
+    parser.add_argument("--stage", default="RAW_STAGE", help="Stage the load folder is uploaded to")
+    args = parser.parse_args()
+
+    script_env = initialize_script_environment(log_suffix="_load_files")
+    output_dir = script_env.load_dir / args.season
+    output_dir.mkdir(exist_ok=True)
+    logging.info(f"Writing load files for {args.season} to {output_dir}...")
+
+    manifest_path = output_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {'tables': {}}
+    try:
+        for table in args.tables:
+            with RUN_METRICS.stage(f"load_files_{table}"):
+                entry = write_load_files(script_env, table, args.season, output_dir, args.format, args.target_mb * 1024 ** 2, args.parts)
+            if entry is None:
+                logging.warning(f"No raw {LOAD_TABLES[table]['source']} files for {args.season}; skipping {table}.")
+                continue
+            manifest['tables'][entry['table']] = entry
+            logging.info(f"Wrote {entry['rows']} rows of {entry['table']} to {len(entry['parts'])} parts ({entry['bytes'] / 1024 ** 2:.1f} MB).")
+    finally:
+        export_run_metrics(script_env, "prepare_load_files")
+
+    # The manifest and SQL cover every table written so far for the season, so tables can be refreshed one at a time
+    manifest.update({'season': args.season, 'updated_at': datetime.now().isoformat(timespec='seconds')})
+    manifest_path.write_text(json.dumps(manifest, indent=2))
+
+    statements = [build_copy_statement(entry, f"{args.stage}/{args.season}/") for entry in manifest['tables'].values()]
+    sql_path = output_dir / f"copy_into_{args.season}.sql"
+    sql_path.write_text(SQL_HEADER.format(season=args.season) + "\n".join(statements))
+    logging.info(f"Saved the manifest to {manifest_path} and COPY INTO statements to {sql_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#################################### Testing the Adaptive Rate Limiter ####################################
+# Checks the additive increase / multiplicative decrease behaviour of TokenBucket and that SharedTokenBucket adapts one
+# request budget across processes
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import unittest
+import multiprocessing as mp
+from unittest import mock
+import config
+from config import TokenBucket, SharedTokenBucket
+
+# Function to report a throttling error from a worker process
+def throttle_in_worker(rate_limiter):
+    rate_limiter.record_throttle()
+
+class TokenBucketTest(unittest.TestCase):
+    def test_success_raises_rate_by_step_up_to_max_rate(self):
+        bucket = TokenBucket(2.0, max_rate=2.05)
+        bucket.record_success()
+        self.assertAlmostEqual(bucket.current_rate, 2.0 + config.AIMD_INCREASE_STEP)
+        for _ in range(100):
+            bucket.record_success()
+        self.assertAlmostEqual(bucket.current_rate, 2.05)
+
+    def test_throttle_cuts_rate_and_empties_bucket(self):
+        bucket = TokenBucket(4.0, min_rate=0.25)
+        bucket.record_throttle()
+        self.assertAlmostEqual(bucket.current_rate, 4.0 * config.AIMD_DECREASE_FACTOR)
+        self.assertEqual(bucket.state[bucket.TOKENS], 0.0)
+
+    def test_throttles_within_cooldown_count_once(self):
+        bucket = TokenBucket(4.0, min_rate=0.25)
+        bucket.record_throttle()
+        bucket.record_throttle()
+        self.assertAlmostEqual(bucket.current_rate, 4.0 * config.AIMD_DECREASE_FACTOR)
+
+        # Once the cooldown has passed the next throttle cuts the rate again
+        bucket.state[bucket.LAST_DECREASE] -= config.AIMD_DECREASE_COOLDOWN
+        bucket.record_throttle()
+        self.assertAlmostEqual(bucket.current_rate, 4.0 * config.AIMD_DECREASE_FACTOR ** 2)
+
+    def test_throttle_never_goes_below_min_rate(self):
+        bucket = TokenBucket(1.0, min_rate=0.75)
+        bucket.record_throttle()
+        self.assertAlmostEqual(bucket.current_rate, 0.75)
+
+    def test_success_after_throttle_recovers_additively(self):
+        bucket = TokenBucket(2.0, max_rate=8.0)
+        bucket.record_throttle()
+        for _ in range(10):
+            bucket.record_success()
+        self.assertAlmostEqual(bucket.current_rate, 2.0 * config.AIMD_DECREASE_FACTOR + 10 * config.AIMD_INCREASE_STEP)
+
+    def test_acquire_takes_tokens_without_waiting_while_bucket_has_them(self):
+        bucket = TokenBucket(1.0, capacity=3)
+        with mock.patch.object(config, 'sleep') as sleep:
+            for _ in range(3):
+                bucket.acquire()
+        sleep.assert_not_called()
+        self.assertLess(bucket.state[bucket.TOKENS], 1)
+
+    def test_acquire_waits_for_refill_at_current_rate(self):
+        bucket = TokenBucket(0.5, capacity=1, min_rate=0.25)
+        bucket.state[bucket.TOKENS] = 0.0
+        waits = []
+
+        def refill(seconds):
+            waits.append(seconds)
+            bucket.state[bucket.TOKENS] = 1.0
+
+        with mock.patch.object(config, 'sleep', side_effect=refill):
+            bucket.acquire()
+        self.assertEqual(len(waits), 1)
+        self.assertAlmostEqual(waits[0], 1 / 0.5, delta=0.1)
+
+class SharedTokenBucketTest(unittest.TestCase):
+    @unittest.skipUnless('fork' in mp.get_all_start_methods(), "needs the fork start method")
+    def test_throttle_in_one_process_slows_every_process(self):
+        bucket = SharedTokenBucket(4.0, min_rate=0.25)
+        worker = mp.get_context('fork').Process(target=throttle_in_worker, args=(bucket,))
+        worker.start()
+        worker.join(timeout=30)
+        self.assertEqual(worker.exitcode, 0)
+        self.assertAlmostEqual(bucket.current_rate, 4.0 * config.AIMD_DECREASE_FACTOR)
+
+if __name__ == "__main__":
+    unittest.main()
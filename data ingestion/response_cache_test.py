@@ -0,0 +1,155 @@
+#################################### Testing the Response Cache ####################################
+# Checks that cached nba_api responses are keyed on the endpoint and its parameters, expire after their TTL,
+# are evicted least recently used first once the cache is over its size limit, and that only boxscores of final games never expire
+# Examples:
+#   python -m unittest discover -s "data ingestion" -p "*_test.py"
+import os
+import logging
+import tempfile
+import unittest
+from time import time
+from pathlib import Path
+from unittest import mock
+import pandas as pd
+import config
+from config import ResponseCache, call_endpoint, record_final_games
+
+# Function to set an entry's last access and modification times to a number of seconds ago
+def age_entry(path, accessed_ago, modified_ago):
+    now = time()
+    os.utime(path, (now - accessed_ago, now - modified_ago))
+
+# Stand-in for an nba_api boxscore endpoint that counts the requests it makes
+class BoxScoreTraditionalV2:
+    requests = 0
+
+    def __init__(self, game_id, timeout, get_request):
+        self.game_id = game_id
+
+    def get_request(self):
+        type(self).requests += 1
+
+    def get_data_frames(self):
+        return [pd.DataFrame({'GAME_ID': [self.game_id], 'PTS': [110]})]
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = ResponseCache(Path(self.tmp_dir.name) / "cache")
+        self.df = pd.DataFrame({'GAME_ID': ['0022400001'], 'PTS': [110]})
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    def test_entries_are_keyed_on_endpoint_and_params(self):
+        self.cache.put('BoxScoreTraditionalV2', {'game_id': '0022400001', 'timeout': 60}, self.df)
+
+        pd.testing.assert_frame_equal(self.cache.get('BoxScoreTraditionalV2', {'timeout': 60, 'game_id': '0022400001'}), self.df)
+        self.assertIsNone(self.cache.get('BoxScoreTraditionalV2', {'game_id': '0022400002', 'timeout': 60}))
+        self.assertIsNone(self.cache.get('BoxScoreAdvancedV2', {'game_id': '0022400001', 'timeout': 60}))
+
+    def test_put_leaves_no_temporary_files(self):
+        self.cache.put('BoxScoreTraditionalV2', {'game_id': '0022400001'}, self.df)
+        files = [f.name for f in self.cache.cache_dir.rglob("*") if f.is_file()]
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].endswith(".pkl.gz"))
+
+    def test_entries_expire_after_ttl(self):
+        params = {'game_id': '0022400001'}
+        self.cache.put('BoxScoreTraditionalV2', params, self.df)
+        age_entry(self.cache.entry_path('BoxScoreTraditionalV2', params), accessed_ago=7200, modified_ago=7200)
+
+        self.assertIsNone(self.cache.get('BoxScoreTraditionalV2', params, ttl=3600))
+        self.assertIsNotNone(self.cache.get('BoxScoreTraditionalV2', params, ttl=3 * 3600))
+        self.assertIsNotNone(self.cache.get('BoxScoreTraditionalV2', params, ttl=None))
+
+    def test_unreadable_entry_is_discarded(self):
+        params = {'game_id': '0022400001'}
+        path = self.cache.entry_path('BoxScoreTraditionalV2', params)
+        path.parent.mkdir()
+        path.write_bytes(b"not a pickle")
+
+        self.assertIsNone(self.cache.get('BoxScoreTraditionalV2', params))
+        self.assertFalse(path.exists())
+
+    def test_eviction_removes_least_recently_used_first(self):
+        paths = {}
+        for game_number in range(1, 4):
+            params = {'game_id': f'002240000{game_number}'}
+            self.cache.put('BoxScoreTraditionalV2', params, self.df)
+            paths[game_number] = self.cache.entry_path('BoxScoreTraditionalV2', params)
+        age_entry(paths[1], accessed_ago=300, modified_ago=300)
+        age_entry(paths[2], accessed_ago=200, modified_ago=200)
+        age_entry(paths[3], accessed_ago=100, modified_ago=100)
+
+        # Reading the oldest entry makes it the most recently used
+        self.assertIsNotNone(self.cache.get('BoxScoreTraditionalV2', {'game_id': '0022400001'}))
+
+        entry_bytes = paths[1].stat().st_size
+        removed = self.cache.evict(max_bytes=entry_bytes * 2)
+        self.assertEqual(removed, 1)
+        self.assertFalse(paths[2].exists())
+        self.assertTrue(paths[1].exists() and paths[3].exists())
+
+        self.assertEqual(self.cache.evict(max_bytes=0), 2)
+
+    def test_invalidate_by_endpoint_and_age(self):
+        self.cache.put('BoxScoreTraditionalV2', {'game_id': '0022400001'}, self.df)
+        self.cache.put('BoxScoreTraditionalV2', {'game_id': '0022400002'}, self.df)
+        self.cache.put('LeagueGameLog', {'season': '2024-25'}, self.df)
+        age_entry(self.cache.entry_path('BoxScoreTraditionalV2', {'game_id': '0022400001'}), accessed_ago=7200, modified_ago=7200)
+
+        self.assertEqual(self.cache.invalidate('BoxScoreTraditionalV2', older_than=3600), 1)
+        self.assertEqual(self.cache.invalidate('LeagueGameLog'), 1)
+        self.assertIsNotNone(self.cache.get('BoxScoreTraditionalV2', {'game_id': '0022400002'}))
+
+class FinalGameCachingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = ResponseCache(Path(self.tmp_dir.name) / "cache")
+        for patcher in (mock.patch.object(config, 'RESPONSE_CACHE', self.cache),
+                        mock.patch.object(config, 'FINAL_GAME_IDS', set()),
+                        mock.patch.object(config.RATE_LIMITER, 'acquire')):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        BoxScoreTraditionalV2.requests = 0
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    # Age every cached boxscore past the boxscore TTL
+    def age_entries(self):
+        for path in self.cache.cache_dir.glob("BoxScoreTraditionalV2/*.pkl.gz"):
+            age_entry(path, accessed_ago=0, modified_ago=config.CACHE_TTLS['BoxScoreTraditionalV2'] + 60)
+
+    def test_boxscores_of_games_not_known_final_expire(self):
+        call_endpoint(BoxScoreTraditionalV2, game_id='0022400001')
+        call_endpoint(BoxScoreTraditionalV2, game_id='0022400001')
+        self.assertEqual(BoxScoreTraditionalV2.requests, 1)
+
+        self.age_entries()
+        call_endpoint(BoxScoreTraditionalV2, game_id='0022400001')
+        self.assertEqual(BoxScoreTraditionalV2.requests, 2)
+
+    def test_boxscores_of_final_games_never_expire(self):
+        call_endpoint(BoxScoreTraditionalV2, final=True, game_id='0022400001')
+        self.age_entries()
+        call_endpoint(BoxScoreTraditionalV2, final=True, game_id='0022400001')
+        self.assertEqual(BoxScoreTraditionalV2.requests, 1)
+
+    def test_entry_cached_before_the_game_was_final_is_not_reused(self):
+        call_endpoint(BoxScoreTraditionalV2, game_id='0022400001')
+        call_endpoint(BoxScoreTraditionalV2, final=True, game_id='0022400001')
+        self.assertEqual(BoxScoreTraditionalV2.requests, 2)
+
+    def test_only_final_games_in_the_schedule_are_recorded(self):
+        record_final_games(pd.DataFrame({'gameId': [22400001, '0022400002', '0022400003'], 'gameStatus': [3, 2, 1]}))
+        self.assertEqual(config.FINAL_GAME_IDS, {'0022400001'})
+
+        with mock.patch.object(config, 'call_endpoint', return_value=pd.DataFrame({'PTS': [110]})) as fake_call:
+            config.fetch_boxscores_by_game('0022400001', box_types=['traditional'])
+            config.fetch_boxscores_by_game('0022400002', box_types=['traditional'])
+        self.assertEqual([call.kwargs['final'] for call in fake_call.call_args_list], [True, False])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,356 @@
+#################################### Boxscore Schemas ####################################
+# Explicit column types for each boxscore type, matching the RAW_* table definitions in "DDL Script Table Management.sql"
+# GAME_ID (and hustle's gameId) are kept as strings so the leading zeros survive every write and read,
+# and jerseyNum is a string because jersey numbers such as "00" are not integers
+# Int64 is pandas' nullable integer type, so players without stats keep missing values instead of becoming floats
+
+BOXSCORE_SCHEMAS = {
+    'advanced': {
+        'GAME_ID': 'string',
+        'TEAM_ID': 'Int64',
+        'TEAM_ABBREVIATION': 'string',
+        'TEAM_CITY': 'string',
+        'PLAYER_ID': 'Int64',
+        'PLAYER_NAME': 'string',
+        'NICKNAME': 'string',
+        'START_POSITION': 'string',
+        'COMMENT': 'string',
+        'MIN': 'string',
+        'E_OFF_RATING': 'float64',
+        'OFF_RATING': 'float64',
+        'E_DEF_RATING': 'float64',
+        'DEF_RATING': 'float64',
+        'E_NET_RATING': 'float64',
+        'NET_RATING': 'float64',
+        'AST_PCT': 'float64',
+        'AST_TOV': 'float64',
+        'AST_RATIO': 'float64',
+        'OREB_PCT': 'float64',
+        'DREB_PCT': 'float64',
+        'REB_PCT': 'float64',
+        'TM_TOV_PCT': 'float64',
+        'EFG_PCT': 'float64',
+        'TS_PCT': 'float64',
+        'USG_PCT': 'float64',
+        'E_USG_PCT': 'float64',
+        'E_PACE': 'float64',
+        'PACE': 'float64',
+        'PACE_PER40': 'float64',
+        'POSS': 'float64',
+        'PIE': 'float64'
+    },
+    'hustle': {
+        'gameId': 'string',
+        'teamId': 'Int64',
+        'teamCity': 'string',
+        'teamName': 'string',
+        'teamTricode': 'string',
+        'teamSlug': 'string',
+        'personId': 'Int64',
+        'firstName': 'string',
+        'familyName': 'string',
+        'nameI': 'string',
+        'playerSlug': 'string',
+        'position': 'string',
+        'comment': 'string',
+        'jerseyNum': 'string',
+        'minutes': 'string',
+        'points': 'Int64',
+        'contestedShots': 'Int64',
+        'contestedShots2pt': 'Int64',
+        'contestedShots3pt': 'Int64',
+        'deflections': 'Int64',
+        'chargesDrawn': 'Int64',
+        'screenAssists': 'Int64',
+        'screenAssistPoints': 'Int64',
+        'looseBallsRecoveredOffensive': 'Int64',
+        'looseBallsRecoveredDefensive': 'Int64',
+        'looseBallsRecoveredTotal': 'Int64',
+        'offensiveBoxOuts': 'Int64',
+        'defensiveBoxOuts': 'Int64',
+        'boxOutPlayerTeamRebounds': 'Int64',
+        'boxOutPlayerRebounds': 'Int64',
+        'boxOuts': 'Int64',
+        'GAME_ID': 'string'
+    },
+    'scoring': {
+        'GAME_ID': 'string',
+        'TEAM_ID': 'Int64',
+        'TEAM_ABBREVIATION': 'string',
+        'TEAM_CITY': 'string',
+        'PLAYER_ID': 'Int64',
+        'PLAYER_NAME': 'string',
+        'NICKNAME': 'string',
+        'START_POSITION': 'string',
+        'COMMENT': 'string',
+        'MIN': 'string',
+        'PCT_FGA_2PT': 'float64',
+        'PCT_FGA_3PT': 'float64',
+        'PCT_PTS_2PT': 'float64',
+        'PCT_PTS_2PT_MR': 'float64',
+        'PCT_PTS_3PT': 'float64',
+        'PCT_PTS_FB': 'float64',
+        'PCT_PTS_FT': 'float64',
+        'PCT_PTS_OFF_TOV': 'float64',
+        'PCT_PTS_PAINT': 'float64',
+        'PCT_AST_2PM': 'float64',
+        'PCT_UAST_2PM': 'float64',
+        'PCT_AST_3PM': 'float64',
+        'PCT_UAST_3PM': 'float64',
+        'PCT_AST_FGM': 'float64',
+        'PCT_UAST_FGM': 'float64'
+    },
+    'traditional': {
+        'GAME_ID': 'string',
+        'TEAM_ID': 'Int64',
+        'TEAM_ABBREVIATION': 'string',
+        'TEAM_CITY': 'string',
+        'PLAYER_ID': 'Int64',
+        'PLAYER_NAME': 'string',
+        'NICKNAME': 'string',
+        'START_POSITION': 'string',
+        'COMMENT': 'string',
+        'MIN': 'string',
+        'FGM': 'Int64',
+        'FGA': 'Int64',
+        'FG_PCT': 'float64',
+        'FG3M': 'Int64',
+        'FG3A': 'Int64',
+        'FG3_PCT': 'float64',
+        'FTM': 'Int64',
+        'FTA': 'Int64',
+        'FT_PCT': 'float64',
+        'OREB': 'Int64',
+        'DREB': 'Int64',
+        'REB': 'Int64',
+        'AST': 'Int64',
+        'STL': 'Int64',
+        'BLK': 'Int64',
+        'TO': 'Int64',
+        'PF': 'Int64',
+        'PTS': 'Int64',
+        'PLUS_MINUS': 'Int64'
+    },
+    'playertrack': {
+        'GAME_ID': 'string',
+        'TEAM_ID': 'Int64',
+        'TEAM_ABBREVIATION': 'string',
+        'TEAM_CITY': 'string',
+        'PLAYER_ID': 'Int64',
+        'PLAYER_NAME': 'string',
+        'START_POSITION': 'string',
+        'COMMENT': 'string',
+        'MIN': 'string',
+        'SPD': 'float64',
+        'DIST': 'float64',
+        'ORBC': 'Int64',
+        'DRBC': 'Int64',
+        'RBC': 'Int64',
+        'TCHS': 'Int64',
+        'SAST': 'Int64',
+        'FTAST': 'Int64',
+        'PASS': 'Int64',
+        'AST': 'Int64',
+        'CFGM': 'Int64',
+        'CFGA': 'Int64',
+        'CFG_PCT': 'float64',
+        'UFGM': 'Int64',
+        'UFGA': 'Int64',
+        'UFG_PCT': 'float64',
+        'FG_PCT': 'float64',
+        'DFGM': 'Int64',
+        'DFGA': 'Int64',
+        'DFG_PCT': 'float64'
+    },
+    'usage': {
+        'GAME_ID': 'string',
+        'TEAM_ID': 'Int64',
+        'TEAM_ABBREVIATION': 'string',
+        'TEAM_CITY': 'string',
+        'PLAYER_ID': 'Int64',
+        'PLAYER_NAME': 'string',
+        'NICKNAME': 'string',
+        'START_POSITION': 'string',
+        'COMMENT': 'string',
+        'MIN': 'string',
+        'USG_PCT': 'float64',
+        'PCT_FGM': 'float64',
+        'PCT_FGA': 'float64',
+        'PCT_FG3M': 'float64',
+        'PCT_FG3A': 'float64',
+        'PCT_FTM': 'float64',
+        'PCT_FTA': 'float64',
+        'PCT_OREB': 'float64',
+        'PCT_DREB': 'float64',
+        'PCT_REB': 'float64',
+        'PCT_AST': 'float64',
+        'PCT_TOV': 'float64',
+        'PCT_STL': 'float64',
+        'PCT_BLK': 'float64',
+        'PCT_BLKA': 'float64',
+        'PCT_PF': 'float64',
+        'PCT_PFD': 'float64',
+        'PCT_PTS': 'float64'
+    }
+}
+
+# Columns holding the 10-character game ID
+GAME_ID_COLUMNS = ['GAME_ID', 'gameId']
+
+# Columns identifying one player-game row for each boxscore type (hustle keeps the API's camelCase player column)
+BOXSCORE_KEYS = {
+    'advanced': ['GAME_ID', 'PLAYER_ID'],
+    'hustle': ['GAME_ID', 'personId'],
+    'scoring': ['GAME_ID', 'PLAYER_ID'],
+    'traditional': ['GAME_ID', 'PLAYER_ID'],
+    'playertrack': ['GAME_ID', 'PLAYER_ID'],
+    'usage': ['GAME_ID', 'PLAYER_ID']
+}
+
+
+#################################### Table Specs ####################################
+# Declarative spec of each table loaded into Snowflake, keyed by processed table name
+# One spec drives every stage: the boxscore columns ingestion keeps (PROJECT_BOXSCORE_COLUMNS in config.py), the RAW_* tables and
+# COPY INTO statements written by "database/generate_ddl.py", and the transformations in "Data Transformations.py" and local_transformations.py
+#   source      raw file name, e.g. boxscore_hustle for boxscore_hustle_2024-25.csv (and the stage file raw_boxscore_hustle_final_2024-25.csv)
+#   box_type    set for boxscore tables, whose raw files are written with the boxscore schema above
+#   keys        primary key of the processed table, matching "DDL Script Constraints.sql"
+#   filter      (raw column, value) rows must match to be kept, e.g. only active players
+#   columns     (raw name, Snowflake type) or (raw name, Snowflake type, processed name) for renamed columns, in processed column order
+#               MIN is converted to float minutes, and DATE columns are parsed as dates
+TABLE_SPECS = {
+    'PLAYERS': {
+        'source': "all_players",
+        'keys': ['PERSON_ID'],
+        'filter': ('ROSTERSTATUS', 'Active'),
+        'columns': [
+            ("PERSON_ID", "INT"), ("FIRST_NAME", "STRING"), ("LAST_NAME", "STRING"), ("BIRTHDATE", "DATE"), ("SCHOOL", "STRING"),
+            ("COUNTRY", "STRING"), ("HEIGHT", "STRING"), ("WEIGHT", "FLOAT"), ("SEASON_EXP", "INT"), ("JERSEY", "STRING"),
+            ("POSITION", "STRING"), ("TEAM_ID", "INT"), ("DLEAGUE_FLAG", "STRING"), ("DRAFT_YEAR", "STRING"), ("DRAFT_ROUND", "STRING"),
+            ("DRAFT_NUMBER", "STRING"), ("GREATEST_75_FLAG", "STRING")
+        ]
+    },
+    'TEAMS': {
+        'source': "all_teams",
+        'keys': ['TEAM_ID'],
+        'columns': [
+            ("TEAM_ID", "INT"), ("ABBREVIATION", "STRING"), ("CITY", "STRING"), ("NICKNAME", "STRING"), ("YEARFOUNDED", "INT"),
+            ("ARENA", "STRING"), ("ARENACAPACITY", "INT"), ("OWNER", "STRING"), ("GENERALMANAGER", "STRING"), ("HEADCOACH", "STRING"),
+            ("DLEAGUEAFFILIATION", "STRING")
+        ]
+    },
+    'ADVANCED': {
+        'source': "boxscore_advanced",
+        'box_type': 'advanced',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("TEAM_ID", "INT"), ("PLAYER_ID", "INT"), ("MIN", "STRING"), ("E_OFF_RATING", "FLOAT"),
+            ("OFF_RATING", "FLOAT"), ("E_DEF_RATING", "FLOAT"), ("DEF_RATING", "FLOAT"), ("E_NET_RATING", "FLOAT"),
+            ("NET_RATING", "FLOAT"), ("AST_PCT", "FLOAT"), ("AST_TOV", "FLOAT"), ("AST_RATIO", "FLOAT"), ("OREB_PCT", "FLOAT"),
+            ("DREB_PCT", "FLOAT"), ("REB_PCT", "FLOAT"), ("TM_TOV_PCT", "FLOAT"), ("EFG_PCT", "FLOAT"), ("TS_PCT", "FLOAT"),
+            ("USG_PCT", "FLOAT"), ("E_USG_PCT", "FLOAT"), ("E_PACE", "FLOAT"), ("PACE", "FLOAT"), ("PACE_PER40", "FLOAT"),
+            ("POSS", "FLOAT"), ("PIE", "FLOAT")
+        ]
+    },
+    'HUSTLE': {
+        'source': "boxscore_hustle",
+        'box_type': 'hustle',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("teamId", "INT", "TEAM_ID"), ("personId", "INT", "PLAYER_ID"), ("minutes", "STRING", "MIN"),
+            ("points", "INT", "PTS"), ("contestedShots", "INT", "CONTESTED_SHOTS"), ("contestedShots2pt", "INT", "CONTESTED_SHOTS_2PT"),
+            ("contestedShots3pt", "INT", "CONTESTED_SHOTS_3PT"), ("deflections", "INT", "DEFLECTIONS"),
+            ("chargesDrawn", "INT", "CHARGES_DRAWN"), ("screenAssists", "INT", "SCREEN_ASSISTS"),
+            ("screenAssistPoints", "INT", "SCREEN_ASSIST_POINTS"),
+            ("looseBallsRecoveredOffensive", "INT", "LOOSEBALLS_RECOVERED_OFFENSIVE"),
+            ("looseBallsRecoveredDefensive", "INT", "LOOSEBALLS_RECOVERED_DEFENSIVE"),
+            ("looseBallsRecoveredTotal", "INT", "LOOSEBALLS_RECOVERED_TOTAL"), ("offensiveBoxOuts", "INT", "OFFENSIVE_BOXOUTS"),
+            ("defensiveBoxOuts", "INT", "DEFENSIVE_BOXOUTS"), ("boxOutPlayerTeamRebounds", "INT", "BOXOUT_PLAYER_TEAM_REBOUNDS"),
+            ("boxOutPlayerRebounds", "INT", "BOXOUT_PLAYER_REBOUNDS"), ("boxOuts", "INT", "BOXOUTS")
+        ]
+    },
+    'PLAYERTRACK': {
+        'source': "boxscore_playertrack",
+        'box_type': 'playertrack',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("TEAM_ID", "INT"), ("PLAYER_ID", "INT"), ("MIN", "STRING"), ("SPD", "FLOAT"), ("DIST", "FLOAT"),
+            ("ORBC", "INT"), ("DRBC", "INT"), ("RBC", "INT"), ("TCHS", "INT"), ("SAST", "INT"), ("FTAST", "INT"), ("PASS", "INT"),
+            ("AST", "INT"), ("CFGM", "INT"), ("CFGA", "INT"), ("CFG_PCT", "FLOAT"), ("UFGM", "INT"), ("UFGA", "INT"), ("UFG_PCT", "FLOAT"),
+            ("FG_PCT", "FLOAT"), ("DFGM", "INT"), ("DFGA", "INT"), ("DFG_PCT", "FLOAT")
+        ]
+    },
+    'SCORING': {
+        'source': "boxscore_scoring",
+        'box_type': 'scoring',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("TEAM_ID", "INT"), ("PLAYER_ID", "INT"), ("MIN", "STRING"), ("PCT_FGA_2PT", "FLOAT"),
+            ("PCT_FGA_3PT", "FLOAT"), ("PCT_PTS_2PT", "FLOAT"), ("PCT_PTS_2PT_MR", "FLOAT"), ("PCT_PTS_3PT", "FLOAT"),
+            ("PCT_PTS_FB", "FLOAT"), ("PCT_PTS_FT", "FLOAT"), ("PCT_PTS_OFF_TOV", "FLOAT"), ("PCT_PTS_PAINT", "FLOAT"),
+            ("PCT_AST_2PM", "FLOAT"), ("PCT_UAST_2PM", "FLOAT"), ("PCT_AST_3PM", "FLOAT"), ("PCT_UAST_3PM", "FLOAT"),
+            ("PCT_AST_FGM", "FLOAT"), ("PCT_UAST_FGM", "FLOAT")
+        ]
+    },
+    'TRADITIONAL': {
+        'source': "boxscore_traditional",
+        'box_type': 'traditional',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("TEAM_ID", "INT"), ("PLAYER_ID", "INT"), ("MIN", "STRING"), ("FGM", "INT"), ("FGA", "INT"),
+            ("FG_PCT", "FLOAT"), ("FG3M", "INT"), ("FG3A", "INT"), ("FG3_PCT", "FLOAT"), ("FTM", "INT"), ("FTA", "INT"),
+            ("FT_PCT", "FLOAT"), ("OREB", "INT"), ("DREB", "INT"), ("REB", "INT"), ("AST", "INT"), ("STL", "INT"), ("BLK", "INT"),
+            ("TO", "INT"), ("PF", "INT"), ("PTS", "INT"), ("PLUS_MINUS", "INT")
+        ]
+    },
+    'USAGE': {
+        'source': "boxscore_usage",
+        'box_type': 'usage',
+        'keys': ['GAME_ID', 'PLAYER_ID'],
+        'columns': [
+            ("GAME_ID", "INT"), ("TEAM_ID", "INT"), ("PLAYER_ID", "INT"), ("MIN", "STRING"), ("USG_PCT", "FLOAT"), ("PCT_FGM", "FLOAT"),
+            ("PCT_FGA", "FLOAT"), ("PCT_FG3M", "FLOAT"), ("PCT_FG3A", "FLOAT"), ("PCT_FTM", "FLOAT"), ("PCT_FTA", "FLOAT"),
+            ("PCT_OREB", "FLOAT"), ("PCT_DREB", "FLOAT"), ("PCT_REB", "FLOAT"), ("PCT_AST", "FLOAT"), ("PCT_TOV", "FLOAT"),
+            ("PCT_STL", "FLOAT"), ("PCT_BLK", "FLOAT"), ("PCT_BLKA", "FLOAT"), ("PCT_PF", "FLOAT"), ("PCT_PFD", "FLOAT"),
+            ("PCT_PTS", "FLOAT")
+        ]
+    },
+    'SCHEDULE': {
+        'source': "nba_schedule",
+        'keys': ['GAME_ID'],
+        'columns': [
+            ("seasonYear", "STRING", "SEASON"), ("gameDate", "DATE", "GAME_DATE"), ("gameId", "INT", "GAME_ID"),
+            ("gameCode", "STRING", "GAME_CODE"), ("homeTeam_teamId", "INT", "HOME_TEAM_ID"), ("homeTeam_score", "INT", "HOME_TEAM_SCORE"),
+            ("awayTeam_teamId", "INT", "AWAY_TEAM_ID"), ("awayTeam_score", "INT", "AWAY_TEAM_SCORE"),
+            ("pointsLeaders_0_personId", "INT", "POINTS_LEADER_ID"), ("pointsLeaders_0_points", "FLOAT", "POINTS_LEADER_POINTS")
+        ]
+    }
+}
+
+# Tables whose processed table is rebuilt on every run, even in merge mode: they are small, and rows that drop out
+# (e.g. players no longer active) must leave the processed table, or rows of games already loaded change (scores of
+# scheduled games once they are played), which merging only new games would never pick up
+OVERWRITE_ONLY_TABLES = ['PLAYERS', 'TEAMS', 'SCHEDULE']
+
+# Function to get (raw name, Snowflake type, processed name) for each column of a table spec
+def spec_columns(spec):
+    return [(column[0], column[1], column[2] if len(column) == 3 else column[0]) for column in spec['columns']]
+
+# Function to get the raw columns a table needs, with their Snowflake types: the spec's columns plus the filter column
+# Boxscore tables also keep their key columns (e.g. hustle's personId) and follow the boxscore schema's column order
+def spec_raw_columns(spec):
+    raw_columns = {raw_name: sql_type for raw_name, sql_type, _ in spec_columns(spec)}
+    if 'filter' in spec:
+        raw_columns.setdefault(spec['filter'][0], 'STRING')
+    box_type = spec.get('box_type')
+    if box_type is None:
+        return list(raw_columns.items())
+    for key in BOXSCORE_KEYS[box_type]:
+        raw_columns.setdefault(key, 'INT')
+    return [(column, raw_columns[column]) for column in BOXSCORE_SCHEMAS[box_type] if column in raw_columns]
+
+# Raw columns kept in the boxscore files for each boxscore type when ingestion projects them
+PROJECTED_BOXSCORE_COLUMNS = {
+    spec['box_type']: [raw_name for raw_name, _ in spec_raw_columns(spec)]
+    for spec in TABLE_SPECS.values() if 'box_type' in spec
+}
@@ -0,0 +1,68 @@
+#################################### Generating the Table DDL ####################################
+# Run this script after changing TABLE_SPECS in "data ingestion/schemas.py" to regenerate "DDL Script Table Management.sql"
+# Each RAW_* table gets the raw columns its spec uses, with the spec's types and NOT NULL on its keys, and a COPY INTO that
+# matches file columns by name, so raw files with extra columns (unprojected players, teams and schedule files) still load
+# Examples:
+#   python generate_ddl.py
+#   python generate_ddl.py --season 2023-24 --output "DDL Script Table Management 2023-24.sql"
+import sys
+import argparse
+from pathlib import Path
+
+# The table specs live with the ingestion code, which projects boxscore files with them
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "data ingestion"))
+from schemas import TABLE_SPECS, spec_columns, spec_raw_columns
+
+DDL_PATH = Path(__file__).resolve().parent / "DDL Script Table Management.sql"
+
+# Column names Snowflake reserves, which have to be quoted in the DDL
+RESERVED_COLUMN_NAMES = {'TO'}
+
+DDL_HEADER = """---------------------   THIS SCRIPT IS USED TO CREATE THE TABLES IN SNOWFLAKE AND COPY THE RAW DATA INTO THEM   ---------------------
+-- Generated by generate_ddl.py from TABLE_SPECS in "data ingestion/schemas.py"; change the specs and rerun it instead of editing this file
+-- Creating file format
+-- PARSE_HEADER reads the column names from the header row, so COPY INTO can match columns by name
+CREATE OR REPLACE FILE FORMAT nba_pipeline_csv_format
+TYPE = 'CSV'
+FIELD_OPTIONALLY_ENCLOSED_BY = '"'
+PARSE_HEADER = TRUE
+NULL_IF = ('NULL', 'null')
+EMPTY_FIELD_AS_NULL = true;
+-- To load partitioned, gzip-compressed parts in parallel instead of one CSV per table, run prepare_load_files.py and use the
+-- COPY INTO ... PATTERN statements it writes to data/load/<season>/copy_into_<season>.sql
+"""
+
+# Function to build the CREATE TABLE and COPY INTO statements of one raw table
+# Boxscores are copied from the final file written by appending_final_files.py, the other tables from their season file
+def build_table_ddl(table, spec, season):
+    raw_table = f"RAW_{table}_{season.replace('-', '_')}"
+    raw_keys = {raw_name for raw_name, _, processed_name in spec_columns(spec) if processed_name in spec['keys']}
+    column_lines = []
+    for raw_name, sql_type in spec_raw_columns(spec):
+        name = f'"{raw_name}"' if raw_name.upper() in RESERVED_COLUMN_NAMES else raw_name
+        column_lines.append(f"    {name} {sql_type} {'NOT NULL' if raw_name in raw_keys else 'NULL'}")
+    stage_file = f"raw_{spec['source']}_final_{season}.csv" if 'box_type' in spec else f"raw_{spec['source']}_{season}.csv"
+    return (f"-- Creating and copying {table.lower()} data into table\n"
+            f"CREATE OR REPLACE TABLE {raw_table} (\n"
+            + ",\n".join(column_lines) +
+            "\n);\n\n"
+            f"COPY INTO {raw_table}\n"
+            f"FROM @RAW_STAGE/{stage_file}\n"
+            "FILE_FORMAT = (FORMAT_NAME = 'nba_pipeline_csv_format')\n"
+            "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE\n"
+            "ON_ERROR = 'CONTINUE';\n")
+
+# Main function to run the script
+def main():
+    parser = argparse.ArgumentParser(description="Generate the RAW_* table DDL and COPY INTO statements from the table specs.")
+    parser.add_argument("--season", default="2024-25")
+    parser.add_argument("--output", default=str(DDL_PATH), help="DDL file to write")
+    args = parser.parse_args()
+
+    statements = [build_table_ddl(table, spec, args.season) for table, spec in TABLE_SPECS.items()]
+    output_path = Path(args.output)
+    output_path.write_text(DDL_HEADER + "\n" + "\n".join(statements))
+    print(f"Wrote {len(statements)} tables to {output_path}")
+
+if __name__ == "__main__":
+    main()
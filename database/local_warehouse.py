@@ -0,0 +1,237 @@
+#################################### Running a Local Warehouse ####################################
+# Run this script to load and transform the raw data in an embedded DuckDB database instead of Snowflake, e.g. to test or
+# benchmark the load and transformation steps offline:
+#   1. Creates the RAW_* tables from the CREATE TABLE statements in "DDL Script Table Management.sql"
+#   2. Bulk loads the local raw files named in its COPY INTO statements, several tables at once
+#   3. Builds the processed tables with the same columns and minutes conversion as "Data Transformations.py"
+#   4. Checks the primary and foreign keys declared in "DDL Script Constraints.sql", which Snowflake does not enforce
+# The database is written to data/warehouse/nba_local.duckdb
+# Examples:
+#   python local_warehouse.py
+#   python local_warehouse.py --skip-checks --threads 2
+import re
+import sys
+import argparse
+import logging
+from pathlib import Path
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import duckdb
+
+# The ingestion config holds the shared paths and the local transformations hold the processed-table definitions
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "data ingestion"))
+sys.path.insert(0, str(PROJECT_ROOT / "data cleaning"))
+from config import initialize_script_environment
+from local_transformations import PROCESSED_TABLES, find_raw_files
+from schemas import spec_columns
+
+TABLE_DDL_PATH = Path(__file__).resolve().parent / "DDL Script Table Management.sql"
+CONSTRAINTS_DDL_PATH = Path(__file__).resolve().parent / "DDL Script Constraints.sql"
+PROCESSED_SCHEMA = "NBA_PROCESSED_2024_25"
+
+# Snowflake column types in the DDL and the DuckDB types they are created as
+SNOWFLAKE_TYPES = {
+    'STRING': 'VARCHAR',
+    'INT': 'BIGINT',
+    'FLOAT': 'DOUBLE',
+    'DATE': 'DATE',
+    'TIMESTAMP': 'TIMESTAMP',
+    'BOOLEAN': 'BOOLEAN'
+}
+
+# Same conversion as convert_minutes in "Data Transformations.py" and local_transformations.py
+CONVERT_MINUTES_MACRO = """
+CREATE OR REPLACE MACRO convert_minutes(min_str) AS COALESCE(
+    CASE len(string_split(min_str, ':'))
+        WHEN 1 THEN TRY_CAST(string_split(min_str, ':')[1] AS DOUBLE)
+        WHEN 2 THEN TRY_CAST(string_split(min_str, ':')[1] AS DOUBLE) + TRY_CAST(string_split(min_str, ':')[2] AS DOUBLE) / 60
+        WHEN 3 THEN TRY_CAST(string_split(min_str, ':')[1] AS DOUBLE) * 60 + TRY_CAST(string_split(min_str, ':')[2] AS DOUBLE)
+                    + TRY_CAST(string_split(min_str, ':')[3] AS DOUBLE) / 60
+    END, 0.0)
+"""
+
+#################################### Reading the DDL Scripts ####################################
+# Function to read the RAW_* table definitions and the stage file each one is copied from
+# Returns {table: {'columns': [(name, duckdb type), ...], 'stage_file': 'raw_all_players_2024-25.csv'}}
+def parse_table_ddl(ddl_path=TABLE_DDL_PATH):
+    ddl = Path(ddl_path).read_text()
+    tables = {}
+    for table, body in re.findall(r"CREATE OR REPLACE TABLE (\w+) \((.*?)\);", ddl, flags=re.S):
+        columns = []
+        for line in body.strip().splitlines():
+            name, column_type = line.strip().rstrip(',').split()[:2]
+            columns.append((name.strip('"'), SNOWFLAKE_TYPES[column_type.upper()])) # e.g. "TO", quoted as a reserved word
+        tables[table] = {'columns': columns}
+    for table, stage_file in re.findall(r"COPY INTO (\w+)\s+FROM @RAW_STAGE/(\S+)", ddl):
+        tables[table]['stage_file'] = stage_file
+    return tables
+
+# Function to read the primary and foreign keys declared for the processed tables
+# Returns a list of (constraint, table, columns, referenced table, referenced columns), with no reference for primary keys
+def parse_constraints_ddl(ddl_path=CONSTRAINTS_DDL_PATH):
+    ddl = Path(ddl_path).read_text()
+    pattern = r"ALTER TABLE ([\w.]+)\s+ADD CONSTRAINT (\w+) (PRIMARY KEY|FOREIGN KEY) \(([^)]*)\)(?:\s+REFERENCES ([\w.]+) \(([^)]*)\))?"
+    constraints = []
+    for table, name, _, columns, ref_table, ref_columns in re.findall(pattern, ddl):
+        split_columns = lambda text: [c.strip() for c in text.split(',') if c.strip()]
+        constraints.append((name, table, split_columns(columns), ref_table or None, split_columns(ref_columns)))
+    return constraints
+
+# Function to find the local files for a stage file, e.g. raw_boxscore_advanced_final_2024-25.csv -> the final or season boxscore files
+def find_stage_files(script_env, stage_file):
+    match = re.fullmatch(r"raw_(\w+?)(?:_final)?_(\d{4}-\d{2})\.\w+", stage_file)
+    if match is None:
+        raise ValueError(f"Unrecognised stage file name {stage_file}")
+    source, season = match.groups()
+    return find_raw_files(script_env, source, season)
+
+#################################### Loading ####################################
+# Function to create a RAW_* table and load its local files
+# Columns are matched by name and cast with TRY_CAST, so values that do not fit the column type load as NULL rather than failing,
+# like ON_ERROR = 'CONTINUE'; dates written as e.g. 10/22/2024 00:00:00 are parsed as well
+# Returns the number of rows loaded
+def load_raw_table(connection, script_env, table, definition):
+    cursor = connection.cursor() # One cursor per thread
+    files = find_stage_files(script_env, definition['stage_file'])
+    if not files:
+        raise FileNotFoundError(f"No local files for {definition['stage_file']}")
+
+    column_list = ", ".join(f'"{name}" {column_type}' for name, column_type in definition['columns'])
+    cursor.execute(f"CREATE OR REPLACE TABLE {table} ({column_list})")
+
+    file_list = ", ".join(f"'{f.as_posix()}'" for f in files)
+    if all(f.suffix == '.parquet' for f in files):
+        source = f"read_parquet([{file_list}], union_by_name = true)"
+    else:
+        source = f"read_csv([{file_list}], header = true, all_varchar = true, union_by_name = true, nullstr = ['NULL', 'null', ''])"
+    file_columns = {row[0].lower() for row in cursor.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+
+    select_list = []
+    for name, column_type in definition['columns']:
+        if name.lower() not in file_columns:
+            select_list.append(f"NULL::{column_type}")
+        elif column_type == 'DATE':
+            select_list.append(f"COALESCE(TRY_CAST(\"{name}\" AS DATE), TRY_STRPTIME(\"{name}\"::VARCHAR, '%m/%d/%Y %H:%M:%S')::DATE)")
+        else:
+            select_list.append(f"TRY_CAST(\"{name}\" AS {column_type})")
+    missing_columns = [name for name, _ in definition['columns'] if name.lower() not in file_columns]
+    if missing_columns:
+        logging.warning(f"{table}: {len(missing_columns)} columns not in the raw files load as NULL: {missing_columns}")
+
+    cursor.execute(f"INSERT INTO {table} SELECT {', '.join(select_list)} FROM {source}")
+    return cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+# Function to load every RAW_* table, several at once
+# Returns the number of rows loaded into each table and the error of each table that failed
+def load_raw_tables(connection, script_env, table_definitions, max_workers=4):
+    row_counts, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(load_raw_table, connection, script_env, table, definition): table for table, definition in table_definitions.items()}
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                row_counts[table] = future.result()
+                logging.info(f"Loaded {row_counts[table]} rows into {table}")
+            except Exception as e:
+                errors[table] = e
+                logging.error(f"Error loading {table}: {e}")
+    return row_counts, errors
+
+#################################### Transformations and Checks ####################################
+# Function to build the SELECT for a processed table from its table spec in schemas.py
+def build_processed_table_query(table, raw_columns):
+    spec = PROCESSED_TABLES[table]
+    select_list = []
+    for raw_name, _, processed_name in spec_columns(spec):
+        if raw_name.lower() not in raw_columns:
+            select_list.append(f'NULL AS "{processed_name}"')
+        elif processed_name == 'MIN':
+            select_list.append(f'convert_minutes("{raw_name}")::DOUBLE AS "MIN"')
+        else:
+            select_list.append(f'"{raw_name}" AS "{processed_name}"')
+    query = f"SELECT {', '.join(select_list)} FROM RAW_{table}_2024_25"
+    if 'filter' in spec:
+        column, value = spec['filter']
+        query += f" WHERE \"{column}\" = '{value}'"
+    return query
+
+# Function to build every processed table in the processed schema
+# Returns the number of rows in each processed table
+def run_transformations(connection, table_definitions):
+    connection.execute(f"CREATE SCHEMA IF NOT EXISTS {PROCESSED_SCHEMA}")
+    connection.execute(CONVERT_MINUTES_MACRO)
+    row_counts = {}
+    for table in PROCESSED_TABLES:
+        raw_table = f"RAW_{table}_2024_25"
+        if raw_table not in table_definitions:
+            logging.warning(f"Skipping {table}: {raw_table} is not defined in the DDL script.")
+            continue
+        raw_columns = {name.lower() for name, _ in table_definitions[raw_table]['columns']}
+        processed_table = f"{PROCESSED_SCHEMA}.{table}_PROCESSED_2024_25"
+        connection.execute(f"CREATE OR REPLACE TABLE {processed_table} AS {build_processed_table_query(table, raw_columns)}")
+        row_counts[processed_table] = connection.execute(f"SELECT COUNT(*) FROM {processed_table}").fetchone()[0]
+        logging.info(f"Built {processed_table} with {row_counts[processed_table]} rows")
+    return row_counts
+
+# Function to check the declared keys: primary keys must be unique and not null, and foreign keys must match a referenced row
+# Returns the number of violating rows for each constraint
+def check_constraints(connection, constraints):
+    violations = {}
+    for name, table, columns, ref_table, ref_columns in constraints:
+        if ref_table is None:
+            key_list = ", ".join(columns)
+            null_filter = " OR ".join(f"{c} IS NULL" for c in columns)
+            query = f"""
+                SELECT (SELECT COALESCE(SUM(n - 1), 0) FROM (SELECT COUNT(*) AS n FROM {table} GROUP BY {key_list} HAVING COUNT(*) > 1))
+                     + (SELECT COUNT(*) FROM {table} WHERE {null_filter})
+            """
+        else:
+            join_on = " AND ".join(f"t.{c} = r.{rc}" for c, rc in zip(columns, ref_columns))
+            query = f"""
+                SELECT COUNT(*) FROM {table} t LEFT JOIN {ref_table} r ON {join_on}
+                WHERE {' AND '.join(f't.{c} IS NOT NULL' for c in columns)} AND r.{ref_columns[0]} IS NULL
+            """
+        violations[name] = int(connection.execute(query).fetchone()[0])
+        log = logging.warning if violations[name] else logging.info
+        log(f"{name} on {table}: {violations[name]} violating rows")
+    return violations
+
+# Main function to run the script
+def main():
+    parser = argparse.ArgumentParser(description="Load and transform the raw data in a local DuckDB warehouse.")
+    parser.add_argument("--database", help="DuckDB database file (default: data/warehouse/nba_local.duckdb)")
+    parser.add_argument("--threads", type=int, default=4, help="Number of tables loaded at once")
+    parser.add_argument("--skip-transform", action="store_true", help="Only create and load the RAW_* tables")
+    parser.add_argument("--skip-checks", action="store_true", help="Do not check the primary and foreign keys")
+    args = parser.parse_args()
+
+    script_env = initialize_script_environment(log_suffix="_local_warehouse")
+    database_path = Path(args.database) if args.database else script_env.warehouse_dir / "nba_local.duckdb"
+    logging.info(f"Starting local warehouse run in {database_path}...")
+
+    connection = duckdb.connect(str(database_path))
+    table_definitions = parse_table_ddl()
+
+    start = perf_counter()
+    _, errors = load_raw_tables(connection, script_env, table_definitions, args.threads)
+    logging.info(f"Loaded {len(table_definitions) - len(errors)} of {len(table_definitions)} RAW tables in {perf_counter() - start:.2f}s")
+    if errors:
+        connection.close()
+        raise SystemExit(1)
+
+    if not args.skip_transform:
+        start = perf_counter()
+        run_transformations(connection, table_definitions)
+        logging.info(f"Built processed tables in {perf_counter() - start:.2f}s")
+
+        if not args.skip_checks:
+            violations = check_constraints(connection, parse_constraints_ddl())
+            failed = [name for name, count in violations.items() if count]
+            logging.info(f"{len(violations) - len(failed)} of {len(violations)} constraints hold.")
+
+    connection.close()
+    logging.info("Local warehouse run complete.")
+
+if __name__ == "__main__":
+    main()